@@ -0,0 +1,59 @@
+"""Add next_fire_at to triggers
+
+Revision ID: 0d6b3e9a4c58
+Revises: c4e8a1f95d27
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from cronsim import CronSim, CronSimError
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6b3e9a4c58'
+down_revision: Union[str, None] = 'c4e8a1f95d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trigger', sa.Column('next_fire_at', sa.DateTime(), nullable=True))
+
+    # The scheduler only reads enabled triggers that are due
+    op.execute("""
+        CREATE INDEX idx_trigger_next_fire_at ON trigger (next_fire_at)
+        WHERE enabled AND NOT deleted AND next_fire_at IS NOT NULL
+    """)
+
+    connection = op.get_bind()
+    now = datetime.now()
+
+    # Date triggers fire at their date, cron triggers at their next match from now on
+    connection.execute(sa.text("""
+        UPDATE trigger SET next_fire_at = date
+        WHERE type = 'DATE' AND enabled AND NOT deleted
+    """))
+
+    cron_triggers = connection.execute(sa.text("""
+        SELECT id, cron FROM trigger WHERE type = 'CRON' AND enabled AND NOT deleted
+    """)).all()
+
+    for trigger_id, cron in cron_triggers:
+        try:
+            next_fire_at = next(CronSim(cron, now))
+        except (CronSimError, StopIteration):
+            continue
+
+        connection.execute(
+            sa.text('UPDATE trigger SET next_fire_at = :next_fire_at WHERE id = :id'),
+            {'next_fire_at': next_fire_at, 'id': trigger_id},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_trigger_next_fire_at', 'trigger')
+    op.drop_column('trigger', 'next_fire_at')
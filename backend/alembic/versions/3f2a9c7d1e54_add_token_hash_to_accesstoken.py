@@ -0,0 +1,36 @@
+"""Add token_hash to accesstoken
+
+Revision ID: 3f2a9c7d1e54
+Revises: d4d1a2b3c4e5
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c7d1e54'
+down_revision: Union[str, None] = 'd4d1a2b3c4e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('accesstoken', sa.Column('token_hash', sa.String(), nullable=True))
+
+    # Hash existing tokens so they keep working after the upgrade
+    op.execute("""
+        UPDATE accesstoken
+        SET token_hash = encode(sha256(convert_to(access_token, 'UTF8')), 'hex')
+    """)
+
+    op.alter_column('accesstoken', 'token_hash', nullable=False)
+    op.create_index(op.f('ix_accesstoken_token_hash'), 'accesstoken', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_accesstoken_token_hash'), table_name='accesstoken')
+    op.drop_column('accesstoken', 'token_hash')
@@ -0,0 +1,39 @@
+"""Add indexes for keyset pagination
+
+Revision ID: 5a9e2c4f7b10
+Revises: b8d53f0e6a71
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9e2c4f7b10'
+down_revision: Union[str, None] = 'b8d53f0e6a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Work items are paged per queue, most recently updated first
+    op.create_index(
+        'idx_workitem_workqueue_updated', 'workitem', ['workqueue_id', 'updated_at', 'id']
+    )
+
+    # Audit logs are paged per session in event order. The id tie-breaker makes the
+    # previous (session_id, event_timestamp) index redundant.
+    op.create_index(
+        'idx_auditlog_session_event_id', 'auditlog', ['session_id', 'event_timestamp', 'id']
+    )
+    op.drop_index('idx_sessionlog_session_event', 'auditlog')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'idx_sessionlog_session_event', 'auditlog', ['session_id', 'event_timestamp']
+    )
+    op.drop_index('idx_auditlog_session_event_id', 'auditlog')
+    op.drop_index('idx_workitem_workqueue_updated', 'workitem')
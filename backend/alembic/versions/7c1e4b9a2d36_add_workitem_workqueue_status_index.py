@@ -0,0 +1,26 @@
+"""Add workitem workqueue_id/status index
+
+Revision ID: 7c1e4b9a2d36
+Revises: 3f2a9c7d1e54
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2d36'
+down_revision: Union[str, None] = '3f2a9c7d1e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets the per queue and status counts be answered from the index alone
+    op.create_index('idx_workitem_workqueue_status', 'workitem', ['workqueue_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_workitem_workqueue_status', 'workitem')
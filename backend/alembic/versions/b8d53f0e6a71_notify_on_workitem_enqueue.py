@@ -0,0 +1,43 @@
+"""Notify listeners when a work item is enqueued
+
+Revision ID: b8d53f0e6a71
+Revises: 7c1e4b9a2d36
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d53f0e6a71'
+down_revision: Union[str, None] = '7c1e4b9a2d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres folds identical notifications within a transaction, so a bulk insert
+    # sends one notification per workqueue
+    op.execute("""
+        CREATE FUNCTION notify_workitem_enqueued() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('workitem_enqueued', NEW.workqueue_id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE TRIGGER workitem_enqueued
+        AFTER INSERT OR UPDATE OF status ON workitem
+        FOR EACH ROW
+        WHEN (NEW.status = 'NEW')
+        EXECUTE FUNCTION notify_workitem_enqueued()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER workitem_enqueued ON workitem")
+    op.execute("DROP FUNCTION notify_workitem_enqueued()")
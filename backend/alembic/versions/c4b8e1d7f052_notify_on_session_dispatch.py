@@ -0,0 +1,43 @@
+"""Notify listeners when a session is dispatched to a resource
+
+Revision ID: c4b8e1d7f052
+Revises: e5c7a2f9b318
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b8e1d7f052'
+down_revision: Union[str, None] = 'e5c7a2f9b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The scheduler inserts and dispatches new sessions in the same tick, so both an insert
+    # and an update of resource_id can dispatch a session
+    op.execute("""
+        CREATE FUNCTION notify_session_dispatched() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('session_dispatched', NEW.resource_id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE TRIGGER session_dispatched
+        AFTER INSERT OR UPDATE OF resource_id ON session
+        FOR EACH ROW
+        WHEN (NEW.status = 'NEW' AND NEW.resource_id IS NOT NULL)
+        EXECUTE FUNCTION notify_session_dispatched()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER session_dispatched ON session")
+    op.execute("DROP FUNCTION notify_session_dispatched()")
@@ -0,0 +1,109 @@
+"""Partition the audit log by month
+
+Revision ID: c4e8a1f95d27
+Revises: e2b7f4c81a09
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f95d27'
+down_revision: Union[str, None] = 'e2b7f4c81a09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Future partitions are created by the scheduler. These cover the first months after upgrading.
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    'CREATE INDEX idx_auditlog_session_event_id ON auditlog (session_id, event_timestamp, id)',
+    'CREATE INDEX idx_sessionlog_workitem_event ON auditlog (workitem_id, event_timestamp)',
+    'CREATE INDEX idx_sessionlog_level ON auditlog (level)',
+    'CREATE INDEX idx_sessionlog_logger ON auditlog (logger_name)',
+    'CREATE INDEX idx_sessionlog_exception ON auditlog (exception_type) WHERE exception_type IS NOT NULL',
+    'CREATE INDEX idx_sessionlog_structured_data ON auditlog USING GIN (structured_data)',
+]
+
+
+def replace_auditlog(partition_clause: str) -> None:
+    """Move the rows to a new auditlog table, keeping the id sequence."""
+    op.execute('ALTER TABLE auditlog RENAME TO auditlog_previous')
+    op.execute(f'CREATE TABLE auditlog (LIKE auditlog_previous INCLUDING DEFAULTS) {partition_clause}')
+
+
+def copy_rows_and_drop_previous() -> None:
+    op.execute('INSERT INTO auditlog SELECT * FROM auditlog_previous')
+    op.execute("""
+        DO $$
+        BEGIN
+            EXECUTE format(
+                'ALTER SEQUENCE %s OWNED BY auditlog.id',
+                pg_get_serial_sequence('auditlog_previous', 'id')
+            );
+        END $$
+    """)
+    op.execute('DROP TABLE auditlog_previous')
+
+
+def add_constraints_and_indexes(primary_key: str) -> None:
+    op.execute(f'ALTER TABLE auditlog ADD CONSTRAINT auditlog_pkey PRIMARY KEY ({primary_key})')
+    op.execute("""
+        ALTER TABLE auditlog ADD CONSTRAINT auditlog_session_id_fkey
+        FOREIGN KEY (session_id) REFERENCES session (id) ON DELETE CASCADE ON UPDATE CASCADE
+    """)
+    op.execute("""
+        ALTER TABLE auditlog ADD CONSTRAINT auditlog_workitem_id_fkey
+        FOREIGN KEY (workitem_id) REFERENCES workitem (id) ON DELETE SET NULL ON UPDATE CASCADE
+    """)
+
+    for index in INDEXES:
+        op.execute(index)
+
+    op.execute('ANALYZE auditlog')
+
+
+def upgrade() -> None:
+    # Partitioned on created_at, which the server sets, so a worker with a wrong clock
+    # cannot write into a partition that has already been dropped by retention.
+    replace_auditlog('PARTITION BY RANGE (created_at)')
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce((SELECT min(created_at) FROM auditlog_previous), now())),
+                    date_trunc('month', now()) + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF auditlog FOR VALUES FROM (%L) TO (%L)',
+                    'auditlog_' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END $$
+    """)
+
+    # Catches rows outside the monthly partitions if partition maintenance falls behind
+    op.execute('CREATE TABLE auditlog_default PARTITION OF auditlog DEFAULT')
+
+    copy_rows_and_drop_previous()
+
+    # The primary key of a partitioned table must include the partition key
+    add_constraints_and_indexes('id, created_at')
+
+
+def downgrade() -> None:
+    replace_auditlog('')
+    copy_rows_and_drop_previous()
+    add_constraints_and_indexes('id')
@@ -0,0 +1,42 @@
+"""Add trigram search over work item reference and data
+
+Revision ID: e2b7f4c81a09
+Revises: 5a9e2c4f7b10
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f4c81a09'
+down_revision: Union[str, None] = '5a9e2c4f7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # The reference followed by every scalar value in data, at any depth. Postgres keeps the
+    # column up to date on insert and update. Adding it rewrites the workitem table.
+    op.execute("""
+        ALTER TABLE workitem ADD COLUMN search_text text GENERATED ALWAYS AS (
+            coalesce(reference, '') || ' ' ||
+            jsonb_path_query_array(
+                data, 'strict $.** ? (@.type() != "object" && @.type() != "array")'
+            )::text
+        ) STORED
+    """)
+
+    # A trigram index answers ILIKE '%term%' for terms of three or more characters
+    op.execute(
+        'CREATE INDEX idx_workitem_search_text ON workitem USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX idx_workitem_search_text')
+    op.execute('ALTER TABLE workitem DROP COLUMN search_text')
@@ -0,0 +1,29 @@
+"""Add session resource_id index
+
+Revision ID: e5c7a2f9b318
+Revises: a3f9d2c61b84
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c7a2f9b318'
+down_revision: Union[str, None] = 'a3f9d2c61b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Resource availability anti-joins resources with their new and in progress sessions
+    op.execute("""
+        CREATE INDEX idx_session_active_resource ON session (resource_id, status)
+        WHERE status IN ('NEW', 'IN_PROGRESS') AND resource_id IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_session_active_resource', 'session')
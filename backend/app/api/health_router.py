@@ -4,7 +4,10 @@ from typing import Dict, Any
 from fastapi import APIRouter, Depends, status
 from sqlmodel import Session, select
 
+from app.database.repository import SchedulerLeaseRepository
 from app.database.session import get_session
+from app.scheduler.leader import LEASE_NAME
+from app.scheduler.sharding import MEMBER_PREFIX
 
 router = APIRouter(
     prefix="/health",
@@ -41,4 +44,32 @@ async def readiness_check(session: Session = Depends(get_session)) -> Dict[str,
         response["status"] = "unhealthy"
         response["database"] = f"error: {str(e)}"
         
-    return response
\ No newline at end of file
+    return response
+
+
+@router.get("/scheduler", response_model=Dict[str, Any])
+def scheduler_leader(session: Session = Depends(get_session)) -> Dict[str, Any]:
+    """Which scheduler holds the scheduler lease, and for how long.
+
+    With sharding, members lists the schedulers that share the triggers.
+    """
+    repository = SchedulerLeaseRepository(session)
+    lease = repository.get(LEASE_NAME)
+    members = repository.get_holders(MEMBER_PREFIX)
+
+    if lease is None:
+        return {"leader": None, "members": members}
+
+    # Lease times are on the database clock
+    now = repository.now()
+
+    return {
+        "leader": lease.holder if lease.expires_at > now else None,
+        "holder": lease.holder,
+        "acquired_at": lease.acquired_at.isoformat(),
+        "renewed_at": lease.renewed_at.isoformat(),
+        "expires_at": lease.expires_at.isoformat(),
+        "lease_age_seconds": (now - lease.acquired_at).total_seconds(),
+        "expired": lease.expires_at <= now,
+        "members": members,
+    }
@@ -0,0 +1,35 @@
+import logging
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.api.v1.dependencies import get_workqueue_service, resolve_access_token
+from app.database.models import AccessToken
+from app.database.session import async_engine, engine
+from app.metrics import record_pool_connections, record_workqueue_items
+from app.services import WorkqueueService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["health"],
+)
+
+
+@router.get("", response_class=Response)
+def metrics(
+    service: WorkqueueService = Depends(get_workqueue_service),
+    token: AccessToken = Depends(resolve_access_token),
+) -> Response:
+    """Metrics in the Prometheus text format, for holders of an access token."""
+    record_pool_connections("sync", engine.pool)
+    record_pool_connections("async", async_engine.pool)
+
+    # The pool and request metrics are still useful when the database is down
+    try:
+        record_workqueue_items(service.get_information())
+    except Exception as e:
+        logger.error(f"Failed to read workqueue metrics: {e}")
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
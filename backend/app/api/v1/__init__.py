@@ -1,3 +1,12 @@
+from fastapi import Response
+
+from app.api.v1.schemas import ListParams
+from app.database.repository.database_repository import AbstractRepository
+
+# Page size used when a cursor is given without a limit
+DEFAULT_LIST_LIMIT = 100
+
+
 
     
 def error_descriptions(name: str, _404: bool = False, _410: bool = False, _204: bool = False, _403: bool = False ) -> dict:
@@ -22,4 +31,29 @@ def error_descriptions(name: str, _404: bool = False, _410: bool = False, _204:
             "description": f"{name} is gone",
             "content": {"application/json": {"example": {"detail": f"{name} is gone"}}},
         }
-    return descriptions
\ No newline at end of file
+    return descriptions
+
+
+def list_items(
+    repository: AbstractRepository,
+    params: ListParams,
+    response: Response,
+    include_deleted: bool = False,
+) -> list:
+    """Return one page of the repository with its cursors in the response headers.
+
+    Without a limit or cursor every item is returned, as before paging was introduced.
+    """
+    if params.limit is None and params.cursor is None:
+        return list(repository.get_all(include_deleted))
+
+    page = repository.get_page(
+        params.limit or DEFAULT_LIST_LIMIT, params.cursor, include_deleted
+    )
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
+
+    return page.items
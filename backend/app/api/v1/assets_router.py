@@ -1,10 +1,10 @@
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, HTTPException, Response
 from sqlalchemy.exc import IntegrityError
 from app.database.models import Asset, AccessToken
 from app.database.unit_of_work import AbstractUnitOfWork
-from .schemas import AssetCreate, AssetUpdate
-from .dependencies import get_unit_of_work, resolve_access_token
-from . import error_descriptions
+from .schemas import ListParams, AssetCreate, AssetUpdate
+from .dependencies import get_unit_of_work, resolve_access_token, get_list_params
+from . import error_descriptions, list_items
 
 # Dependency Injection local to this router
 
@@ -34,12 +34,14 @@ router = APIRouter(prefix="/assets", tags=["Assets"])
 
 @router.get("", responses=error_descriptions("Asset", _403=True))
 def get_assets(
+    response: Response,
     include_deleted: bool = False,
+    list_params: ListParams = Depends(get_list_params),
     uow: AbstractUnitOfWork = Depends(get_unit_of_work),
     token: AccessToken = Depends(resolve_access_token),
 ) -> list[Asset]:
     with uow:
-        result = uow.assets.get_all(include_deleted)
+        result = list_items(uow.assets, list_params, response, include_deleted)
 
         result.sort(key=lambda x: x.name)
         return result
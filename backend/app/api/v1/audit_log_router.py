@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends
+
+from app.config import settings
 
 from app.api.v1.schemas import PaginatedSearchParams, AuditLogCreate
 
 from app.database.models import AuditLog, WorkItem, Session, AccessToken
-from app.database.unit_of_work import AbstractUnitOfWork
+from app.database.unit_of_work import AsyncUnitOfWork
 
 from app.services import AuditLogService
 
@@ -15,7 +17,8 @@ from .dependencies import (
     get_paginated_search_params,
     get_auditlog_service,
     resolve_access_token,
-    get_unit_of_work,
+    resolve_access_token_async,
+    get_async_unit_of_work,
 )
 
 from .session_router import (
@@ -30,15 +33,26 @@ router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
 
 
 @router.post("", status_code=204)
-def create_log(
+async def create_log(
     log: AuditLogCreate,
-    uow: AbstractUnitOfWork = Depends(get_unit_of_work),
-    token: AccessToken = Depends(resolve_access_token),
+    uow: AsyncUnitOfWork = Depends(get_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
+) -> None:
+    async with uow:
+        await uow.auditlogs.create(log.model_dump())
+
+
+@router.post("/batch", status_code=204)
+async def create_logs(
+    logs: list[AuditLogCreate] = Body(max_length=settings.auditlog_batch_max_size),
+    uow: AsyncUnitOfWork = Depends(get_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
 ) -> None:
-    with uow:
-        
-        uow.auditlogs.create(log.model_dump())
-        uow.commit()
+    if not logs:
+        return
+
+    async with uow:
+        await uow.auditlogs.bulk_create([log.model_dump() for log in logs])
 
 
 @router.get("/{session_id}", responses=error_descriptions("Session", _403=True, _404=True))
@@ -53,6 +67,7 @@ def get_auditlogs(
         paginated_search.pagination.page,
         paginated_search.pagination.size,
         paginated_search.search,
+        cursor=paginated_search.pagination.cursor,
     )
 
 
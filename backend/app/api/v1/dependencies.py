@@ -3,26 +3,31 @@ from datetime import datetime, timedelta
 from fastapi import Depends, Query, HTTPException, status, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.database.unit_of_work import AbstractUnitOfWork,UnitOfWork
+from app.database.unit_of_work import AbstractUnitOfWork, AsyncUnitOfWork, UnitOfWork
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Annotated
 
 
-from app.database.session import get_session
+from app.database.session import get_async_session, get_session
 
 import app.database.repository as repositories
 import app.database.models as models
 import app.api.v1.schemas as schemas
 
-from app.security import oauth2_scheme
+from app.security import oauth2_scheme, hash_token
+from app.security.access_tokens import token_cache, tokens_exist_cache
 
 from app.services import (
     AuditLogService,
     SessionService,
     ResourceService,
     WorkqueueService,
+    WorkItemIngestService,
 )
 
+_NOT_CACHED = object()
+
 
 def get_repository(model):
     def get(session=Depends(get_session)):
@@ -73,6 +78,14 @@ def get_workqueue_service(
     return WorkqueueService(repository)
 
 
+def get_workitem_ingest_service(
+    repository: repositories.WorkItemRepository = Depends(
+        get_repository(models.WorkItem)
+    ),
+) -> WorkItemIngestService:
+    return WorkItemIngestService(repository)
+
+
 def get_auditlog_service(
     repository: repositories.AuditLogRepository = Depends(
         get_repository(models.AuditLog)
@@ -107,46 +120,158 @@ def get_paginated_search_params(
     page: int = Query(1, ge=1, description="Page number, starting from 1"),
     size: int = Query(50, ge=1, le=200, description="Number of items per page"),
     search: Optional[str] = Query(None, description="Search term"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from a previous page, takes precedence over page"
+    ),
 ) -> schemas.PaginatedSearchParams:
-    pagination = schemas.PaginationParams(page=page, size=size)
+    pagination = schemas.PaginationParams(page=page, size=size, cursor=cursor)
     return schemas.PaginatedSearchParams(pagination=pagination, search=search)
 
 
+def get_list_params(
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Maximum number of items, all items when omitted"
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Cursor from the X-Next-Cursor or X-Prev-Cursor header of a previous response",
+    ),
+) -> schemas.ListParams:
+    return schemas.ListParams(limit=limit, cursor=cursor)
+
+
+def lookup_access_token(
+    token: str, repository: repositories.AccessTokenRepository
+) -> models.AccessToken | None:
+    """Find a valid token, serving repeated lookups (including misses) from the token cache."""
+    token_hash = hash_token(token)
+    access_token = token_cache.get(token_hash, _NOT_CACHED)
+
+    if access_token is _NOT_CACHED:
+        access_token = _cache_token(token_hash, repository.get_by_token(token))
+
+    return _unexpired(access_token)
+
+
+async def lookup_access_token_async(
+    token: str, repository: repositories.AsyncAccessTokenRepository
+) -> models.AccessToken | None:
+    token_hash = hash_token(token)
+    access_token = token_cache.get(token_hash, _NOT_CACHED)
+
+    if access_token is _NOT_CACHED:
+        access_token = _cache_token(token_hash, await repository.get_by_token(token))
+
+    return _unexpired(access_token)
+
+
+def _cache_token(
+    token_hash: str, access_token: models.AccessToken | None
+) -> models.AccessToken | None:
+    if access_token is not None:
+        # Cache a detached copy so it outlives the request's database session
+        access_token = models.AccessToken(**access_token.model_dump())
+    token_cache.set(token_hash, access_token)
+    return access_token
+
+
+def _unexpired(access_token: models.AccessToken | None) -> models.AccessToken | None:
+    if access_token is None or access_token.expires_at <= datetime.now():
+        return None
+
+    return access_token
+
+
+def tokens_exist(repository: repositories.AccessTokenRepository) -> bool:
+    exists = tokens_exist_cache.get("exists")
+
+    if exists is None:
+        exists = repository.has_tokens()
+        tokens_exist_cache.set("exists", exists)
+
+    return exists
+
+
+async def tokens_exist_async(repository: repositories.AsyncAccessTokenRepository) -> bool:
+    exists = tokens_exist_cache.get("exists")
+
+    if exists is None:
+        exists = await repository.has_tokens()
+        tokens_exist_cache.set("exists", exists)
+
+    return exists
+
+
+def _development_token() -> models.AccessToken:
+    # If there are no tokens in the system, we assume that we are in either install or development mode.
+    return models.AccessToken(
+        id=0,
+        token="development-token",
+        identifier="development-token",
+        expires_at=datetime.now() + timedelta(weeks=52),
+        revoked=False,
+    )
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def resolve_access_token(
     token: str = Depends(oauth2_scheme),
     repository: repositories.AccessTokenRepository = Depends(
         get_repository(models.AccessToken)
     ),
 ) -> models.AccessToken:
-    tokens = repository.get_all()
+    if not tokens_exist(repository):
+        return _development_token()
 
-    # If there are no tokens in the system, we assume that we are in either install or development mode.
-    if len(tokens) == 0:
-        return models.AccessToken(
-            id=0,
-            token="development-token",
-            identifier="development-token",
-            expires_at=datetime.now() + timedelta(weeks=52),
-            revoked=False,
-        )
+    if token is None:
+        raise _unauthorized("Token is required")
+
+    access_token = lookup_access_token(token, repository)
+
+    if access_token is None:
+        raise _unauthorized("Invalid or expired token")
+
+    return access_token
+
+
+# Async, as FastAPI runs sync dependencies in the threadpool
+async def get_async_unit_of_work(
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncUnitOfWork:
+    return AsyncUnitOfWork(session)
+
+
+async def get_autocommit_async_unit_of_work(
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncUnitOfWork:
+    """Unit of work whose repository writes each commit, for endpoints waiting between writes."""
+    return AsyncUnitOfWork(session, transactional=False)
+
+
+async def resolve_access_token_async(
+    token: str = Depends(oauth2_scheme),
+    uow: AsyncUnitOfWork = Depends(get_async_unit_of_work),
+) -> models.AccessToken:
+    """resolve_access_token for async endpoints, so they never wait for a worker thread."""
+    if not await tokens_exist_async(uow.access_tokens):
+        return _development_token()
 
     if token is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token is required",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    # Check if the token is in the tokens
-    for t in tokens:
-        if t.access_token == token and not t.deleted and t.expires_at > datetime.now():
-            return t
-
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid or expired token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+        raise _unauthorized("Token is required")
+
+    access_token = await lookup_access_token_async(token, uow.access_tokens)
+
+    if access_token is None:
+        raise _unauthorized("Invalid or expired token")
+
+    return access_token
 
 
 def get_unit_of_work(session: Session = Depends(get_session)) -> AbstractUnitOfWork:
@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from fastapi.exceptions import HTTPException
 
 from app.database.models import Process, Trigger, AccessToken
 
-from .schemas import ProcessCreate, ProcessUpdate, TriggerCreate
-from .dependencies import resolve_access_token, get_unit_of_work
+from .schemas import ListParams, ProcessCreate, ProcessUpdate, TriggerCreate
+from .dependencies import resolve_access_token, get_unit_of_work, get_list_params
 from app.database.unit_of_work import AbstractUnitOfWork
 
 import app.enums as enums
-from . import error_descriptions
+from . import error_descriptions, list_items
 
 
 router = APIRouter(prefix="/processes", tags=["Processes"])
@@ -35,12 +35,14 @@ def get_process(
 # Routes
 @router.get("", responses=error_descriptions("Process", _403=True))
 def get_processes(
+    response: Response,
     include_deleted: bool = False,
+    list_params: ListParams = Depends(get_list_params),
     uow: AbstractUnitOfWork = Depends(get_unit_of_work),
     token: AccessToken = Depends(resolve_access_token),
 ) -> list[Process]:
     with uow:
-        return uow.processes.get_all(include_deleted)
+        return list_items(uow.processes, list_params, response, include_deleted)
 
 
 @router.get(
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
+from app.database.heartbeats import resource_heartbeats
 from app.database.models import Resource, AccessToken
 
 
 from app.services import ResourceService
-from app.database.unit_of_work import AbstractUnitOfWork
-
-from .schemas import ResourceCreate, ResourceUpdate
-from .dependencies import get_resource_service, resolve_access_token, get_unit_of_work
+from app.database.unit_of_work import AbstractUnitOfWork, AsyncUnitOfWork
+
+from .schemas import ListParams, ResourceCreate, ResourceUpdate
+from .dependencies import (
+    get_resource_service,
+    resolve_access_token,
+    resolve_access_token_async,
+    get_unit_of_work,
+    get_async_unit_of_work,
+    get_list_params,
+)
 
-from . import error_descriptions
+from . import error_descriptions, list_items
 
 router = APIRouter(prefix="/resources", tags=["Resources"])
 
@@ -31,6 +39,20 @@ def get_resource(
         return resource
 
 
+async def get_resource_async(
+    resource_id: int, uow: AsyncUnitOfWork = Depends(get_async_unit_of_work)
+) -> Resource:
+    resource = await uow.resources.get(resource_id)
+
+    if resource is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+
+    if resource.deleted:
+        raise HTTPException(status_code=404, detail="Resource is unavailable")
+
+    return resource
+
+
 def get_resource_include_deleted(
     resource_id: int, uow: AbstractUnitOfWork = Depends(get_unit_of_work)
 ) -> Resource:
@@ -48,16 +70,15 @@ def get_resource_include_deleted(
 
 @router.get("", responses=error_descriptions("Resource", _403=True))
 def get_resources(
+    response: Response,
     include_deleted: bool = False,
+    list_params: ListParams = Depends(get_list_params),
     uow: AbstractUnitOfWork = Depends(get_unit_of_work),
-    service: ResourceService = Depends(get_resource_service),
     token: AccessToken = Depends(resolve_access_token),
 ) -> list[Resource]:
-    service.update_availability()
-
-    # Return all resources that are not deleted and have been seen in the last 10 minutes
+    # Read only, the scheduler detaches resources that stopped pinging
     with uow:
-        return uow.resources.get_all(include_deleted=include_deleted)
+        return list_items(uow.resources, list_params, response, include_deleted)
 
 
 @router.get(
@@ -84,7 +105,8 @@ def update_resource(
     if update.fqdn != resource.fqdn:
         raise HTTPException(status_code=400, detail="FQDN cannot be changed")
 
-    return service.enroll(update.fqdn, update.name, update.capabilities)
+    with uow:
+        return service.enroll(update.fqdn, update.name, update.capabilities)
 
 
 @router.put(
@@ -92,12 +114,14 @@ def update_resource(
     response_model=bool,
     responses=error_descriptions("Resource", _403=True, _404=True),
 )
-def ping_resource(
-    resource: Resource = Depends(get_resource_include_deleted),
-    service: ResourceService = Depends(get_resource_service),
-    token: AccessToken = Depends(resolve_access_token),
+async def ping_resource(
+    resource_id: int,
+    uow: AsyncUnitOfWork = Depends(get_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
 ) -> bool:
-    service.keep_alive(resource)
+    async with uow:
+        if not await resource_heartbeats.ping(uow.resources, resource_id):
+            raise HTTPException(status_code=404, detail="Resource not found")
 
     return True
 
@@ -105,7 +129,9 @@ def ping_resource(
 @router.post("", responses=error_descriptions("Resource", _403=True))
 def create_resource(
     resource: ResourceCreate,
+    uow: AbstractUnitOfWork = Depends(get_unit_of_work),
     service: ResourceService = Depends(get_resource_service),
     token: AccessToken = Depends(resolve_access_token),
 ) -> Resource:
-    return service.enroll(resource.fqdn, resource.name, resource.capabilities)
+    with uow:
+        return service.enroll(resource.fqdn, resource.name, resource.capabilities)
@@ -1,12 +1,13 @@
 import json
 
 from typing import Optional, Dict, Any
-from typing import Generic, TypeVar, List
+from typing import Generic, TypeVar, List, ClassVar
 from typing_extensions import Self
 from datetime import datetime
 from pydantic import BaseModel, Field, model_validator
 from cronsim import CronSim, CronSimError
 from app import enums
+from app.database.models import Credential, Process, Session
 
 class AccessTokenCreate(BaseModel):
     identifier: str
@@ -36,6 +37,24 @@ class WorkItemCreate(BaseModel):
     data: Dict = {}
     reference: Optional[str] = ""
 
+class WorkItemBulkError(BaseModel):
+    row: int
+    error: str
+
+class WorkItemBulkResult(BaseModel):
+    created: int = 0
+    failed: int = 0
+    complete: bool = True
+    errors: List[WorkItemBulkError] = []
+
+    # Only the first errors are returned to keep the response bounded
+    max_reported_errors: ClassVar[int] = 1000
+
+    def add_error(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append(WorkItemBulkError(row=row, error=error))
+
 class WorkItemUpdate(BaseModel):
     data: Optional[Dict] = None
     reference: Optional[str] = None
@@ -143,6 +162,13 @@ class SessionStatusUpdate(BaseModel):
 class SessionResourceUpdate(BaseModel):
     resource_id: Optional[int] = None
 
+class SessionBundle(BaseModel):
+    """A claimed session with everything a worker needs to run it."""
+    session: Session
+    process: Process
+    # The process's target credentials, None when it has none or they were deleted
+    credential: Optional[Credential] = None
+
 class AuditLogCreate(BaseModel):
     # Foreign key relationships (both nullable)
     session_id: Optional[int] = None
@@ -204,6 +230,7 @@ class AccessTokenRead(BaseModel):
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number, starting from 1")
     size: int = Field(50, ge=1, le=200, description="Number of items per page")
+    cursor: Optional[str] = Field(None, description="Cursor from a previous page, takes precedence over page")
 
 class SearchParams(BaseModel):
     search: Optional[str] = Field(None, description="Search term")
@@ -220,6 +247,12 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total_items: int
     total_pages: int
     items: List[T]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class ListParams(BaseModel):
+    limit: Optional[int] = Field(None, ge=1, le=1000, description="Maximum number of items, all items when omitted")
+    cursor: Optional[str] = Field(None, description="Cursor from the X-Next-Cursor or X-Prev-Cursor header of a previous response")
 
 class WorkqueueClear(BaseModel):
     workitem_status: Optional[enums.WorkItemStatus] = None
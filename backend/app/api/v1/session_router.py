@@ -1,15 +1,18 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from fastapi.exceptions import HTTPException
 
 
-from app.database.unit_of_work import AbstractUnitOfWork
+from app.config import settings
+from app.database.notifications import session_notifier
+from app.database.unit_of_work import AbstractUnitOfWork, AsyncUnitOfWork
 
 from app.database.models import Session, Process, Resource, AccessToken
 import app.enums as enums
 
 from .schemas import (
+    SessionBundle,
     SessionCreate,
     SessionStatusUpdate,
 )
@@ -19,15 +22,18 @@ from app.services import SessionService
 
 from .dependencies import (
     get_unit_of_work,
+    get_async_unit_of_work,
+    get_autocommit_async_unit_of_work,
     get_session_service,
     get_paginated_search_params,
     resolve_access_token,
+    resolve_access_token_async,
 )
 
 from . import error_descriptions
 
-# We borrow the get_resource function from the resource_router module to check for a valid resource
-from .resource_router import get_resource
+# We borrow the get_resource_async function from the resource_router module to check for a valid resource
+from .resource_router import get_resource_async
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
 
@@ -65,6 +71,7 @@ def get_sessions(
         paginated_search.pagination.size,
         paginated_search.search,
         include_deleted,
+        cursor=paginated_search.pagination.cursor,
     )
 
 
@@ -155,22 +162,68 @@ def create_session(
         return uow.sessions.create(data)
 
 
+WAIT_QUERY = Query(
+    0,
+    ge=0,
+    le=settings.session_max_wait,
+    description="Seconds to wait for a session to be dispatched to the resource",
+)
+
+
 @router.get(
     "/by_resource_id/{resource_id}",
     responses=error_descriptions("Session", _403=True, _204=True)
     | error_descriptions("Resource", _404=True),
 )
-def get_active_sessions_by_resource(
-    resource: Resource = Depends(get_resource),
-    uow: AbstractUnitOfWork = Depends(get_unit_of_work),
-    token: AccessToken = Depends(resolve_access_token),
+async def get_active_sessions_by_resource(
+    wait: int = WAIT_QUERY,
+    resource: Resource = Depends(get_resource_async),
+    uow: AsyncUnitOfWork = Depends(get_autocommit_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
 ) -> Session:
-    with uow:
-        session = uow.sessions.get_by_resource_id(resource.id)
-
-        if session is None:
-            raise HTTPException(status_code=204, detail="No active sessions")
-
+    async def get_active_session() -> Session | None:
+        session = await uow.sessions.get_by_resource_id(resource.id)
+        # No transaction stays open while the request waits
+        await uow.commit()
         return session
 
+    async with uow:
+        # The scheduler's commit notifies session_dispatched, which wakes the request
+        session = await session_notifier.poll(resource.id, get_active_session, wait)
+        return session if session is not None else Response(status_code=204)
 
+
+@router.post(
+    "/by_resource_id/{resource_id}/claim",
+    responses=error_descriptions("Session", _403=True, _204=True)
+    | error_descriptions("Resource", _404=True),
+)
+async def claim_session_by_resource(
+    wait: int = WAIT_QUERY,
+    resource: Resource = Depends(get_resource_async),
+    uow: AsyncUnitOfWork = Depends(get_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
+) -> SessionBundle:
+    """Start the new session dispatched to the resource and return it with its process and credentials.
+
+    The session moves from new to in progress in the same transaction that loads the
+    process and credentials, so a failed request leaves it new for the next claim.
+    """
+
+    async def claim() -> SessionBundle | None:
+        async with uow:
+            session = await uow.sessions.claim(resource.id)
+            if session is None:
+                return None
+
+            process = await uow.processes.get(session.process_id)
+            credential = None
+            if process.target_credentials_id:
+                credential = await uow.credentials.get(process.target_credentials_id)
+                if credential is not None and credential.deleted:
+                    credential = None
+
+            return SessionBundle(session=session, process=process, credential=credential)
+
+    bundle = await session_notifier.poll(resource.id, claim, wait)
+    return bundle if bundle is not None else Response(status_code=204)
@@ -1,34 +1,44 @@
-from fastapi import APIRouter, Depends, Response, Query
+from fastapi import APIRouter, Depends, Response, Query, Request
 from fastapi.exceptions import HTTPException
-from time import sleep
+from typing import Awaitable, Callable, TypeVar
 
 from sqlalchemy.exc import IntegrityError
 
 from app.database.models import Workqueue, WorkItem, AccessToken
 import app.enums as enums
 
-from app.database.unit_of_work import AbstractUnitOfWork
+from app.config import settings
+from app.database.notifications import workqueue_notifier
+from app.database.unit_of_work import AbstractUnitOfWork, AsyncUnitOfWork
 
 from .schemas import (
     WorkqueueClear,
     WorkqueueUpdate,
     WorkqueueCreate,
     WorkItemCreate,
+    WorkItemBulkResult,
     WorkqueueInformation,
     PaginatedSearchParams,
 )
 from .dependencies import (
     get_unit_of_work,
+    get_async_unit_of_work,
+    get_autocommit_async_unit_of_work,
     get_paginated_search_params,
     get_workqueue_service,
+    get_workitem_ingest_service,
     resolve_access_token,
+    resolve_access_token_async,
 )
 
 from app.api.v1.schemas import PaginatedResponse
-from app.services import WorkqueueService
+from app.services import WorkqueueService, WorkItemIngestService
+from app.services.workitem_ingest import get_parser
 
 router = APIRouter(prefix="/workqueues", tags=["Workqueues"])
 
+T = TypeVar("T")
+
 
 # Dependency Injection local to this router
 def get_workqueue(
@@ -44,6 +54,21 @@ def get_workqueue(
             raise HTTPException(status_code=410, detail="Workqueue is gone")
 
         return workqueue
+
+
+async def get_workqueue_async(
+    workqueue_id: int, uow: AsyncUnitOfWork = Depends(get_async_unit_of_work)
+) -> Workqueue:
+    workqueue = await uow.workqueues.get(workqueue_id)
+
+    if workqueue is None:
+        raise HTTPException(status_code=404, detail="Workqueue not found")
+
+    if workqueue.deleted:
+        raise HTTPException(status_code=410, detail="Workqueue is gone")
+
+    return workqueue
+
     
 def get_workqueue_by_name(
     workqueue_name: str, 
@@ -73,39 +98,10 @@ def get_workqueues(
 @router.get("/information")
 def get_workqueues_information(
     include_deleted: bool = False,
-    uow: AbstractUnitOfWork = Depends(get_unit_of_work),
+    service: WorkqueueService = Depends(get_workqueue_service),
     token: AccessToken = Depends(resolve_access_token),
 ) -> list[WorkqueueInformation]:
-    with uow:
-        workqueues = uow.workqueues.get_all(include_deleted)
-        result = []
-        for queue in workqueues:
-            queue_info = WorkqueueInformation(
-                id=queue.id,
-                name=queue.name,
-                description=queue.description,
-                enabled=queue.enabled,
-                new=uow.workqueues.get_workitem_count(
-                    queue.id, enums.WorkItemStatus.NEW
-                ),
-                in_progress=uow.workqueues.get_workitem_count(
-                    queue.id, enums.WorkItemStatus.IN_PROGRESS
-                ),
-                completed=uow.workqueues.get_workitem_count(
-                    queue.id, enums.WorkItemStatus.COMPLETED
-                ),
-                failed=uow.workqueues.get_workitem_count(
-                    queue.id, enums.WorkItemStatus.FAILED
-                ),
-                pending_user_action=uow.workqueues.get_workitem_count(
-                    queue.id, enums.WorkItemStatus.PENDING_USER_ACTION
-                ),
-            )
-
-            # Append to result
-            result.append(queue_info)
-
-        return result
+    return service.get_information(include_deleted)
 
 
 @router.get("/{workqueue_id}")
@@ -189,21 +185,89 @@ def adds_workitem(
         return uow.work_items.create(data)
 
 
-@router.get("/{workqueue_id}/next_item")
-def gets_next_workitem(
+@router.post(
+    "/{workqueue_id}/add_bulk",
+    openapi_extra={
+        "requestBody": {
+            "description": "A JSON array, newline delimited JSON or CSV with a header row. "
+            "Each record has a reference and a data object.",
+            "content": {
+                "application/json": {"example": [{"reference": "A-1", "data": {}}]},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def adds_workitems_bulk(
+    request: Request,
     workqueue: Workqueue = Depends(get_workqueue),
-    uow: AbstractUnitOfWork = Depends(get_unit_of_work),
+    service: WorkItemIngestService = Depends(get_workitem_ingest_service),
     token: AccessToken = Depends(resolve_access_token),
+) -> WorkItemBulkResult:
+    parser = get_parser(request.headers.get("content-type"))
+
+    if parser is None:
+        raise HTTPException(status_code=415, detail="Unsupported content type")
+
+    return await service.ingest(workqueue.id, parser(request.stream()))
+
+
+async def claim_with_wait(
+    claim: Callable[[], Awaitable[T]], workqueue_id: int, wait: int
+) -> T:
+    """Run a claim until it returns work items or `wait` seconds have passed.
+
+    Between attempts the request is parked until a work item is enqueued on the queue.
+    """
+    return await workqueue_notifier.poll(workqueue_id, claim, wait)
+
+
+WAIT_QUERY = Query(
+    0,
+    ge=0,
+    le=settings.workqueue_max_wait,
+    description="Seconds to wait for a work item when the queue is empty",
+)
+
+
+@router.get("/{workqueue_id}/next_item")
+async def gets_next_workitem(
+    wait: int = WAIT_QUERY,
+    workqueue: Workqueue = Depends(get_workqueue_async),
+    # Each claim attempt commits, so no transaction stays open while the request waits
+    uow: AsyncUnitOfWork = Depends(get_autocommit_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
 ) -> WorkItem:
     
     if not workqueue.enabled:
         return Response(status_code=204)
 
-    with uow:
-        item = uow.work_items.get_next_item(workqueue.id)
+    async with uow:
+        item = await claim_with_wait(
+            lambda: uow.work_items.get_next_item(workqueue.id), workqueue.id, wait
+        )
         return item if item is not None else Response(status_code=204)
 
 
+@router.get("/{workqueue_id}/next_items")
+async def gets_next_workitems(
+    count: int = Query(10, ge=1, le=100, description="Maximum number of work items to claim"),
+    wait: int = WAIT_QUERY,
+    workqueue: Workqueue = Depends(get_workqueue_async),
+    uow: AsyncUnitOfWork = Depends(get_autocommit_async_unit_of_work),
+    token: AccessToken = Depends(resolve_access_token_async),
+) -> list[WorkItem]:
+    if not workqueue.enabled:
+        return Response(status_code=204)
+
+    async with uow:
+        items = await claim_with_wait(
+            lambda: uow.work_items.get_next_items(workqueue.id, count), workqueue.id, wait
+        )
+        return items if items else Response(status_code=204)
+
+
 @router.get("/{workqueue_id}/items")
 def get_work_items(
     workqueue: Workqueue = Depends(get_workqueue),
@@ -216,6 +280,7 @@ def get_work_items(
         paginated_search.pagination.page,
         paginated_search.pagination.size,
         paginated_search.search,
+        cursor=paginated_search.pagination.cursor,
     )
 
 
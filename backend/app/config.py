@@ -12,12 +12,63 @@ class Settings(BaseSettings):
     encryption_key: str = "set me in the env file"
     password_salt: str = "set me in the env file"
     test_database_url: str = "postgresql://localhost:5432/ats_test"
+
+    # Connection pool size per engine. The sync and async engines each have their own pool.
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
     
-    # Scheduler configuration
+    # Scheduler configuration. scheduler_enabled runs the scheduler inside the API process,
+    # disable it when the scheduler runs standalone with `python -m app.scheduler`.
     scheduler_enabled: bool = True
     scheduler_interval: int = 10  # seconds between scheduler runs
     scheduler_error_backoff: int = 30  # seconds to wait after scheduler errors
     scheduler_max_parameter_length: int = 1000  # maximum parameter length
+    scheduler_misfire_grace_time: int = 60  # seconds a cron trigger may run late before the run is skipped
+    scheduler_shutdown_timeout: int = 30  # seconds to wait for a running tick on shutdown
+    scheduler_metrics_port: int = 0  # metrics port of the standalone scheduler, 0 disables it
+
+    # Only the scheduler holding the lease runs, so several API replicas can each start one.
+    # A standby takes over within this many seconds after the leader stops renewing, so it
+    # must be longer than the slowest scheduler tick.
+    scheduler_lease_ttl: int = 30
+    # Split trigger evaluation over all running schedulers by consistent hashing of trigger
+    # ids. The leader still does housekeeping and dispatches sessions to resources.
+    scheduler_sharding: bool = False
+    # Assign all pending sessions of a tick together, matching as many as possible, instead
+    # of giving each session in turn the best resource that is still free.
+    scheduler_batch_assignment: bool = False
+
+    # A resource's pings are a lease: when none arrives for this many seconds, the scheduler
+    # detaches the resource, fails its session in progress and requeues its new sessions.
+    # Must be longer than the worker ping interval plus the flush interval. The default
+    # covers workers that still ping every 120 seconds, lower it to 30 once all ping every 10.
+    resource_heartbeat_ttl: int = 300
+    resource_heartbeat_flush_interval: float = 2  # seconds pings are buffered before they are written
+
+    # Access token cache configuration
+    access_token_cache_ttl: int = 30  # seconds before a revoked token is rejected by other replicas
+    access_token_cache_size: int = 10000  # maximum number of cached token lookups
+
+    # Workqueue counters are recomputed at most this often (seconds)
+    workqueue_counts_cache_ttl: int = 5
+
+    # Number of work items written per INSERT statement during bulk ingest
+    workitem_bulk_batch_size: int = 1000
+
+    # Maximum number of log entries accepted by a single /audit-logs/batch request
+    auditlog_batch_max_size: int = 1000
+
+    # Audit log partitions are monthly. Retention drops whole months, 0 keeps logs forever.
+    auditlog_partition_months_ahead: int = 3
+    auditlog_retention_days: int = 0
+    auditlog_partition_check_interval: int = 3600  # seconds between partition maintenance runs
+
+    # Long polling for work items
+    workqueue_max_wait: int = 60  # maximum seconds a next_item request may wait
+    workqueue_wait_fallback_interval: int = 2  # re-check interval when LISTEN is unavailable, also for sessions
+
+    # Long polling for the session dispatched to a resource
+    session_max_wait: int = 60  # maximum seconds a by_resource_id request may wait
     
 
 settings = Settings()
@@ -0,0 +1,93 @@
+"""
+Coalesced resource heartbeats.
+
+Workers ping their resource every few seconds, and a resource that has not pinged for
+resource_heartbeat_ttl seconds is detached by the scheduler. Writing every ping would cost
+one UPDATE per worker per interval, so pings are kept in memory instead and a background
+task writes all of them every resource_heartbeat_flush_interval seconds in one statement.
+
+Only the first ping of a resource in this process is written right away, which tells
+whether the resource exists, so pings for unknown resources still get a 404.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.cache import TTLCache
+from app.config import settings
+from app.database.repository import AsyncResourceRepository
+from app.database.session import async_engine
+from app.metrics import RESOURCE_PINGS
+
+logger = logging.getLogger(__name__)
+
+# Seconds a resource is known to exist before its next ping is written right away again
+KNOWN_RESOURCE_TTL = 300
+
+
+class HeartbeatBuffer:
+    """The last ping of each resource that has not been written yet."""
+
+    def __init__(self):
+        self._last_seen: dict[int, datetime] = {}
+        self._known = TTLCache(ttl=KNOWN_RESOURCE_TTL, maxsize=100_000)
+
+    async def ping(self, repository: AsyncResourceRepository, resource_id: int) -> bool:
+        """Record a ping. Returns False when the resource does not exist."""
+        if self._known.contains(resource_id):
+            self._last_seen[resource_id] = datetime.now()
+            RESOURCE_PINGS.labels("buffered").inc()
+            return True
+
+        if not await repository.keep_alive(resource_id):
+            return False
+
+        self._known.set(resource_id, True)
+        RESOURCE_PINGS.labels("direct").inc()
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._last_seen)
+
+    async def flush(self, repository: AsyncResourceRepository) -> int:
+        """Write the buffered pings in one statement. Returns the number of resources written.
+
+        On failure the pings are kept for the next flush, unless a newer ping came in.
+        """
+        last_seen, self._last_seen = self._last_seen, {}
+        if not last_seen:
+            return 0
+
+        try:
+            found = await repository.keep_alive_many(last_seen)
+        except Exception:
+            for resource_id, seen in last_seen.items():
+                self._last_seen.setdefault(resource_id, seen)
+            raise
+
+        # A resource that no longer exists is checked again on its next ping
+        for resource_id in last_seen.keys() - set(found):
+            self._known.pop(resource_id)
+
+        return len(found)
+
+    async def flush_now(self) -> None:
+        """Flush on a session of its own, logging failures."""
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                await self.flush(AsyncResourceRepository(session))
+        except Exception as e:
+            logger.error(f"Failed to write {self.pending} resource pings: {e}")
+
+    async def run(self) -> None:
+        """Flush every resource_heartbeat_flush_interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(settings.resource_heartbeat_flush_interval)
+            await self.flush_now()
+
+
+resource_heartbeats = HeartbeatBuffer()
@@ -111,6 +111,9 @@ class Trigger(Base, table=True):
 
     last_triggered: typing.Optional[datetime] = None
 
+    # When a cron or date trigger is due next. Kept current by the TriggerRepository
+    next_fire_at: typing.Optional[datetime] = None
+
     created_at: datetime = Field(default_factory=lambda: datetime.now())
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
 
@@ -195,6 +198,16 @@ class Session(Base, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.now())
 
 
+class SchedulerLease(Base, table=True):
+    # One row per lease. Only the replica holding the "scheduler" lease runs the scheduler.
+    name: str = Field(primary_key=True)
+    holder: str
+
+    acquired_at: datetime
+    renewed_at: datetime
+    expires_at: datetime
+
+
 class SystemLog(Base, table=True):
     id: typing.Optional[int] = Field(default=None, primary_key=True)
     message: str
@@ -234,13 +247,14 @@ class AuditLog(Base, table=True):
     event_timestamp: datetime  # When the logged event actually occurred
     created_at: datetime = Field(
         default_factory=lambda: datetime.now()
-    )  # DB insertion time
+    )  # DB insertion time, the table is partitioned by month on it
 
 
 class AccessToken(Base, table=True):
     id: int = Field(default=None, primary_key=True)
     identifier: str = Field(index=True, unique=True)
     access_token: str = Field(index=True, unique=True)
+    token_hash: str = Field(index=True, unique=True)
 
     expires_at: datetime = None
 
@@ -0,0 +1,180 @@
+"""
+Postgres LISTEN/NOTIFY integration.
+
+Database triggers issue NOTIFY with an id as payload:
+
+- on `workitem_enqueued` with the workqueue id, whenever a work item becomes NEW
+- on `session_dispatched` with the resource id, whenever a new session is dispatched
+
+Each API process listens on one dedicated connection per channel and wakes the requests
+waiting for that id, so waiting workers are woken across replicas without polling.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, TypeVar
+
+import psycopg2
+
+from app.config import settings
+from app.database.session import engine
+
+logger = logging.getLogger(__name__)
+
+WORKITEM_CHANNEL = "workitem_enqueued"
+SESSION_CHANNEL = "session_dispatched"
+
+T = TypeVar("T")
+
+# Seconds to wait before trying to re-establish a failed listener connection
+RECONNECT_DELAY = 30
+
+
+class Notifier:
+    """Lets async requests wait until a notification for an id arrives on a channel."""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._waiters: dict[int, set[asyncio.Event]] = {}
+        self._connection = None
+        self._connecting: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._retry_at = 0.0
+
+    @contextmanager
+    def subscribe(self, key: int) -> Iterator[asyncio.Event]:
+        """Register interest in an id. Subscribe before checking for work to not miss a wake-up."""
+        self._ensure_listening()
+
+        event = asyncio.Event()
+        self._waiters.setdefault(key, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters.get(key, set())
+            waiters.discard(event)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait for a wake-up. Without a listener the wait is capped so callers re-check the queue."""
+        if self._connection is None:
+            timeout = min(timeout, settings.workqueue_wait_fallback_interval)
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def poll(self, key: int, fetch: Callable[[], Awaitable[T]], wait: float) -> T:
+        """Run `fetch` until it returns something or `wait` seconds have passed.
+
+        Between attempts the request is parked until a notification for `key` arrives.
+        """
+        deadline = time.monotonic() + wait
+
+        while True:
+            with self.subscribe(key) as notified:
+                result = await fetch()
+                remaining = deadline - time.monotonic()
+
+                if result or remaining <= 0:
+                    return result
+
+                await self.wait(notified, remaining)
+
+    def notify(self, key: int) -> None:
+        for event in self._waiters.get(key, ()):
+            event.set()
+
+    def close(self) -> None:
+        # A connection still being opened is closed by _listen once it notices
+        self._connecting = None
+
+        if self._connection is None:
+            return
+
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+            self._connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing notification listener: {e}")
+
+        self._connection = None
+        self._loop = None
+
+    def _ensure_listening(self) -> None:
+        """Start listening in the background, the requests poll until the listener is up."""
+        loop = asyncio.get_running_loop()
+
+        if self._loop is loop and (self._connection is not None or self._connecting is not None):
+            return
+
+        if time.monotonic() < self._retry_at:
+            return
+
+        self.close()
+        self._loop = loop
+        self._connecting = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        task = asyncio.current_task()
+
+        try:
+            connection = await asyncio.to_thread(self._connect)
+        except Exception as e:
+            logger.warning(f"Could not listen on {self.channel}, falling back to polling: {e}")
+            if self._connecting is task:
+                self._connecting = None
+                self._retry_at = time.monotonic() + RECONNECT_DELAY
+            return
+
+        if self._connecting is not task:
+            connection.close()
+            return
+
+        self._connecting = None
+        self._connection = connection
+        self._loop.add_reader(connection.fileno(), self._on_readable)
+
+    def _connect(self):
+        """Open the listener connection, outside the connection pool so it cannot wait on it."""
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        connection = psycopg2.connect(*cargs, **cparams)
+
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+        except Exception:
+            connection.close()
+            raise
+
+        return connection
+
+    def _on_readable(self) -> None:
+        try:
+            self._connection.poll()
+        except Exception as e:
+            logger.error(f"Notification listener on {self.channel} failed: {e}")
+            self.close()
+            self._wake_all()
+            return
+
+        while self._connection.notifies:
+            notification = self._connection.notifies.pop(0)
+            try:
+                self.notify(int(notification.payload))
+            except ValueError:
+                logger.warning(f"Ignoring notification with payload {notification.payload!r}")
+
+    def _wake_all(self) -> None:
+        for key in list(self._waiters):
+            self.notify(key)
+
+
+workqueue_notifier = Notifier(WORKITEM_CHANNEL)
+session_notifier = Notifier(SESSION_CHANNEL)
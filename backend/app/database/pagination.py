@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with a WHERE clause on the sort key of the last row seen instead of an
+OFFSET, so fetching a page costs the same no matter how deep it is. The sort key must be
+unique, which is why it always ends with the primary key.
+
+Cursors are opaque to clients: a url-safe base64 encoding of the sort key values of the
+row to continue from and the direction to continue in.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Generic, NamedTuple, Sequence, TypeVar
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import Session
+from sqlmodel.sql.expression import SelectOfScalar
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor was not produced for the sort key it is used with."""
+
+
+class Page(NamedTuple, Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(values: Sequence, backwards: bool = False) -> str:
+    payload = json.dumps(
+        {"k": list(values), "b": backwards},
+        default=lambda value: value.isoformat(),
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, keys: Sequence[InstrumentedAttribute]
+) -> tuple[list, bool]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values, backwards = payload["k"], payload["b"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursorError("Invalid cursor")
+
+    return [_decode_value(key, value) for key, value in zip(keys, values)], bool(backwards)
+
+
+def _decode_value(key: InstrumentedAttribute, value):
+    python_type = key.type.python_type
+
+    try:
+        if python_type is datetime and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+
+    if not isinstance(value, python_type):
+        raise InvalidCursorError("Invalid cursor")
+
+    return value
+
+
+def paginate(
+    session: Session,
+    query: SelectOfScalar[T],
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    cursor: str | None = None,
+    skip: int = 0,
+    descending: bool = False,
+) -> Page[T]:
+    """Fetch one page of `query` ordered by `keys`.
+
+    With a cursor the page continues from the row it was made from and `skip` is ignored.
+    Without one, the first `skip` rows are skipped, so offset based clients get cursors
+    they can switch to.
+    """
+    backwards = False
+    if cursor:
+        values, backwards = decode_cursor(cursor, keys)
+        query = query.where(_beyond(keys, values, descending != backwards))
+    elif skip:
+        query = query.offset(skip)
+
+    reverse = descending != backwards
+    query = query.order_by(*(key.desc() if reverse else key.asc() for key in keys))
+
+    items = list(session.exec(query.limit(limit + 1)).all())
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    if backwards:
+        items.reverse()
+
+    has_next = True if backwards else has_more
+    has_prev = has_more if backwards else bool(cursor or skip)
+
+    if not items:
+        return Page(items)
+
+    return Page(
+        items,
+        next_cursor=_cursor_for(items[-1], keys) if has_next else None,
+        prev_cursor=_cursor_for(items[0], keys, backwards=True) if has_prev else None,
+    )
+
+
+def _beyond(keys: Sequence[InstrumentedAttribute], values: list, descending: bool):
+    # Row comparison lets Postgres seek directly in a composite index on the keys
+    row, bound = tuple_(*keys), tuple_(*values)
+    return row < bound if descending else row > bound
+
+
+def _cursor_for(item, keys: Sequence[InstrumentedAttribute], backwards: bool = False) -> str:
+    return encode_cursor([getattr(item, key.key) for key in keys], backwards)
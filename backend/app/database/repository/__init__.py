@@ -1,4 +1,13 @@
-from .access_token_repository import AccessTokenRepository as AccessTokenRepository
+from .database_repository import (
+    AsyncDatabaseRepository as AsyncDatabaseRepository,
+    UNIT_OF_WORK as UNIT_OF_WORK,
+    in_unit_of_work as in_unit_of_work,
+)
+
+from .access_token_repository import (
+    AccessTokenRepository as AccessTokenRepository,
+    AsyncAccessTokenRepository as AsyncAccessTokenRepository,
+)
 
 from .credential_repository import (
     CredentialRepository as CredentialRepository,
@@ -19,22 +28,28 @@ from .process_repository import (
 from .resource_repository import (
     ResourceRepository as ResourceRepository,
     AbstractResourceRepository as AbstractResourceRepository,
+    AsyncResourceRepository as AsyncResourceRepository,
 )
 
 from .session_repository import (
     SessionRepository as SessionRepository,
     AbstractSessionRepository as AbstractSessionRepository,
+    AsyncSessionRepository as AsyncSessionRepository,
 )
 
 from .auditlog_repository import (
     AuditLogRepository as AuditLogRepository,
     AbstractAuditLogRepository as AbstractAuditLogRepository,
+    AsyncAuditLogRepository as AsyncAuditLogRepository,
 )
 
 
 from .trigger_repository import (
     TriggerRepository as TriggerRepository,
     AbstractTriggerRepository as AbstractTriggerRepository,
+    TIME_TRIGGER_TYPES as TIME_TRIGGER_TYPES,
+    next_fire_time as next_fire_time,
+    with_next_fire_at as with_next_fire_at,
 )
 
 from .workqueue_repository import (
@@ -45,4 +60,9 @@ from .workqueue_repository import (
 from .workitem_repository import (
     WorkItemRepository as WorkItemRepository,
     AbstractWorkItemRepository as AbstractWorkItemRepository,
+    AsyncWorkItemRepository as AsyncWorkItemRepository,
+)
+
+from .scheduler_lease_repository import (
+    SchedulerLeaseRepository as SchedulerLeaseRepository,
 )
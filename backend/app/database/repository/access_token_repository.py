@@ -1,9 +1,24 @@
 import secrets
 from datetime import datetime, timedelta
-from sqlmodel import Session
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.database.models import AccessToken
-from .database_repository import DatabaseRepository
+from app.security import hash_token, invalidate_token
+from .database_repository import AsyncDatabaseRepository, DatabaseRepository
+
+
+def select_by_token(token: str):
+    """Look up a non-deleted token through the unique index on its hash."""
+    return (
+        select(AccessToken)
+        .where(AccessToken.token_hash == hash_token(token))
+        .where(AccessToken.deleted == False)  # noqa: E712
+    )
+
+
+select_any_token = select(AccessToken.id).where(AccessToken.deleted == False).limit(1)  # noqa: E712
+
 
 class AccessTokenRepository(DatabaseRepository[AccessToken]):
     def __init__(self, session: Session) -> None:
@@ -17,6 +32,12 @@ class AccessTokenRepository(DatabaseRepository[AccessToken]):
             .first()
         )
 
+    def get_by_token(self, token: str) -> AccessToken | None:
+        return self.session.scalars(select_by_token(token)).first()
+
+    def has_tokens(self) -> bool:
+        return self.session.scalars(select_any_token).first() is not None
+
     def create(self, identifier: str) -> AccessToken:
         # Generate a random 128 character string for the token
         token = secrets.token_urlsafe(128)
@@ -25,8 +46,26 @@ class AccessTokenRepository(DatabaseRepository[AccessToken]):
             identifier=identifier,
             expires_at=datetime.now() + timedelta(weeks=52),
             access_token=token,
+            token_hash=hash_token(token),
         )
         self.session.add(access_token)
+        # Commits even inside a unit of work, the cached miss must not outlive the token
         self.session.commit()
-        self.session.refresh(access_token)
+        invalidate_token(access_token.token_hash)
         return access_token
+
+    def delete(self, instance: AccessToken) -> AccessToken:
+        access_token = super().delete(instance)
+        invalidate_token(access_token.token_hash)
+        return access_token
+
+
+class AsyncAccessTokenRepository(AsyncDatabaseRepository[AccessToken]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(AccessToken, session)
+
+    async def get_by_token(self, token: str) -> AccessToken | None:
+        return (await self.session.scalars(select_by_token(token))).first()
+
+    async def has_tokens(self) -> bool:
+        return (await self.session.scalars(select_any_token)).first() is not None
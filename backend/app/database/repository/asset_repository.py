@@ -11,5 +11,10 @@ class AssetRepository(DatabaseRepository[Asset]):
     def __init__(self, session: Session) -> None:
         super().__init__(Asset, session)
 
+    @property
+    def page_keys(self) -> tuple:
+        # Pages follow the alphabetical order of the full listing
+        return (Asset.name, Asset.id)
+
     def get_by_name(self, name: str) -> Asset:
         return self.session.exec(select(Asset).filter(Asset.name == name)).first()
\ No newline at end of file
@@ -1,11 +1,34 @@
+from datetime import date, datetime, timedelta
 from typing import List, Optional
 
+from sqlalchemy import text
 from sqlalchemy.sql import func
-from sqlmodel import Session, select
+from sqlmodel import Session, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database.models import AuditLog
+from app.database.models import AuditLog, WorkItem
+from app.database.models import Session as SessionModel
+from app.database.pagination import Page, paginate
+
+from .database_repository import AsyncDatabaseRepository, DatabaseRepository, AbstractRepository
+
+# Allowed difference between the clocks of API replicas writing sessions, work items and logs
+CLOCK_SKEW_MARGIN = timedelta(days=1)
+
+
+def created_since(model, id: int):
+    """Bound AuditLog.created_at by the creation time of the session or work item logged to.
+
+    Logs are never written before their session or work item, and the bound lets Postgres
+    skip the audit log partitions from before it.
+    """
+    created_at = select(model.created_at - CLOCK_SKEW_MARGIN).where(model.id == id)
+    return AuditLog.created_at >= created_at.scalar_subquery()
+
+
+def partition_name(month: date) -> str:
+    return f"auditlog_{month:%Y_%m}"
 
-from .database_repository import DatabaseRepository, AbstractRepository
 
 class AbstractAuditLogRepository(AbstractRepository[AuditLog]):
     def get_paginated(
@@ -15,7 +38,8 @@ class AbstractAuditLogRepository(AbstractRepository[AuditLog]):
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[AuditLog], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[AuditLog], int]:
         raise NotImplementedError
     
     def get_logs_by_session_id(
@@ -35,6 +59,15 @@ class AbstractAuditLogRepository(AbstractRepository[AuditLog]):
     def get_logs_by_workitem_id(self, workitem_id: int) -> List[AuditLog]:
         raise NotImplementedError
 
+    def get_partition_months(self) -> List[date]:
+        raise NotImplementedError
+
+    def create_partition(self, month: date) -> None:
+        raise NotImplementedError
+
+    def drop_partition(self, month: date) -> None:
+        raise NotImplementedError
+
 
 class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog]):
     def __init__(self, session: Session) -> None:
@@ -47,9 +80,11 @@ class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[AuditLog], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[AuditLog], int]:
         query = select(AuditLog).where(
-            AuditLog.session_id == session_id
+            AuditLog.session_id == session_id,
+            created_since(SessionModel, session_id),
         )
 
         if search:
@@ -63,8 +98,11 @@ class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog
             
         total_count = self.session.exec(count_query).first()
 
+        # Logs are shown in the order the events occurred
+        keys = (AuditLog.event_timestamp, AuditLog.id)
+
         return (
-            list(self.session.exec(query.offset(skip).limit(limit)).all()),
+            paginate(self.session, query, keys, limit, cursor, skip),
             total_count,
         )
 
@@ -76,7 +114,8 @@ class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog
         limit: int = 10,
     ) -> List[AuditLog]:
         query = select(AuditLog).where(
-            AuditLog.session_id == session_id
+            AuditLog.session_id == session_id,
+            created_since(SessionModel, session_id),
         )
 
         if search:
@@ -88,7 +127,10 @@ class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog
     def count_logs_by_session_id(
         self, session_id: int, search: Optional[str] = None
     ) -> int:
-        query = select(func.count()).where(AuditLog.session_id == session_id)
+        query = select(func.count()).where(
+            AuditLog.session_id == session_id,
+            created_since(SessionModel, session_id),
+        )
 
         if search:
             query = query.where(AuditLog.message.contains(search))
@@ -99,5 +141,78 @@ class AuditLogRepository(AbstractAuditLogRepository, DatabaseRepository[AuditLog
         return self.session.scalars(
             select(AuditLog)
             .where(AuditLog.workitem_id == workitem_id)
+            .where(created_since(WorkItem, workitem_id))
             .order_by(AuditLog.created_at)
         ).all()
+
+    def get_partition_months(self) -> List[date]:
+        """The months that have an audit log partition, oldest first."""
+        names = self.session.exec(
+            text("""
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = 'auditlog'::regclass
+            """)
+        ).scalars()
+
+        months = [
+            datetime.strptime(name, "auditlog_%Y_%m").date()
+            for name in names
+            if name != "auditlog_default"
+        ]
+        return sorted(months)
+
+    def create_partition(self, month: date) -> None:
+        """Create the month's partition, moving its logs over from the default partition.
+
+        Logs written while maintenance was behind land in auditlog_default, and a partition
+        cannot be created while the default one holds rows for its range. The new partition
+        is filled with them first and then attached, in one transaction that locks the
+        default partition throughout.
+        """
+        name = partition_name(month)
+        start = month.isoformat()
+        end = (month + timedelta(days=32)).replace(day=1).isoformat()
+
+        self.session.exec(text(f"CREATE TABLE {name} (LIKE auditlog INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        # Hold back inserts until the partition is attached, else they land in the default
+        # partition again and the attach fails
+        self.session.exec(text("LOCK TABLE auditlog_default IN ACCESS EXCLUSIVE MODE"))
+        self.session.exec(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM auditlog_default WHERE created_at >= '{start}' AND created_at < '{end}' "
+                f"RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            )
+        )
+        self.session.exec(
+            text(f"ALTER TABLE auditlog ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+        )
+        # Commits even inside a unit of work, as the audit log table stays locked until then
+        self.session.commit()
+
+    def drop_partition(self, month: date) -> None:
+        self.session.exec(text(f"DROP TABLE IF EXISTS {partition_name(month)}"))
+        self.session.commit()
+
+
+class AsyncAuditLogRepository(AsyncDatabaseRepository[AuditLog]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(AuditLog, session)
+
+    async def create(self, data: dict) -> AuditLog:
+        # The generated id is returned by the INSERT, so there is nothing to refresh
+        log_entry = AuditLog(**data)
+        self.session.add(log_entry)
+        await self._commit()
+        return log_entry
+
+    async def bulk_create(self, rows: list[dict]) -> None:
+        """Insert many log entries with one INSERT statement and a single commit."""
+        created_at = datetime.now()
+        await self.session.execute(
+            insert(AuditLog), [{"created_at": created_at, **row} for row in rows]
+        )
+        await self._commit()
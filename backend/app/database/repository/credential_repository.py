@@ -11,5 +11,10 @@ class CredentialRepository(DatabaseRepository[Credential]):
     def __init__(self, session: Session) -> None:
         super().__init__(Credential, session)
 
+    @property
+    def page_keys(self) -> tuple:
+        # Pages follow the alphabetical order of the full listing
+        return (Credential.name, Credential.id)
+
     def get_by_name(self, name: str) -> Credential:
         return self.session.exec(select(Credential).filter(Credential.name == name)).first()
\ No newline at end of file
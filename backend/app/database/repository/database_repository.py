@@ -1,13 +1,70 @@
 from typing import Generic, TypeVar
 from datetime import datetime
 
-from sqlalchemy import BinaryExpression
-from sqlmodel import Session, select
+from sqlalchemy import BinaryExpression, Select, any_, func, inspect
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.database.models import Base
+from app.database.pagination import Page, paginate
 
 Model = TypeVar("Model", bound=Base)
 
+# Session.info key counting the transactional units of work open on a session
+UNIT_OF_WORK = "unit_of_work"
+
+
+def in_unit_of_work(session: Session | AsyncSession) -> bool:
+    """Whether a transactional unit of work commits the writes made on the session."""
+    return session.info.get(UNIT_OF_WORK, 0) > 0
+
+
+def in_claimed(column, claimable: Select):
+    """`column = ANY(ARRAY(claimable))`, which runs the claiming subquery exactly once.
+
+    Postgres may run the subquery of `column IN (...)` again for rows changed meanwhile, so
+    a LIMIT ... FOR UPDATE SKIP LOCKED subquery could lock more rows than its limit.
+    """
+    return column == any_(func.array(claimable.scalar_subquery(), type_=ARRAY(column.type)))
+
+
+def changed_values(instance: Model, data: dict) -> dict:
+    """The columns in `data` whose value differs from the instance's, with their new values.
+
+    Other attributes in `data`, such as relationships, are set on the instance directly.
+    """
+    columns = inspect(type(instance)).column_attrs.keys()
+    changes = {}
+    for field, value in data.items():
+        if field not in columns:
+            setattr(instance, field, value)
+        elif getattr(instance, field) != value:
+            changes[field] = value
+
+    if changes and hasattr(instance, "updated_at"):
+        changes["updated_at"] = datetime.now()
+
+    return changes
+
+
+def update_statement(instance: Model, changes: dict):
+    """UPDATE of the changed columns only, returning the row to refresh the instance with.
+
+    The instance is only refreshed once the returned row is read.
+    """
+    model = type(instance)
+    mapper = inspect(model)
+    identity = mapper.primary_key_from_instance(instance)
+
+    return (
+        update(model)
+        .where(*(column == value for column, value in zip(mapper.primary_key, identity)))
+        .values(**changes)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
 
 class AbstractRepository(Generic[Model]):
     def create(self, data: dict) -> Model:
@@ -25,6 +82,11 @@ class AbstractRepository(Generic[Model]):
     def get_all(self) -> list[Model]:
         raise NotImplementedError
 
+    def get_page(
+        self, limit: int, cursor: str | None = None, include_deleted: bool = False
+    ) -> Page[Model]:
+        raise NotImplementedError
+
     def filter(
         self,
         *expressions: BinaryExpression,
@@ -38,38 +100,44 @@ class DatabaseRepository(AbstractRepository[Model]):
         self.model = model
         self.session = session
 
+    @property
+    def page_keys(self) -> tuple:
+        """Unique, indexed sort key used by get_page."""
+        return (self.model.id,)
+
     def create(self, data: dict) -> Model:
+        # The INSERT returns the generated id, the other columns are known already
         instance = self.model(**data)
         self.session.add(instance)
-        self.session.commit()
-        self.session.refresh(instance)
+        self._commit()
         return instance
 
     def get(self, pk: int) -> Model | None:
         return self.session.get(self.model, pk)
 
     def update(self, instance: Model, data: dict) -> Model:
-        for field, value in data.items():
-            setattr(instance, field, value)
+        """Write the changed columns in one UPDATE ... RETURNING, nothing if none changed.
 
-        if hasattr(instance, "updated_at"):
-            instance.updated_at = datetime.now()
+        Reading the returned row refreshes the instance in the session with the new values.
+        """
+        changes = changed_values(instance, data)
+        if not changes:
+            return instance
 
-        self.session.commit()
-        self.session.refresh(instance)
-        return instance
+        updated = self.session.scalars(update_statement(instance, changes)).one()
+        self._commit()
+        return updated
 
     def delete(self, instance: Model) -> Model:
         # If self.model has a deleted field, set it to True
         if hasattr(instance, "deleted"):
-            setattr(instance, "deleted", True)
             return self.update(
                 instance, {"deleted": True, "updated_at": datetime.now()}
             )
 
         # Otherwise, delete the instance
         self.session.delete(instance)
-        self.session.commit()
+        self._commit()
         return instance
 
     def get_all(self, include_deleted=False) -> list[Model]:
@@ -80,6 +148,16 @@ class DatabaseRepository(AbstractRepository[Model]):
 
         return self.session.scalars(query).all()
 
+    def get_page(
+        self, limit: int, cursor: str | None = None, include_deleted: bool = False
+    ) -> Page[Model]:
+        query = select(self.model)
+
+        if hasattr(self.model, "deleted") and not include_deleted:
+            query = query.where(self.model.deleted == False)  # noqa: E712
+
+        return paginate(self.session, query, self.page_keys, limit, cursor)
+
     def filter(
         self,
         *expressions: BinaryExpression,
@@ -88,3 +166,47 @@ class DatabaseRepository(AbstractRepository[Model]):
         if expressions:
             query = query.where(*expressions)
         return list(self.session.scalars(query))
+
+    def _commit(self) -> None:
+        """Commit the writes, or only flush them while a unit of work holds the transaction.
+
+        The flush sends the writes and fills in generated ids, the unit of work commits
+        them once on exit. Sessions do not expire objects on commit, so nothing is reloaded.
+        """
+        if in_unit_of_work(self.session):
+            self.session.flush()
+        else:
+            self.session.commit()
+
+
+class AsyncDatabaseRepository(Generic[Model]):
+    """Async counterpart of DatabaseRepository, used by endpoints on the async session."""
+
+    def __init__(self, model: type[Model], session: AsyncSession) -> None:
+        self.model = model
+        self.session = session
+
+    async def create(self, data: dict) -> Model:
+        instance = self.model(**data)
+        self.session.add(instance)
+        await self._commit()
+        return instance
+
+    async def get(self, pk: int) -> Model | None:
+        return await self.session.get(self.model, pk)
+
+    async def update(self, instance: Model, data: dict) -> Model:
+        changes = changed_values(instance, data)
+        if not changes:
+            return instance
+
+        updated = (await self.session.scalars(update_statement(instance, changes))).one()
+        await self._commit()
+        return updated
+
+    async def _commit(self) -> None:
+        """Async version of DatabaseRepository._commit."""
+        if in_unit_of_work(self.session):
+            await self.session.flush()
+        else:
+            await self.session.commit()
@@ -1,11 +1,14 @@
 import abc
+from datetime import datetime
 
-from sqlmodel import Session, select, or_
+from sqlalchemy import DateTime, Integer, column, func, values
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.database.models import Resource, Session
 from app.enums import SessionStatus
 
-from .database_repository import DatabaseRepository, AbstractRepository
+from .database_repository import AsyncDatabaseRepository, DatabaseRepository, AbstractRepository
 
 
 class AbstractResourceRepository(AbstractRepository[Resource]):
@@ -21,6 +24,10 @@ class AbstractResourceRepository(AbstractRepository[Resource]):
     def is_resource_available(self, resource: Resource) -> bool:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def detach_stale(self, seen_before: datetime) -> list[int]:
+        raise NotImplementedError
+
 class ResourceRepository(AbstractResourceRepository, DatabaseRepository[Resource]):
     def __init__(self, session: Session) -> None:
         super().__init__(Resource, session)
@@ -31,21 +38,85 @@ class ResourceRepository(AbstractResourceRepository, DatabaseRepository[Resource
         ).first()
 
     def get_available_resources(self) -> list[Resource]:
-        resources = self.session.scalars(
+        """Resources that are not deleted and have no new or in progress session, in one query."""
+        return self.session.scalars(
             select(Resource)
             .where(Resource.deleted == False)  # noqa: E712
+            .where(~has_session(SessionStatus.NEW, SessionStatus.IN_PROGRESS))
         ).all()
-        
-        return [resource for resource in resources if self.is_resource_available(resource)]
 
     def is_resource_available(self, resource: Resource) -> bool:
-        
-        sessions = self.session.scalars(
-            select(Session)
-            .where(Session.resource_id == resource.id)
-            .where(or_(Session.status == SessionStatus.NEW, Session.status == SessionStatus.IN_PROGRESS))
+        return not self.session.scalar(
+            select(has_session(SessionStatus.NEW, SessionStatus.IN_PROGRESS, resource_id=resource.id))
+        )
+
+    def detach_stale(self, seen_before: datetime) -> list[int]:
+        """Delete resources last seen before `seen_before`, in one statement.
+
+        Their sessions are left to SessionRepository.flush_resources. Returns the ids of the
+        detached resources.
+        """
+        resource_ids = self.session.scalars(
+            update(Resource)
+            .where(Resource.deleted == False)  # noqa: E712
+            .where(Resource.last_seen < seen_before)
+            .values(available=False, deleted=True, updated_at=datetime.now())
+            .returning(Resource.id)
         ).all()
-        
-        return len(sessions) == 0
-        
-        
+
+        self._commit()
+        return resource_ids
+
+
+def has_session(*statuses: SessionStatus, resource_id=Resource.id):
+    """EXISTS clause for a session in one of `statuses` on the resource, correlated by default."""
+    return (
+        select(Session.id)
+        .where(Session.resource_id == resource_id)
+        .where(Session.status.in_(statuses))
+        .exists()
+    )
+
+
+class AsyncResourceRepository(AsyncDatabaseRepository[Resource]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(Resource, session)
+
+    async def keep_alive(self, resource_id: int) -> bool:
+        """Mark a resource as seen now, restoring it if deleted. False if it does not exist."""
+        now = datetime.now()
+        result = await self.session.execute(
+            update(Resource)
+            .where(Resource.id == resource_id)
+            .values(deleted=False, last_seen=now, updated_at=now)
+            .returning(Resource.id)
+        )
+        found = result.scalar_one_or_none() is not None
+
+        await self._commit()
+        return found
+
+    async def keep_alive_many(self, last_seen: dict[int, datetime]) -> list[int]:
+        """Write the last ping of many resources in one statement, restoring deleted ones.
+
+        last_seen only moves forward, so replicas flushing out of order do not set it back.
+        Returns the ids of the resources that exist.
+        """
+        pings = values(
+            column("id", Integer), column("last_seen", DateTime), name="ping"
+        ).data(list(last_seen.items()))
+
+        result = await self.session.execute(
+            update(Resource)
+            .where(Resource.id == pings.c.id)
+            .values(
+                deleted=False,
+                last_seen=func.greatest(Resource.last_seen, pings.c.last_seen),
+                updated_at=datetime.now(),
+            )
+            .returning(Resource.id)
+        )
+        found = result.scalars().all()
+
+        await self._commit()
+        return found
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.database.models import SchedulerLease
+
+
+def acquire_statement(name: str, holder: str, ttl: int):
+    """Insert the lease, or take it over when it is ours or has expired.
+
+    Times come from the database clock, so replicas with skewed clocks agree on when a
+    lease expires. Renewing keeps acquired_at, so it tells how long the holder has led.
+    """
+    now = func.localtimestamp()
+    statement = insert(SchedulerLease).values(
+        name=name,
+        holder=holder,
+        acquired_at=now,
+        renewed_at=now,
+        expires_at=now + timedelta(seconds=ttl),
+    )
+    renewing = SchedulerLease.holder == statement.excluded.holder
+
+    return statement.on_conflict_do_update(
+        index_elements=[SchedulerLease.name],
+        set_={
+            "holder": statement.excluded.holder,
+            "acquired_at": case((renewing, SchedulerLease.acquired_at), else_=statement.excluded.acquired_at),
+            "renewed_at": statement.excluded.renewed_at,
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=or_(renewing, SchedulerLease.expires_at < now),
+    ).returning(SchedulerLease)
+
+
+class SchedulerLeaseRepository:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def acquire(self, name: str, holder: str, ttl: int) -> SchedulerLease | None:
+        """Take or renew the lease for `ttl` seconds. Returns None when another holder has it."""
+        lease = self.session.scalars(acquire_statement(name, holder, ttl)).first()
+        self.session.commit()
+        return lease
+
+    def renew(self, name: str, holder: str, ttl: int) -> SchedulerLease | None:
+        """Renew the lease only while `holder` still has it, without committing.
+
+        The renewed row stays locked until the caller's transaction ends, so no other replica
+        can take the lease over before that transaction commits. Returns None when the lease
+        expired or went to another holder.
+        """
+        now = func.localtimestamp()
+        return self.session.scalars(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name)
+            .where(SchedulerLease.holder == holder)
+            .where(SchedulerLease.expires_at > now)
+            .values(renewed_at=now, expires_at=now + timedelta(seconds=ttl))
+            .returning(SchedulerLease)
+        ).first()
+
+    def release(self, name: str, holder: str) -> None:
+        """Give up the lease so another replica can take over without waiting for it to expire."""
+        self.session.exec(
+            delete(SchedulerLease)
+            .where(SchedulerLease.name == name)
+            .where(SchedulerLease.holder == holder)
+        )
+        self.session.commit()
+
+    def get(self, name: str) -> SchedulerLease | None:
+        return self.session.get(SchedulerLease, name)
+
+    def get_holders(self, prefix: str) -> list[str]:
+        """Holders of the unexpired leases whose name starts with `prefix`."""
+        return self.session.exec(
+            select(SchedulerLease.holder)
+            .where(SchedulerLease.name.startswith(prefix))
+            .where(SchedulerLease.expires_at > func.localtimestamp())
+            .order_by(SchedulerLease.holder)
+        ).all()
+
+    def now(self) -> datetime:
+        """The database clock, which lease times are compared against."""
+        return self.session.exec(select(func.localtimestamp())).one()
@@ -1,12 +1,17 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Optional
 
+from sqlalchemy import case, literal
 from sqlalchemy.sql import func
-from sqlmodel import Session as SqlSession, select, or_
+from sqlmodel import Session as SqlSession, select, or_, update
 
-from app.database.models import Process, Session, AuditLog
+from app.database.models import Process, Resource, Session, AuditLog
+from app.database.pagination import Page, paginate
 import app.enums as enums
 
-from .database_repository import DatabaseRepository, AbstractRepository
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .database_repository import AsyncDatabaseRepository, DatabaseRepository, AbstractRepository, in_claimed
 
 
 class AbstractSessionRepository(AbstractRepository[Session]):
@@ -22,13 +27,23 @@ class AbstractSessionRepository(AbstractRepository[Session]):
     def create_log(self, log_entry: dict) -> AuditLog:
         raise NotImplementedError
 
+    def release_orphaned(self) -> list[int]:
+        raise NotImplementedError
+
+    def fail_dangling(self, dispatched_before: datetime) -> list[int]:
+        raise NotImplementedError
+
+    def flush_resources(self, resource_ids: list[int]) -> list[int]:
+        raise NotImplementedError
+
     def get_paginated(
         self,
         search: Optional[str] = None,
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[Session], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[Session], int]:
         raise NotImplementedError
 
 
@@ -49,12 +64,7 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
         Returns:
             models.Session | None: The first active session for the given resource ID, or None if no such session exists.
         """
-        return self.session.scalars(
-            select(Session)
-            .where(Session.resource_id == resource_id)
-            .where(Session.status != enums.SessionStatus.COMPLETED)
-            .where(Session.status != enums.SessionStatus.FAILED)
-        ).first()
+        return self.session.scalars(active_on_resource(resource_id)).first()
 
     def get_new_sessions(self) -> list[Session]:
         """
@@ -93,6 +103,75 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
             .order_by(Session.created_at)
         ).all()
 
+    def release_orphaned(self) -> list[int]:
+        """
+        Releases new sessions dispatched to a deleted resource, so they are dispatched again.
+
+        Returns:
+            list[int]: The ids of the released sessions.
+        """
+        session_ids = self.session.scalars(
+            update(Session)
+            .where(Session.resource_id == Resource.id)
+            .where(Session.status == enums.SessionStatus.NEW)
+            .where(Session.deleted == False)  # noqa: E712
+            .where(Resource.deleted == True)  # noqa: E712
+            .values(resource_id=None, dispatched_at=None, updated_at=datetime.now())
+            .returning(Session.id)
+        ).all()
+
+        self._commit()
+        return session_ids
+
+    def fail_dangling(self, dispatched_before: datetime) -> list[int]:
+        """
+        Fails sessions in progress on a deleted resource that were dispatched before `dispatched_before`.
+
+        Returns:
+            list[int]: The ids of the failed sessions.
+        """
+        session_ids = self.session.scalars(
+            update(Session)
+            .where(Session.resource_id == Resource.id)
+            .where(Session.status == enums.SessionStatus.IN_PROGRESS)
+            .where(Session.deleted == False)  # noqa: E712
+            .where(Session.dispatched_at < dispatched_before)
+            .where(Resource.deleted == True)  # noqa: E712
+            .values(status=enums.SessionStatus.FAILED, updated_at=datetime.now())
+            .returning(Session.id)
+        ).all()
+
+        self._commit()
+        return session_ids
+
+    def flush_resources(self, resource_ids: list[int]) -> list[int]:
+        """
+        Detaches all active sessions from the given resources.
+
+        Sessions in progress are failed, new sessions are released to be dispatched again.
+
+        Returns:
+            list[int]: The ids of the detached sessions.
+        """
+        in_progress = Session.status == enums.SessionStatus.IN_PROGRESS
+        session_ids = self.session.scalars(
+            update(Session)
+            .where(Session.resource_id.in_(resource_ids))
+            .where(Session.status.in_([enums.SessionStatus.NEW, enums.SessionStatus.IN_PROGRESS]))
+            .where(Session.deleted == False)  # noqa: E712
+            .values(
+                # Typed like the column, so the enum is stored by name
+                status=case((in_progress, literal(enums.SessionStatus.FAILED, Session.status.type)), else_=Session.status),
+                dispatched_at=case((in_progress, Session.dispatched_at), else_=None),
+                resource_id=None,
+                updated_at=datetime.now(),
+            )
+            .returning(Session.id)
+        ).all()
+
+        self._commit()
+        return session_ids
+
     def create_log(self, log_entry: dict) -> AuditLog:
         """
         Creates a new session log entry.
@@ -108,7 +187,7 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
         """
         log_entry = AuditLog(**log_entry)
         self.session.add(log_entry)
-        self.session.commit()
+        self._commit()
 
         return log_entry
 
@@ -118,7 +197,8 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[Session], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[Session], int]:
         query = select(Session)
 
         if not include_deleted:
@@ -127,9 +207,6 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
         if search:
             query = query.join(Session.process).filter(Process.name.ilike(f"%{search}%"))
 
-        # Sort in descending order by default
-        query = query.order_by(Session.id.desc())
-
         count_query = select(func.count()).select_from(Session)
         if query.whereclause is not None:
             if search: # If search is active, the join to Process is active
@@ -139,7 +216,56 @@ class SessionRepository(AbstractSessionRepository, DatabaseRepository[Session]):
         
         total_count = self.session.exec(count_query).first()
 
+        # Newest sessions first
         return (
-            list(self.session.exec(query.offset(skip).limit(limit)).all()),
+            paginate(self.session, query, (Session.id,), limit, cursor, skip, descending=True),
             total_count,
         )
+
+
+def active_on_resource(resource_id: int):
+    """Sessions on the resource that are neither completed nor failed."""
+    return (
+        select(Session)
+        .where(Session.resource_id == resource_id)
+        .where(Session.status != enums.SessionStatus.COMPLETED)
+        .where(Session.status != enums.SessionStatus.FAILED)
+    )
+
+
+def claim_statement(resource_id: int):
+    """UPDATE ... RETURNING that moves the oldest new session on the resource to IN_PROGRESS."""
+    claimable = (
+        select(Session.id)
+        .where(Session.resource_id == resource_id)
+        .where(Session.status == enums.SessionStatus.NEW)
+        .where(Session.deleted == False)  # noqa: E712
+        .order_by(Session.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+    return (
+        update(Session)
+        .where(in_claimed(Session.id, claimable))
+        .values(status=enums.SessionStatus.IN_PROGRESS, updated_at=datetime.now())
+        .returning(Session)
+    )
+
+
+class AsyncSessionRepository(AsyncDatabaseRepository[Session]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(Session, session)
+
+    async def get_by_resource_id(self, resource_id: int) -> Session | None:
+        """The first new or in progress session on the resource, see SessionRepository."""
+        return (await self.session.scalars(active_on_resource(resource_id))).first()
+
+    async def claim(self, resource_id: int) -> Session | None:
+        """Start the new session dispatched to the resource, None when there is none.
+
+        Two workers claiming for the same resource never start the same session.
+        """
+        claimed = (await self.session.scalars(claim_statement(resource_id))).first()
+        await self._commit()
+        return claimed
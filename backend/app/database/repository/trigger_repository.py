@@ -1,14 +1,109 @@
-from sqlmodel import Session
+import logging
+from datetime import datetime
+
+from cronsim import CronSim, CronSimError
+from sqlalchemy import tuple_
+from sqlalchemy.sql import func
+from sqlmodel import Session, select
 
 from app.database.models import Trigger
+from app.enums import TriggerType
 
 from .database_repository import DatabaseRepository, AbstractRepository
 
+logger = logging.getLogger(__name__)
+
+TIME_TRIGGER_TYPES = (TriggerType.CRON, TriggerType.DATE)
+
+
+def next_fire_time(trigger: Trigger, after: datetime) -> datetime | None:
+    """When a time based trigger should fire next, strictly after `after` for cron triggers.
+
+    Workqueue triggers, disabled and deleted triggers are not scheduled.
+    """
+    if not trigger.enabled or trigger.deleted:
+        return None
+
+    if trigger.type == TriggerType.DATE:
+        return trigger.date
+
+    if trigger.type == TriggerType.CRON:
+        try:
+            return next(CronSim(trigger.cron, after))
+        except (CronSimError, StopIteration) as e:
+            logger.error(f"Cannot schedule cron trigger {trigger.id}: {e}")
+
+    return None
+
+
+def with_next_fire_at(trigger: Trigger, data: dict) -> dict:
+    """The changes in `data` plus the next_fire_at they lead to, unless it is given."""
+    # Any change to the schedule, the enabled flag or last_triggered moves next_fire_at
+    if "next_fire_at" in data:
+        return data
+
+    updated = Trigger(**{**trigger.model_dump(), **data})
+    return {**data, "next_fire_at": next_fire_time(updated, datetime.now())}
+
 
 class AbstractTriggerRepository(AbstractRepository[Trigger]):
-    pass
+    def get_due(self, now: datetime) -> list[Trigger]:
+        raise NotImplementedError
+
+    def get_workqueue_triggers(self) -> list[Trigger]:
+        raise NotImplementedError
+
+    def lock_unchanged(self, seen: list[tuple[int, datetime]]) -> list[int]:
+        raise NotImplementedError
+
+    def get_next_fire_at(self) -> datetime | None:
+        raise NotImplementedError
 
 
 class TriggerRepository(AbstractTriggerRepository, DatabaseRepository[Trigger]):
     def __init__(self, session: Session) -> None:
         super().__init__(Trigger, session)
+
+    def create(self, data: dict) -> Trigger:
+        next_fire_at = next_fire_time(Trigger(**data), datetime.now())
+        return super().create({**data, "next_fire_at": next_fire_at})
+
+    def update(self, instance: Trigger, data: dict) -> Trigger:
+        return super().update(instance, with_next_fire_at(instance, data))
+
+    def get_due(self, now: datetime) -> list[Trigger]:
+        """Enabled time based triggers whose next_fire_at has passed, earliest first."""
+        return self.session.scalars(
+            select(Trigger)
+            .where(Trigger.next_fire_at <= now)
+            .where(Trigger.enabled == True)  # noqa: E712
+            .where(Trigger.deleted == False)  # noqa: E712
+            .order_by(Trigger.next_fire_at)
+        ).all()
+
+    def get_workqueue_triggers(self) -> list[Trigger]:
+        return self.session.scalars(
+            select(Trigger)
+            .where(Trigger.type == TriggerType.WORKQUEUE)
+            .where(Trigger.enabled == True)  # noqa: E712
+            .where(Trigger.deleted == False)  # noqa: E712
+        ).all()
+
+    def lock_unchanged(self, seen: list[tuple[int, datetime]]) -> list[int]:
+        """Lock the triggers whose next_fire_at is still the one seen, in one statement.
+
+        Triggers locked by another transaction are skipped rather than waited for. The locks
+        are held until the caller's transaction ends. Returns the ids of the locked triggers.
+        """
+        return self.session.exec(
+            select(Trigger.id)
+            .where(tuple_(Trigger.id, Trigger.next_fire_at).in_(seen))
+            .with_for_update(skip_locked=True)
+        ).all()
+
+    def get_next_fire_at(self) -> datetime | None:
+        return self.session.exec(
+            select(func.min(Trigger.next_fire_at))
+            .where(Trigger.enabled == True)  # noqa: E712
+            .where(Trigger.deleted == False)  # noqa: E712
+        ).first()
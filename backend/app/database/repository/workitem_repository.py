@@ -3,21 +3,56 @@ import abc
 from datetime import datetime
 
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select, desc
+from sqlmodel import Session, select, desc, insert, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.database.models import WorkItem
 import app.enums as enums
 
-from .database_repository import DatabaseRepository, AbstractRepository
+from .database_repository import AsyncDatabaseRepository, DatabaseRepository, AbstractRepository, in_claimed
+
+def claim_statement(queue_id: int, count: int):
+    """UPDATE ... RETURNING that moves the oldest claimable items of a queue to IN_PROGRESS."""
+    claimable = (
+        select(WorkItem.id)
+        .where(WorkItem.workqueue_id == queue_id)
+        .where(WorkItem.locked == False)  # noqa: E712
+        .where(WorkItem.status == enums.WorkItemStatus.NEW)
+        .order_by(WorkItem.created_at)
+        .limit(count)
+        .with_for_update(skip_locked=True)  # Use skip_locked to avoid waiting for locked rows
+    )
+
+    now = datetime.now()
+    return (
+        update(WorkItem)
+        .where(in_claimed(WorkItem.id, claimable))
+        .values(
+            locked=True,
+            status=enums.WorkItemStatus.IN_PROGRESS,
+            started_at=now,
+            updated_at=now,
+        )
+        .returning(WorkItem)
+    )
+
 
 class AbstractWorkItemRepository(AbstractRepository[WorkItem]):
     @abc.abstractmethod
     def get_next_item(self, queue_id: int):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_next_items(self, queue_id: int, count: int) -> list[WorkItem]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_by_reference(self, reference: str, status: enums.WorkItemStatus | None = None) -> list[WorkItem]:
         raise NotImplementedError
+
+    @abc.abstractmethod
+    def bulk_create(self, rows: list[dict]) -> None:
+        raise NotImplementedError
   
 
 
@@ -27,49 +62,58 @@ class WorkItemRepository(DatabaseRepository[WorkItem]):
 
     def get_next_item(self, queue_id: int):
         """
-        Retrieves and locks the next available work item from a specified queue.
+        Claims the oldest available work item from a queue in a single statement.
 
-        This method selects the next available work item based on the provided
-        queue ID, marking the item as locked and updating its status to
-        IN_PROGRESS. It ensures atomicity through transaction management and
-        prioritizes items based on their creation timestamp.
+        The item is selected with FOR UPDATE SKIP LOCKED and moved to IN_PROGRESS
+        by the same UPDATE ... RETURNING, so a concurrent consumer skips it rather
+        than waiting for it or receiving it too.
 
         Parameters:
-            queue_id (int): The ID of the queue to retrieve the next work item from.
+            queue_id (int): The ID of the queue to claim the next work item from.
 
         Returns:
-            WorkItem | None: The next available work item if found; otherwise, None.
+            WorkItem | None: The claimed work item, or None if the queue has none available.
 
         Raises:
-            Exception: Propagates any exceptions that occur during database access or
-                    transaction handling, after rolling back any changes.
+            IntegrityError: If the claim fails, after rolling back the session.
+        """
+        items = self.get_next_items(queue_id, 1)
+        return items[0] if items else None
+
+    def get_next_items(self, queue_id: int, count: int) -> list[WorkItem]:
+        """
+        Claims up to `count` available work items from a queue in a single statement.
+
+        The oldest NEW and unlocked items are selected with FOR UPDATE SKIP LOCKED and
+        moved to IN_PROGRESS by the same UPDATE ... RETURNING, so concurrent consumers
+        never receive the same item.
+
+        Parameters:
+            queue_id (int): The ID of the queue to claim work items from.
+            count (int): The maximum number of work items to claim.
+
+        Returns:
+            list[WorkItem]: The claimed work items, oldest first. Empty if the queue has none.
         """
         try:
-            item = self.session.scalars(
-                select(WorkItem)
-                .where(WorkItem.workqueue_id == queue_id)
-                .where(WorkItem.locked == False)  # noqa: E712
-                .where(WorkItem.status == enums.WorkItemStatus.NEW)
-                .order_by(WorkItem.created_at)
-                .limit(1)
-                .with_for_update(skip_locked=True)  # Use skip_locked to avoid waiting for locked rows
-            ).first()
-
-            if item is None:
-                return None
-
-            item.locked = True
-            item.status = enums.WorkItemStatus.IN_PROGRESS
-            item.started_at = datetime.now()
-            item.updated_at = datetime.now()
-            self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
-            return item
+            items = list(self.session.scalars(claim_statement(queue_id, count)))
+
+            # Detach the items so the commit does not expire them and force a reload per item
+            for item in items:
+                self.session.expunge(item)
+
+            self._commit()
         except IntegrityError:
             self.session.rollback()
             raise
 
+        return sorted(items, key=lambda item: (item.created_at, item.id))
+
+    def bulk_create(self, rows: list[dict]) -> None:
+        """Insert many work items with multi-row INSERT statements and a single commit."""
+        self.session.exec(insert(WorkItem), params=rows)
+        self._commit()
+
     def get_by_reference(self, reference: str, status: enums.WorkItemStatus | None = None) -> list[WorkItem]:
         """Get work items by reference value, optionally filtered by status, sorted newest to oldest."""
         if not reference or reference.strip() == "":
@@ -86,3 +130,22 @@ class WorkItemRepository(DatabaseRepository[WorkItem]):
         
         return list(self.session.scalars(query))
 
+
+class AsyncWorkItemRepository(AsyncDatabaseRepository[WorkItem]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(WorkItem, session)
+
+    async def get_next_item(self, queue_id: int) -> WorkItem | None:
+        items = await self.get_next_items(queue_id, 1)
+        return items[0] if items else None
+
+    async def get_next_items(self, queue_id: int, count: int) -> list[WorkItem]:
+        """Async version of WorkItemRepository.get_next_items."""
+        try:
+            items = list(await self.session.scalars(claim_statement(queue_id, count)))
+            await self._commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+
+        return sorted(items, key=lambda item: (item.created_at, item.id))
@@ -1,24 +1,49 @@
 import abc
 from datetime import datetime, timedelta
-from typing import List, Optional
-from sqlalchemy.types import String
+from typing import Optional
+from sqlalchemy.types import Text
 
-from sqlalchemy import or_
+from sqlalchemy import ColumnElement, literal_column, or_
 from sqlalchemy.sql import func
-from sqlmodel import Session, select, delete, cast
+from sqlmodel import Session, select, delete
 
 from app.database.models import Workqueue, WorkItem
+from app.database.pagination import Page, paginate
 
 import app.enums as enums
 
 from .database_repository import DatabaseRepository, AbstractRepository
 
 
+# Reference and every scalar value in data, maintained by the database and covered by a
+# trigram index. Not part of the model, so it is never returned by the API.
+workitem_search_text = literal_column("workitem.search_text", Text)
+
+
+def workitem_search_condition(search: str) -> ColumnElement[bool]:
+    """Case-insensitive substring match on reference, data and status."""
+    statuses = [
+        status
+        for status in enums.WorkItemStatus
+        if search.lower() in status.name.lower() or search.lower() in status.value
+    ]
+
+    condition = workitem_search_text.ilike(f"%{search}%")
+    if statuses:
+        condition = or_(condition, WorkItem.status.in_(statuses))
+
+    return condition
+
+
 class AbstractWorkqueueRepository(AbstractRepository[Workqueue]):
     @abc.abstractmethod
     def get_workitem_count(self, workqueue_id: int, status: enums.WorkItemStatus):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_workitem_counts(self) -> dict[int, dict[enums.WorkItemStatus, int]]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_workitems_paginated(
         self,
@@ -27,7 +52,8 @@ class AbstractWorkqueueRepository(AbstractRepository[Workqueue]):
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[WorkItem], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[WorkItem], int]:
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -60,6 +86,19 @@ class WorkqueueRepository(DatabaseRepository[Workqueue]):
             .where(WorkItem.status == status)
         ).first()
 
+    def get_workitem_counts(self) -> dict[int, dict[enums.WorkItemStatus, int]]:
+        """Count work items per workqueue and status in a single grouped query."""
+        rows = self.session.exec(
+            select(WorkItem.workqueue_id, WorkItem.status, func.count())
+            .group_by(WorkItem.workqueue_id, WorkItem.status)
+        ).all()
+
+        counts: dict[int, dict[enums.WorkItemStatus, int]] = {}
+        for workqueue_id, status, count in rows:
+            counts.setdefault(workqueue_id, {})[status] = count
+
+        return counts
+
     def get_by_name(self, name: str) -> Workqueue:
         return self.session.exec(
             select(Workqueue).filter(Workqueue.name == name)
@@ -72,18 +111,12 @@ class WorkqueueRepository(DatabaseRepository[Workqueue]):
         skip: int = 0,
         limit: int = 10,
         include_deleted: bool = False,
-    ) -> tuple[List[WorkItem], int]:
+        cursor: Optional[str] = None,
+    ) -> tuple[Page[WorkItem], int]:
         query = select(WorkItem).where(WorkItem.workqueue_id == workqueue_id)
 
         if search:
-            query = query.where(
-                or_(
-                    WorkItem.reference.ilike(f"%{search}%"),
-                    cast(WorkItem.status, String).ilike(f"%{search}%"),
-                    cast(WorkItem.data, String).ilike(f"%{search}%"),
-                )
-            )
-        query = query.order_by(WorkItem.updated_at.desc())
+            query = query.where(workitem_search_condition(search))
 
         count_query = select(func.count()).select_from(WorkItem)
         if query.whereclause is not None:
@@ -91,8 +124,11 @@ class WorkqueueRepository(DatabaseRepository[Workqueue]):
 
         total_count = self.session.exec(count_query).first()
 
+        # Most recently updated first
+        keys = (WorkItem.updated_at, WorkItem.id)
+
         return (
-            list(self.session.exec(query.offset(skip).limit(limit)).all()),
+            paginate(self.session, query, keys, limit, cursor, skip, descending=True),
             total_count,
         )
 
@@ -112,7 +148,7 @@ class WorkqueueRepository(DatabaseRepository[Workqueue]):
             query = query.where(WorkItem.created_at < cutoff_date)
 
         self.session.exec(query)
-        self.session.commit()
+        self._commit()
 
     def get_by_reference(
         self,
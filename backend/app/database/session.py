@@ -1,8 +1,13 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 from app.config import settings
+from app.metrics import TimedAsyncQueuePool, TimedQueuePool
 
 connect_args = {"check_same_thread": False}
 
@@ -11,10 +16,55 @@ engine = create_engine(
     #echo=settings.debug is True,
     echo=False,
     #connect_args=connect_args,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    poolclass=TimedQueuePool,
+    pool_logging_name="sync",
 )
 
 
+# The scheduler runs on its own thread or in its own process. A separate small pool keeps a
+# long scheduler tick from holding connections the API needs, and the other way around.
+scheduler_engine = create_engine(
+    settings.database_url,
+    echo=False,
+    pool_size=2,
+    max_overflow=0,
+    poolclass=TimedQueuePool,
+    pool_logging_name="scheduler",
+)
+
+
+def async_database_url(url: str) -> URL:
+    """The same database, reached through the asyncpg driver."""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+# Used by the async endpoints on the hot worker paths. The sync engine above serves
+# everything else, so endpoints can be moved over one at a time.
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=False,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    poolclass=TimedAsyncQueuePool,
+    pool_logging_name="async",
+)
+
 
 def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    # A unit of work commits once at its end, its objects stay usable for the response
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+def get_scheduler_session() -> Generator[Session, None, None]:
+    # A tick keeps working on the objects it loaded after committing, see SchedulerSnapshot
+    with Session(scheduler_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay usable after commit, as lazy loading is not possible in async code
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
@@ -1,8 +1,28 @@
+"""
+Units of work over a database session.
+
+A unit of work is transactional by default. While it is open, repository writes are only
+flushed, and leaving it commits them all at once, or rolls them back on an exception.
+Units of work on the same session nest, only the outermost one commits. Code that needs
+its writes committed before the block ends can call commit() in between, or open the
+unit of work with transactional=False to have every repository write commit on its own.
+"""
+
 import abc
 
-from contextlib import AbstractContextManager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+
+from app.database import models, repository
+
 
-from app.database import repository
+def _enter(session) -> None:
+    session.info[repository.UNIT_OF_WORK] = session.info.get(repository.UNIT_OF_WORK, 0) + 1
+
+
+def _leave(session) -> bool:
+    """Close one unit of work. Returns whether it was the outermost one."""
+    session.info[repository.UNIT_OF_WORK] -= 1
+    return session.info[repository.UNIT_OF_WORK] == 0
 
 
 class AbstractUnitOfWork(AbstractContextManager):
@@ -33,8 +53,9 @@ class AbstractUnitOfWork(AbstractContextManager):
 
 
 class UnitOfWork(AbstractUnitOfWork):
-    def __init__(self, session) -> None:
+    def __init__(self, session, transactional: bool = True) -> None:
         self.session = session
+        self.transactional = transactional
         self.processes = repository.ProcessRepository(session)
         self.triggers = repository.TriggerRepository(session)
         self.credentials = repository.CredentialRepository(session)
@@ -45,8 +66,64 @@ class UnitOfWork(AbstractUnitOfWork):
         self.workqueues = repository.WorkqueueRepository(session)
         self.assets = repository.AssetRepository(session)
 
+    def __enter__(self):
+        if self.transactional:
+            _enter(self.session)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.transactional:
+            return super().__exit__(exc_type, exc_value, traceback)
+
+        if not _leave(self.session):
+            return
+
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
     def commit(self):
         self.session.commit()
 
     def rollback(self):
         self.session.rollback()
+
+
+class AsyncUnitOfWork(AbstractAsyncContextManager):
+    """Unit of work on the async session.
+
+    Only the repositories behind the hot worker endpoints have async versions so far.
+    """
+
+    def __init__(self, session, transactional: bool = True) -> None:
+        self.session = session
+        self.transactional = transactional
+        self.access_tokens = repository.AsyncAccessTokenRepository(session)
+        self.workqueues = repository.AsyncDatabaseRepository(models.Workqueue, session)
+        self.work_items = repository.AsyncWorkItemRepository(session)
+        self.auditlogs = repository.AsyncAuditLogRepository(session)
+        self.resources = repository.AsyncResourceRepository(session)
+        self.sessions = repository.AsyncSessionRepository(session)
+        self.processes = repository.AsyncDatabaseRepository(models.Process, session)
+        self.credentials = repository.AsyncDatabaseRepository(models.Credential, session)
+
+    async def __aenter__(self):
+        if self.transactional:
+            _enter(self.session)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self.transactional and not _leave(self.session):
+            return
+
+        if exc_type is not None:
+            await self.rollback()
+        elif self.transactional:
+            await self.commit()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
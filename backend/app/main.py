@@ -2,8 +2,9 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.v1.workqueue_router import router as v1_workqueue_router
 from app.api.v1.workitem_router import router as v1_workitem_router
@@ -18,9 +19,15 @@ from app.api.v1.accesstoken_router import router as v1_accesstoken_router
 from app.api.v1.assets_router import router as v1_assets_router
 from app.api.token_router import router as token_router
 from app.api.health_router import router as health_router
+from app.api.metrics_router import router as metrics_router
 
 from app.config import settings
-from app.scheduler import scheduler_background_task
+from app.database.heartbeats import resource_heartbeats
+from app.database.notifications import session_notifier, workqueue_notifier
+from app.database.pagination import InvalidCursorError
+from app.database.session import async_engine
+from app.metrics import RequestMetricsMiddleware, monitor_event_loop_lag
+from app.scheduler import AutomationScheduler, SchedulerThread
 
 logging.basicConfig(level=logging.INFO if settings.debug else logging.WARNING)
 
@@ -28,24 +35,36 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create and store scheduler task reference to prevent garbage collection
-    scheduler_task = asyncio.create_task(scheduler_background_task())
+    # The scheduler does blocking database work, so it runs on its own thread
+    scheduler_thread = None
+    if settings.scheduler_enabled:
+        scheduler_thread = SchedulerThread(AutomationScheduler())
+        scheduler_thread.start()
+    else:
+        logger.info("Scheduler is disabled via configuration")
+
+    event_loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    heartbeat_task = asyncio.create_task(resource_heartbeats.run())
     
     logger.info(f"Starting up, database url is: {settings.database_url}, debug is {settings.debug}")
 
     try:
         yield
     finally:
-        # Graceful shutdown: cancel scheduler task
-        if scheduler_task and not scheduler_task.done():
+        event_loop_lag_task.cancel()
+
+        # Write the pings received since the last flush
+        heartbeat_task.cancel()
+        await resource_heartbeats.flush_now()
+
+        # Graceful shutdown: let the scheduler finish its current tick
+        if scheduler_thread is not None:
             logger.info("Shutting down scheduler...")
-            scheduler_task.cancel()
-            try:
-                await scheduler_task
-            except asyncio.CancelledError:
-                logger.info("Scheduler task cancelled successfully")
-            except Exception as e:
-                logger.error(f"Error during scheduler shutdown: {e}")
+            await asyncio.to_thread(scheduler_thread.stop, settings.scheduler_shutdown_timeout)
+
+        workqueue_notifier.close()
+        session_notifier.close()
+        await async_engine.dispose()
 
 
 app = FastAPI(
@@ -64,7 +83,14 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
+app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 app.include_router(v1_accesstoken_router, prefix="")
 app.include_router(v1_credentials_router, prefix="")
@@ -78,6 +104,7 @@ app.include_router(v1_workitem_router, prefix="")
 app.include_router(v1_workqueue_router, prefix="")
 app.include_router(token_router, prefix="")
 app.include_router(health_router, prefix="")
+app.include_router(metrics_router, prefix="")
 
 
 #async def background_task():
@@ -0,0 +1,150 @@
+"""
+Prometheus metrics.
+
+Metrics are kept in process memory and exposed on /metrics. Recording a value is a dict
+lookup and an increment, and gauges that need the database are only refreshed when
+/metrics is scraped, so the collectors can stay on in production. With several API
+processes each process reports its own values.
+"""
+
+import asyncio
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION = Histogram(
+    "ats_http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ["method", "route", "status"],
+)
+
+SCHEDULER_PHASE_DURATION = Histogram(
+    "ats_scheduler_phase_duration_seconds",
+    "Time spent in each phase of a scheduler tick.",
+    ["phase"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+TRIGGERS_PROCESSED = Counter(
+    "ats_scheduler_triggers_processed_total",
+    "Triggers evaluated by the scheduler.",
+    ["type", "result"],
+)
+
+SCHEDULER_LEADER = Gauge(
+    "ats_scheduler_leader",
+    "1 while the scheduler in this process holds the scheduler lease.",
+)
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "ats_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the database pool.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+
+POOL_CONNECTIONS = Gauge(
+    "ats_db_pool_connections",
+    "Connections in the database pool.",
+    ["engine", "state"],
+)
+
+WORKQUEUE_ITEMS = Gauge(
+    "ats_workqueue_items",
+    "Work items per workqueue and status.",
+    ["workqueue", "status"],
+)
+
+RESOURCE_PINGS = Counter(
+    "ats_resource_pings_total",
+    "Resource pings, by whether they were written right away or buffered for the next flush.",
+    ["write"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "ats_event_loop_lag_seconds",
+    "Delay between when the event loop should have run a callback and when it did.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+class TimedPoolMixin:
+    """Records how long each pool checkout waited for a connection.
+
+    The engine label is taken from the pool's logging name.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self.logging_name).observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def record_pool_connections(engine_name: str, pool: QueuePool) -> None:
+    POOL_CONNECTIONS.labels(engine_name, "checked_out").set(pool.checkedout())
+    POOL_CONNECTIONS.labels(engine_name, "idle").set(pool.checkedin())
+    POOL_CONNECTIONS.labels(engine_name, "overflow").set(max(pool.overflow(), 0))
+
+
+WORKQUEUE_STATUSES = ("new", "in_progress", "completed", "failed", "pending_user_action")
+
+
+def record_workqueue_items(workqueues: list) -> None:
+    """Set the item gauges from WorkqueueInformation, dropping workqueues that are gone."""
+    WORKQUEUE_ITEMS.clear()
+    for workqueue in workqueues:
+        for status in WORKQUEUE_STATUSES:
+            WORKQUEUE_ITEMS.labels(workqueue.name, status).set(getattr(workqueue, status))
+
+
+class RequestMetricsMiddleware:
+    """Records request latency per route template, so path parameters do not add labels."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+            ).observe(time.perf_counter() - start)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Measure how late the event loop wakes up from a sleep of `interval` seconds."""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - expected, 0))
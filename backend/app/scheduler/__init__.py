@@ -11,8 +11,12 @@ architecture following the Strategy pattern:
 - Trigger processors handle specific trigger types (cron, date, workqueue)
 - Services integration provides consistent abstraction layer usage
 - Resource dispatcher handles session-to-resource allocation
+- Snapshot loads the state of a tick in a fixed number of queries for in-memory decisions
 - Validators provide reusable validation logic
 - Utils contain utility functions for resource matching
+- Runners keep the scheduler off the API event loop, on a thread or in its own process
+- Leader election lets only one scheduler run when the API has several replicas
+- Sharding optionally splits trigger evaluation over all running schedulers
 
 This modular design improves:
 - Testability: Each component can be unit tested independently
@@ -23,5 +27,6 @@ This modular design improves:
 
 # Maintain backward compatibility
 from .core import AutomationScheduler, scheduler_background_task
+from .runner import SchedulerThread, run_standalone
 
-__all__ = ['AutomationScheduler', 'scheduler_background_task']
\ No newline at end of file
+__all__ = ['AutomationScheduler', 'scheduler_background_task', 'SchedulerThread', 'run_standalone']
\ No newline at end of file
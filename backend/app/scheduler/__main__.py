@@ -0,0 +1,18 @@
+"""
+Run the scheduler as a standalone process, without the HTTP server.
+
+    uv run python -m app.scheduler
+
+Set SCHEDULER_ENABLED=false on the API processes so only this process schedules.
+"""
+
+import asyncio
+import logging
+
+from app.config import settings
+from .core import scheduler
+from .runner import run_standalone
+
+logging.basicConfig(level=logging.INFO if settings.debug else logging.WARNING)
+
+asyncio.run(run_standalone(scheduler))
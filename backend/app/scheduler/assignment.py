@@ -0,0 +1,108 @@
+"""
+Batch assignment of pending sessions to resources.
+
+The greedy dispatcher gives each session, oldest first, the best resource that is free at
+that moment, so a session that could run anywhere may take the one resource a later
+session needs. Batch assignment looks at all pending sessions and free resources of a tick
+together:
+
+1. It matches as many sessions as possible.
+2. Among those matchings it prefers older sessions.
+3. It prefers resources with fewer capabilities.
+
+Sessions are visited oldest first, and each one is matched through an augmenting path,
+which may move already matched sessions to other resources but never unmatches them. On
+the transversal matroid this greedy order gives a maximum matching whose matched sessions
+are the oldest possible. Over-allocation is kept low by taking the free resource with the
+fewest capabilities at the end of each path. That part is a heuristic, not an optimum.
+
+Sessions with the same requirements are interchangeable, so the search runs over
+requirement classes and the capability index's resource bitsets, not single sessions. A
+class that finds no augmenting path never will later in the batch, so its remaining
+sessions are skipped.
+"""
+
+from app.scheduler.capabilities import CapabilityIndex, lowest_bit
+
+
+def assign_batch(index: CapabilityIndex, requirements: list[str], available: int) -> list[int | None]:
+    """Assign sessions to resources.
+
+    Args:
+        index: Capability index of the resources
+        requirements: Requirements of each pending session, oldest session first
+        available: Bitset of the index slots of the free resources
+
+    Returns:
+        The resource id for each session, None for sessions that stay pending
+    """
+    compatible: dict[str, int] = {}
+    # Slots holding a session of each requirement class
+    held: dict[str, int] = {}
+    holders: dict[int, int] = {}
+    failed: set[str] = set()
+    free = available
+
+    for position, session_requirements in enumerate(requirements):
+        if session_requirements in failed:
+            continue
+
+        if session_requirements not in compatible:
+            compatible[session_requirements] = index.matching(session_requirements) & available
+            held[session_requirements] = 0
+
+        levels = _find_path(index, session_requirements, compatible, held, free)
+        if levels is None:
+            failed.add(session_requirements)
+            continue
+
+        slot = index.fewest(levels[-1] & free)
+        free &= ~(1 << slot)
+
+        # Walk the path back, moving one session of each class along to the slot after it
+        for level in range(len(levels) - 1, 0, -1):
+            previous = next(
+                lowest_bit(held[moved] & levels[level - 1])
+                for moved in held
+                if compatible[moved] >> slot & 1 and held[moved] & levels[level - 1]
+            )
+            holders[slot] = holders.pop(previous)
+            held[requirements[holders[slot]]] ^= (1 << previous) | (1 << slot)
+            slot = previous
+
+        holders[slot] = position
+        held[session_requirements] |= 1 << slot
+
+    assigned: list[int | None] = [None] * len(requirements)
+    for slot, position in holders.items():
+        assigned[position] = index.resource_ids[slot]
+    return assigned
+
+
+def _find_path(
+    index: CapabilityIndex,
+    requirements: str,
+    compatible: dict[str, int],
+    held: dict[str, int],
+    free: int,
+) -> list[int] | None:
+    """Breadth first search from a class to a free slot, one bitset of slots per level."""
+    reached = compatible[requirements]
+    visited = reached
+    levels = [reached]
+
+    while not reached & free:
+        # Sessions on the slots just reached can move to any slot compatible with them
+        following = 0
+        for moved, slots in held.items():
+            if slots & reached:
+                following |= compatible[moved]
+
+        reached = following & ~visited
+        if not reached:
+            return None
+
+        visited |= reached
+        levels.append(reached)
+
+    return levels
@@ -0,0 +1,178 @@
+"""
+Capability index for matching sessions to resources.
+
+Capability tokens are interned to integer ids. Every resource gets a slot, and for every
+token the index keeps one bitset with a bit per slot, set for the resources that have the
+token. The resources meeting a set of requirements are then the AND of the bitsets of the
+required tokens, computed over all resources at once with Python's big integers.
+
+The index is kept across scheduler ticks. Syncing it with the resources of a tick only
+parses the capabilities of resources that are new or whose capabilities changed.
+"""
+
+from typing import Iterable
+
+from app.database.models import Resource
+from app.scheduler.utils import parse_capabilities_or_requirements
+
+
+def lowest_bit(bits: int) -> int:
+    """Position of the lowest set bit of a non-zero bitset."""
+    return (bits & -bits).bit_length() - 1
+
+
+class CapabilityIndex:
+    """Resources as bitsets over interned capability tokens."""
+
+    def __init__(self):
+        self.token_ids: dict[str, int] = {}
+        # Token id -> bitset of the slots of resources that have the token
+        self.slots_by_token: list[int] = []
+        # Number of capabilities -> bitset of the slots of resources with that many
+        self.slots_by_count: dict[int, int] = {}
+
+        self.slots: dict[int, int] = {}
+        self.resource_ids: list[int | None] = []
+        self.masks: list[int] = []
+        self.capabilities: dict[int, str] = {}
+        self.free_slots: list[int] = []
+
+        self._requirements: dict[str, int | None] = {}
+
+    def sync(self, resources: Iterable[Resource]) -> None:
+        """Index new and changed resources and drop the ones that are gone."""
+        resources = list(resources)
+        seen = {resource.id for resource in resources}
+
+        # Free the slots of resources that are gone first, so new resources reuse them
+        for resource_id in [resource_id for resource_id in self.slots if resource_id not in seen]:
+            self.remove(resource_id)
+
+        for resource in resources:
+            if self.capabilities.get(resource.id) != resource.capabilities:
+                self.remove(resource.id)
+                self.add(resource.id, resource.capabilities)
+
+    def add(self, resource_id: int, capabilities: str) -> None:
+        mask = 0
+        for token in parse_capabilities_or_requirements(capabilities):
+            mask |= 1 << self._intern(token)
+
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.resource_ids[slot] = resource_id
+            self.masks[slot] = mask
+        else:
+            slot = len(self.resource_ids)
+            self.resource_ids.append(resource_id)
+            self.masks.append(mask)
+
+        bit = 1 << slot
+        for token_id in self._bits(mask):
+            self.slots_by_token[token_id] |= bit
+
+        count = mask.bit_count()
+        self.slots_by_count[count] = self.slots_by_count.get(count, 0) | bit
+
+        self.slots[resource_id] = slot
+        self.capabilities[resource_id] = capabilities
+
+    def remove(self, resource_id: int) -> None:
+        slot = self.slots.pop(resource_id, None)
+        if slot is None:
+            return
+
+        bit = 1 << slot
+        mask = self.masks[slot]
+        for token_id in self._bits(mask):
+            self.slots_by_token[token_id] &= ~bit
+
+        count = mask.bit_count()
+        self.slots_by_count[count] &= ~bit
+        if not self.slots_by_count[count]:
+            del self.slots_by_count[count]
+
+        self.resource_ids[slot] = None
+        self.masks[slot] = 0
+        self.free_slots.append(slot)
+        del self.capabilities[resource_id]
+
+    def slot_bits(self, resource_ids: Iterable[int]) -> int:
+        """Bitset of the slots of the given resources, ignoring resources not indexed."""
+        bits = 0
+        for resource_id in resource_ids:
+            slot = self.slots.get(resource_id)
+            if slot is not None:
+                bits |= 1 << slot
+        return bits
+
+    def matching(self, requirements: str) -> int:
+        """Bitset of the slots of resources that have every required capability.
+
+        Empty requirements match nothing, as in find_best_resource.
+        """
+        tokens = self._requirement_tokens(requirements)
+        if tokens is None:
+            return 0
+
+        bits = (1 << len(self.resource_ids)) - 1
+        for token_id in self._bits(tokens):
+            bits &= self.slots_by_token[token_id]
+        return bits
+
+    def best(self, requirements: str, candidates: int) -> int | None:
+        """The id of the matching candidate with the fewest capabilities.
+
+        Among equals the resource in the lowest slot wins.
+        """
+        slot = self.fewest(self.matching(requirements) & candidates)
+        return None if slot is None else self.resource_ids[slot]
+
+    def fewest(self, bits: int) -> int | None:
+        """The slot in `bits` with the fewest capabilities, the lowest slot among equals."""
+        if not bits:
+            return None
+
+        for count in sorted(self.slots_by_count):
+            fewest = bits & self.slots_by_count[count]
+            if fewest:
+                return lowest_bit(fewest)
+
+        return None
+
+    def _intern(self, token: str) -> int:
+        token_id = self.token_ids.get(token)
+        if token_id is None:
+            token_id = len(self.slots_by_token)
+            self.token_ids[token] = token_id
+            self.slots_by_token.append(0)
+            # Cached requirements may have failed on this token
+            self._requirements.clear()
+        return token_id
+
+    def _requirement_tokens(self, requirements: str) -> int | None:
+        """Bitset of the required token ids, None when nothing can match."""
+        if requirements in self._requirements:
+            return self._requirements[requirements]
+
+        tokens = parse_capabilities_or_requirements(requirements)
+        mask = 0
+        for token in tokens:
+            token_id = self.token_ids.get(token)
+            if token_id is None:
+                mask = None
+                break
+            mask |= 1 << token_id
+
+        if not tokens:
+            mask = None
+
+        self._requirements[requirements] = mask
+        return mask
+
+    @staticmethod
+    def _bits(mask: int) -> Iterable[int]:
+        while mask:
+            bit = lowest_bit(mask)
+            yield bit
+            mask &= mask - 1
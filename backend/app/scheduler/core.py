@@ -7,22 +7,28 @@ This module contains the refactored AutomationScheduler class using the modular
 import logging
 import asyncio
 from datetime import datetime
+from time import monotonic
 
-from app.database.session import get_session
-from app.database.repository import (
-    TriggerRepository,
-    SessionRepository,
-    ResourceRepository,
-    WorkqueueRepository,
-    ProcessRepository
-)
-from app.services import ResourceService, SessionService, WorkqueueService
+from sqlmodel import Session as SqlSession
+
+from app.database.session import get_scheduler_session
+from app.database.repository import AuditLogRepository, TriggerRepository
+from app.database.unit_of_work import UnitOfWork
+from app.services import AuditLogService, ResourceService, SessionService
 from app.config import settings
+from app.metrics import SCHEDULER_PHASE_DURATION, TRIGGERS_PROCESSED
 from .trigger_processors import ProcessingServices, TriggerProcessorRegistry
 from .dispatcher import ResourceDispatcher
+from .leader import LeaderLease, renew_interval
+from .capabilities import CapabilityIndex
+from .snapshot import SchedulerSnapshot
+from .sharding import ShardMembership
 
 logger = logging.getLogger(__name__)
 
+# Shortest sleep between ticks, so a trigger that keeps failing does not spin the loop
+MINIMUM_SLEEP = 0.5
+
 
 class AutomationScheduler:
     """Modular scheduler class to manage automation triggers and execution."""
@@ -31,92 +37,204 @@ class AutomationScheduler:
         """Initialize the scheduler."""
         self.processor_registry = None
         self.dispatcher = None
+        self.partitions_checked_at = None
+        self.started_at = monotonic()
+        self.next_fire_at = None
+        self.stopping = asyncio.Event()
+        self.lease = LeaderLease()
+        # Kept across ticks, so only resources that enrolled or changed are parsed again
+        self.capability_index = CapabilityIndex()
+        # Set when trigger evaluation is split over all running schedulers
+        self.shards = ShardMembership(self.lease.holder) if settings.scheduler_sharding else None
     
     async def run_background_task(self):
-        """Background task that runs the scheduler in a loop."""
-        if not settings.scheduler_enabled:
-            logger.info("Scheduler is disabled via configuration")
-            return
-            
-        while True:
+        """Run the scheduler in a loop until stop() is called.
+
+        A tick in progress is finished before the loop exits. Only the scheduler holding
+        the lease runs ticks, the others stand by until it expires. With sharding the others
+        evaluate their share of the triggers and leave dispatching to the leader.
+        """
+        while not self.stopping.is_set():
             try:
-                await self.schedule()
+                if self.shards is not None:
+                    self.shards.refresh()
+
+                is_leader = self.lease.acquire()
+                if is_leader or self.shards is not None:
+                    started = monotonic()
+                    await self.schedule(dispatch=is_leader)
+                    self._check_tick_duration(monotonic() - started)
+                else:
+                    self.next_fire_at = None
             except Exception as e:
                 logger.error(f"Scheduler error: {e}")
                 # Configurable backoff on error
-                await asyncio.sleep(settings.scheduler_error_backoff)
+                await self._wait(settings.scheduler_error_backoff)
             
-            # Configurable sleep interval
-            await asyncio.sleep(settings.scheduler_interval)
+            # Configurable sleep interval, cut short when a trigger is due sooner
+            await self._wait(self._seconds_until_next_run())
+
+        try:
+            self.lease.release()
+            if self.shards is not None:
+                self.shards.leave()
+        except Exception as e:
+            logger.error(f"Failed to release the scheduler lease: {e}")
+
+        logger.info("Scheduler stopped")
+
+    def stop(self):
+        """Ask the scheduler loop to exit. Must be called from the loop's thread."""
+        self.stopping.set()
+
+    async def _wait(self, seconds: float):
+        """Sleep for `seconds`, waking up early when the scheduler is stopped."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
     
-    async def schedule(self):
-        """Main scheduling logic using the modular architecture."""
-        # Use proper database session management
-        with next(get_session()) as session:
-            # Initialize repositories
-            trigger_repository = TriggerRepository(session)
-            session_repository = SessionRepository(session)
-            resource_repository = ResourceRepository(session)
-            workqueue_repository = WorkqueueRepository(session)
-            process_repository = ProcessRepository(session)
-
-            # Initialize services
-            resource_service = ResourceService(resource_repository, session_repository)
-            session_service = SessionService(session_repository, resource_repository)
-            workqueue_service = WorkqueueService(workqueue_repository)
-            
-            # Initialize processing services container
-            processing_services = ProcessingServices(
-                session_service=session_service,
-                resource_service=resource_service,
-                workqueue_service=workqueue_service,
-                trigger_repository=trigger_repository,
-                session_repository=session_repository,
-                resource_repository=resource_repository,
-                workqueue_repository=workqueue_repository,
-                process_repository=process_repository
-            )
-            
-            # Initialize processor registry and dispatcher
-            self.processor_registry = TriggerProcessorRegistry(processing_services)
-            self.dispatcher = ResourceDispatcher(resource_service, session_repository)
+    async def schedule(self, dispatch: bool = True):
+        """Main scheduling logic using the modular architecture.
+
+        Without `dispatch` only triggers are evaluated. Housekeeping and dispatching sessions
+        to resources are left to the leader, so they stay consistent across schedulers.
+        """
+        # The scheduler has its own connection pool, separate from the API
+        with next(get_scheduler_session()) as session:
+            await self._tick(session, dispatch)
+
+    async def _tick(self, session: SqlSession, dispatch: bool = True):
+        """Run one tick on `session`, which must not expire its objects on commit."""
+        if dispatch:
+            # Do housekeeping, committed as one transaction
+            with SCHEDULER_PHASE_DURATION.labels("housekeeping").time(), UnitOfWork(session) as uow:
+                session_service = SessionService(uow.sessions, uow.resources)
+
+                session_service.reschedule_orphaned_sessions()
+                session_service.flush_dangling_sessions()
+                self._expire_resources(ResourceService(uow.resources, uow.sessions))
 
-            # Do housekeeping
-            session_service.reschedule_orphaned_sessions()
-            session_service.flush_dangling_sessions()
+            self._maintain_auditlog_partitions()
 
+        # Get current time for trigger evaluation
+        now = datetime.now()
+
+        # Everything below is decided in memory on one snapshot
+        with SCHEDULER_PHASE_DURATION.labels("snapshot").time():
+            snapshot = SchedulerSnapshot.load(session, now, self.capability_index)
+
+        processing_services = ProcessingServices(snapshot)
+        self.processor_registry = TriggerProcessorRegistry(processing_services)
+        self.dispatcher = ResourceDispatcher(snapshot)
+
+        if dispatch:
             # Dispatch pending sessions first
-            self.dispatcher.dispatch_all_pending()
+            with SCHEDULER_PHASE_DURATION.labels("dispatch_pending").time():
+                self.dispatcher.dispatch_all_pending()
+
+        # Process all triggers
+        with SCHEDULER_PHASE_DURATION.labels("triggers").time():
+            await self._process_triggers(snapshot, now)
+
+        # Dispatch again for any new sessions created
+        if dispatch:
+            with SCHEDULER_PHASE_DURATION.labels("dispatch_new").time():
+                self.dispatcher.dispatch_all_pending()
 
-            # Get current time for trigger evaluation
-            now = datetime.now()
+        # Write all decisions of the tick in one transaction
+        with SCHEDULER_PHASE_DURATION.labels("commit").time():
+            if dispatch and not self.lease.confirm(session):
+                # A standby took over while this tick ran, so its decisions would clash
+                logger.warning("Scheduler lease lost during the tick, discarding its decisions")
+                session.rollback()
+                self.next_fire_at = None
+                return
 
-            # Process all triggers
-            await self._process_triggers(trigger_repository, process_repository, now)
+            session.commit()
 
-            # Dispatch again for any new sessions created
-            self.dispatcher.dispatch_all_pending()
+        self.next_fire_at = TriggerRepository(session).get_next_fire_at()
 
-    async def _process_triggers(self, trigger_repository: TriggerRepository, 
-                              process_repository: ProcessRepository, now: datetime):
-        """Process all enabled triggers.
+    def _seconds_until_next_run(self) -> float:
+        """Sleep until the next trigger is due, but no longer than the scheduler interval.
+
+        The sleep is also short enough for the leader to renew its lease in time.
+        """
+        interval = min(settings.scheduler_interval, renew_interval())
+        if self.next_fire_at is None:
+            return interval
+
+        seconds = (self.next_fire_at - datetime.now()).total_seconds()
+        return min(max(seconds, MINIMUM_SLEEP), interval)
+
+    def _check_tick_duration(self, seconds: float):
+        """Warn when a tick outlasts the lease, as a standby may have taken over meanwhile.
+
+        If one did, the tick's decisions were discarded, see LeaderLease.confirm.
+        """
+        if seconds > settings.scheduler_lease_ttl:
+            logger.warning(
+                f"Scheduler tick took {seconds:.1f} seconds, longer than the "
+                f"{settings.scheduler_lease_ttl} second lease"
+            )
+
+    def _expire_resources(self, resource_service: ResourceService):
+        """Detach resources that stopped pinging, once resources had time to ping after startup.
+
+        After an outage of the whole server no ping could arrive, so right at startup every
+        resource would look dead.
+        """
+        if monotonic() - self.started_at < settings.resource_heartbeat_ttl:
+            return
+
+        resource_service.update_availability()
+
+    def _maintain_auditlog_partitions(self):
+        """Run audit log partition maintenance at most once per check interval.
+
+        The DDL runs in its own session, so a failure cannot abort the transaction of the tick.
+        """
+        if (
+            self.partitions_checked_at is not None
+            and monotonic() - self.partitions_checked_at < settings.auditlog_partition_check_interval
+        ):
+            return
+
+        self.partitions_checked_at = monotonic()
+
+        # A failure here must not stop sessions from being scheduled
+        try:
+            with next(get_scheduler_session()) as session:
+                AuditLogService(AuditLogRepository(session)).maintain_partitions(datetime.now().date())
+        except Exception as e:
+            logger.error(f"Audit log partition maintenance failed: {e}")
+
+    async def _process_triggers(self, snapshot: SchedulerSnapshot, now: datetime):
+        """Process the cron and date triggers that are due, and all workqueue triggers.
         
         Args:
-            trigger_repository: Repository for trigger operations
-            process_repository: Repository for process operations
+            snapshot: Triggers and the state they are evaluated against
             now: Current datetime for trigger evaluation
         """
-        triggers = trigger_repository.get_all(include_deleted=False)
+        triggers = snapshot.triggers
+
+        if self.shards is not None:
+            triggers = [trigger for trigger in triggers if self.shards.owns(trigger.id)]
+
+        # Another scheduler may fire the same due trigger while shards move
+        triggers = snapshot.claim_due_triggers(triggers)
 
         for trigger in triggers:
             if not trigger.enabled:
                 continue
 
             # Check if the associated process exists and is not deleted
-            process = process_repository.get(trigger.process_id)
+            process = snapshot.processes.get(trigger.process_id)
             if process is None or process.deleted:
                 continue
 
+            trigger_type = getattr(trigger.type, "value", trigger.type)
+
             try:
                 # Get the appropriate processor for this trigger type
                 processor = self.processor_registry.get_processor(trigger.type)
@@ -126,12 +244,16 @@ class AutomationScheduler:
                 
                 if not success:
                     logger.warning(f"Failed to process trigger {trigger.id} of type {trigger.type}")
+
+                TRIGGERS_PROCESSED.labels(trigger_type, "processed" if success else "failed").inc()
                     
             except ValueError as e:
                 logger.error(f"Unsupported trigger type {trigger.type} for trigger {trigger.id}: {e}")
+                TRIGGERS_PROCESSED.labels(trigger_type, "unsupported").inc()
                 continue
             except Exception as e:
                 logger.error(f"Error processing trigger {trigger.id}: {e}")
+                TRIGGERS_PROCESSED.labels(trigger_type, "error").inc()
                 continue
 
 
@@ -140,5 +262,5 @@ scheduler = AutomationScheduler()
 
 
 async def scheduler_background_task():
-    """Backward compatibility function for existing main.py integration."""
+    """Backward compatibility function, runs the global scheduler on the current event loop."""
     await scheduler.run_background_task()
\ No newline at end of file
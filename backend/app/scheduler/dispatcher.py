@@ -5,11 +5,10 @@ This module handles complex session-to-resource dispatching logic for the schedu
 """
 
 import logging
-from datetime import datetime
-from app.services import ResourceService
-from app.database.repository import SessionRepository
-from app.database.models import Session, Resource
-from app.enums import SessionStatus
+
+from app.config import settings
+from app.scheduler.assignment import assign_batch
+from app.scheduler.snapshot import SchedulerSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +16,13 @@ logger = logging.getLogger(__name__)
 class ResourceDispatcher:
     """Handles dispatching of pending sessions to available resources."""
     
-    def __init__(self, resource_service: ResourceService, session_repository: SessionRepository):
-        """Initialize the dispatcher with required services.
+    def __init__(self, snapshot: SchedulerSnapshot):
+        """Initialize the dispatcher.
         
         Args:
-            resource_service: ResourceService instance for basic resource operations
-            session_repository: SessionRepository for session operations
+            snapshot: Sessions and resources of the current tick, assignments are made on it
         """
-        self.resource_service = resource_service
-        self.session_repository = session_repository
+        self.snapshot = snapshot
     
     def dispatch_all_pending(self):
         """Dispatch all pending sessions to available resources.
@@ -34,58 +31,40 @@ class ResourceDispatcher:
         match them with available resources based on their requirements.
         """
         try:
-            self._dispatch_pending_sessions()
+            if settings.scheduler_batch_assignment:
+                self._dispatch_batch()
+            else:
+                self._dispatch_pending_sessions()
             logger.debug("Successfully dispatched pending sessions")
         except Exception as e:
             logger.error(f"Error dispatching pending sessions: {e}")
             raise
     
     def _dispatch_pending_sessions(self):
-        """Internal method to handle the complex dispatching logic."""
-        # Import here to avoid circular imports
-        from app.scheduler.utils import find_best_resource
-        
-        # Update resource availability first
-        self.resource_service.update_availability()
-
-        # Get all new sessions that need resources
-        sessions = self.session_repository.get_new_sessions()
-
-        # Filter to only sessions that are NEW and don't have resources
-        pending_sessions = [
-            session
-            for session in sessions
-            if session.status == SessionStatus.NEW and session.resource_id is None
-        ]
-
-        # Sort by creation time (FIFO)
-        pending_sessions.sort(key=lambda s: s.created_at)
-
-        # Process each pending session
-        for session in pending_sessions:
-            available_resources = self.resource_service.repository.get_available_resources()
-            requirements = session.process.requirements if session.process else ""
-
-            best_resource = find_best_resource(requirements, available_resources)
+        """Internal method to handle the dispatching logic, oldest session first."""
+        for session in self.snapshot.pending_sessions():
+            best_resource = self.snapshot.find_best_resource(self._requirements(session))
 
             if best_resource is None:
                 # Log that no resources are available (but don't fail the session)
                 continue
 
             # Assign the session to the best resource
-            self._assign_session_to_resource(session, best_resource)
-    
-    def _assign_session_to_resource(self, session: Session, resource: Resource):
-        """Assign a session to a resource and update both entities.
-        
-        Args:
-            session: Session to assign
-            resource: Resource to assign to
-        """
-        data = session.model_dump()
+            self.snapshot.assign(session, best_resource)
+
+    def _dispatch_batch(self):
+        """Assign all pending sessions together, see app.scheduler.assignment."""
+        pending = self.snapshot.pending_sessions()
+        requirements = [self._requirements(session) for session in pending]
+
+        resource_ids = assign_batch(
+            self.snapshot.capability_index, requirements, self.snapshot.available_slots
+        )
 
-        data["resource_id"] = resource.id
-        data["dispatched_at"] = datetime.now()
+        for session, resource_id in zip(pending, resource_ids):
+            if resource_id is not None:
+                self.snapshot.assign(session, self.snapshot.get_resource(resource_id))
 
-        self.session_repository.update(session, data)
-        self.resource_service.repository.update(resource, {"available": False})
\ No newline at end of file
+    def _requirements(self, session) -> str:
+        process = self.snapshot.processes.get(session.process_id)
+        return process.requirements if process else ""
@@ -0,0 +1,85 @@
+"""
+Leader election between schedulers.
+
+Every API replica may start a scheduler, but only the one holding the scheduler lease runs
+ticks. The leader renews the lease before each tick, and again in the transaction that commits
+the tick. If it stops renewing, a standby takes the lease over once it has expired,
+scheduler_lease_ttl seconds after the last renewal.
+"""
+
+import logging
+import os
+import socket
+
+from sqlmodel import Session
+
+from app.config import settings
+from app.database.repository import SchedulerLeaseRepository
+from app.database.session import get_scheduler_session
+from app.metrics import SCHEDULER_LEADER
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+
+
+def default_holder() -> str:
+    """Identifies this scheduler, unique per process so uvicorn workers on one host differ."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def renew_interval() -> float:
+    """How often the leader renews and standbys look for an expired lease."""
+    return settings.scheduler_lease_ttl / 3
+
+
+class LeaderLease:
+    """The scheduler lease as seen from one scheduler."""
+
+    def __init__(self, holder: str | None = None):
+        self.holder = holder or default_holder()
+        self.is_leader = False
+
+    def acquire(self) -> bool:
+        """Take or renew the lease. Returns whether this scheduler is the leader."""
+        try:
+            with next(get_scheduler_session()) as session:
+                lease = SchedulerLeaseRepository(session).acquire(
+                    LEASE_NAME, self.holder, settings.scheduler_lease_ttl
+                )
+        except Exception:
+            # Without a renewed lease another scheduler may take over, so stop leading
+            self._set_leader(False)
+            raise
+
+        self._set_leader(lease is not None)
+        return self.is_leader
+
+    def confirm(self, session: Session) -> bool:
+        """Renew the lease in the open transaction on `session`, before the leader commits it.
+
+        Keeps a standby from taking over between the check and the commit. Returns whether
+        this scheduler is still the leader, if not the transaction must be rolled back.
+        """
+        lease = SchedulerLeaseRepository(session).renew(LEASE_NAME, self.holder, settings.scheduler_lease_ttl)
+        self._set_leader(lease is not None)
+        return self.is_leader
+
+    def release(self) -> None:
+        """Give up the lease on shutdown, so a standby does not wait for it to expire."""
+        if not self.is_leader:
+            return
+
+        with next(get_scheduler_session()) as session:
+            SchedulerLeaseRepository(session).release(LEASE_NAME, self.holder)
+
+        self._set_leader(False)
+
+    def _set_leader(self, is_leader: bool) -> None:
+        if is_leader and not self.is_leader:
+            logger.info(f"Scheduler {self.holder} is now the leader")
+        elif self.is_leader and not is_leader:
+            logger.warning(f"Scheduler {self.holder} is no longer the leader")
+
+        self.is_leader = is_leader
+        SCHEDULER_LEADER.set(int(is_leader))
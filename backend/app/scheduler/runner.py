@@ -0,0 +1,73 @@
+"""
+Runners that keep the scheduler off the API event loop.
+
+The scheduler does synchronous database work. Run inside the API it gets its own thread
+and event loop, so a slow tick does not stall async endpoints. Run standalone it is the
+only thing in its process.
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+
+from prometheus_client import start_http_server
+
+from app.config import settings
+from app.database.session import scheduler_engine
+from .core import AutomationScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerThread:
+    """Runs a scheduler on a dedicated thread with its own event loop."""
+
+    def __init__(self, scheduler: AutomationScheduler):
+        self.scheduler = scheduler
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self, timeout: float) -> bool:
+        """Ask the scheduler to stop and wait for its current tick to finish.
+
+        Returns False if the thread is still running after `timeout` seconds.
+        """
+        if not self.thread.is_alive():
+            return True
+
+        self.loop.call_soon_threadsafe(self.scheduler.stop)
+        self.thread.join(timeout)
+
+        if self.thread.is_alive():
+            logger.warning(f"Scheduler did not stop within {timeout} seconds")
+            return False
+
+        return True
+
+    def _run(self) -> None:
+        try:
+            self.loop.run_until_complete(self.scheduler.run_background_task())
+        finally:
+            self.loop.close()
+            scheduler_engine.dispose()
+
+
+async def run_standalone(scheduler: AutomationScheduler) -> None:
+    """Run the scheduler in the current process until SIGINT or SIGTERM."""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, scheduler.stop)
+
+    # The scheduler metrics are not on the API's /metrics when it runs on its own
+    if settings.scheduler_metrics_port:
+        start_http_server(settings.scheduler_metrics_port)
+
+    logger.info("Scheduler started")
+    try:
+        await scheduler.run_background_task()
+    finally:
+        scheduler_engine.dispose()
@@ -0,0 +1,77 @@
+"""
+Sharded trigger evaluation.
+
+With scheduler_sharding enabled, every running scheduler evaluates the triggers whose ids
+hash to it on a consistent hash ring, and the leader alone does housekeeping and dispatches
+sessions to resources. Schedulers announce themselves with a member lease that they renew
+each tick. A scheduler joining or leaving only moves the triggers next to its points on the
+ring, and a scheduler that dies drops out once its member lease expires.
+"""
+
+import bisect
+import hashlib
+import logging
+
+from app.config import settings
+from app.database.repository import SchedulerLeaseRepository
+from app.database.session import get_scheduler_session
+
+logger = logging.getLogger(__name__)
+
+MEMBER_PREFIX = "member:"
+
+# Points per member on the ring, enough to spread triggers evenly over a few schedulers
+VIRTUAL_NODES = 100
+
+
+def _hash(value: str) -> int:
+    # Python's hash() of a string differs between processes, this must not
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping trigger ids to members."""
+
+    def __init__(self, members: list[str], virtual_nodes: int = VIRTUAL_NODES):
+        self.members = sorted(members)
+        points = sorted(
+            (_hash(f"{member}#{node}"), member)
+            for member in self.members
+            for node in range(virtual_nodes)
+        )
+        self.keys = [key for key, _ in points]
+        self.owners = [member for _, member in points]
+
+    def owner(self, trigger_id: int) -> str | None:
+        if not self.keys:
+            return None
+
+        index = bisect.bisect(self.keys, _hash(str(trigger_id))) % len(self.keys)
+        return self.owners[index]
+
+
+class ShardMembership:
+    """This scheduler's place on the hash ring."""
+
+    def __init__(self, holder: str):
+        self.holder = holder
+        self.ring = HashRing([holder])
+
+    def refresh(self) -> None:
+        """Renew the member lease and rebuild the ring from the schedulers alive now."""
+        with next(get_scheduler_session()) as session:
+            repository = SchedulerLeaseRepository(session)
+            repository.acquire(MEMBER_PREFIX + self.holder, self.holder, settings.scheduler_lease_ttl)
+            members = repository.get_holders(MEMBER_PREFIX)
+
+        if sorted(members) != self.ring.members:
+            logger.info(f"Scheduler shards rebalanced over {len(members)} schedulers: {', '.join(members)}")
+            self.ring = HashRing(members)
+
+    def owns(self, trigger_id: int) -> bool:
+        return self.ring.owner(trigger_id) == self.holder
+
+    def leave(self) -> None:
+        """Hand the shard to the other schedulers right away on shutdown."""
+        with next(get_scheduler_session()) as session:
+            SchedulerLeaseRepository(session).release(MEMBER_PREFIX + self.holder, self.holder)
@@ -0,0 +1,210 @@
+"""
+The state a scheduler tick decides on.
+
+A tick loads its triggers, their processes and workqueues, the pending work item counts,
+the active sessions and the resources in a fixed number of queries, however many there
+are. Trigger processors and the dispatcher then decide in memory. Their changes are made
+to the loaded objects, and the tick writes them back with a single commit.
+"""
+
+from datetime import datetime
+
+from sqlmodel import Session as SqlSession
+
+from app.database.models import Process, Resource, Session, Trigger, Workqueue
+from app.database.repository import (
+    ProcessRepository,
+    ResourceRepository,
+    SessionRepository,
+    TIME_TRIGGER_TYPES,
+    TriggerRepository,
+    WorkqueueRepository,
+    with_next_fire_at,
+)
+from app.enums import SessionStatus, WorkItemStatus
+from .capabilities import CapabilityIndex
+
+
+class SchedulerSnapshot:
+    """Triggers, processes, workqueues, active sessions and resources of one tick."""
+
+    def __init__(
+        self,
+        session: SqlSession,
+        triggers: list[Trigger],
+        processes: list[Process],
+        workqueues: list[Workqueue],
+        pending_items: dict[int, int],
+        sessions: list[Session],
+        resources: list[Resource],
+        capability_index: CapabilityIndex | None = None,
+    ):
+        """Initialize the snapshot from loaded objects.
+
+        Args:
+            session: Database session the objects belong to, new sessions are added to it
+            triggers: Due cron and date triggers and all workqueue triggers
+            processes: Processes of the triggers and of the active sessions
+            workqueues: Workqueues of the workqueue triggers
+            pending_items: Number of new work items per workqueue id
+            sessions: New and in progress sessions
+            resources: Resources that are not deleted
+            capability_index: Index kept from earlier ticks, synced with `resources`
+        """
+        self.session = session
+        self.triggers = triggers
+        self.processes = {process.id: process for process in processes}
+        self.workqueues = {workqueue.id: workqueue for workqueue in workqueues}
+        self.pending_items = pending_items
+        self.sessions = list(sessions)
+        self.resources = list(resources)
+
+        self._resources_by_id = {resource.id: resource for resource in self.resources}
+        self._sessions_by_process: dict[int, list[Session]] = {}
+        self._busy_resource_ids: set[int] = set()
+        for active in self.sessions:
+            self._index(active)
+
+        self.capability_index = capability_index or CapabilityIndex()
+        self.capability_index.sync(self.resources)
+        # Bitset of the index slots of the resources without an active session
+        self._available = self.capability_index.slot_bits(
+            resource.id for resource in self.resources if resource.id not in self._busy_resource_ids
+        )
+
+    @classmethod
+    def load(
+        cls, session: SqlSession, now: datetime, capability_index: CapabilityIndex | None = None
+    ) -> "SchedulerSnapshot":
+        """Load the snapshot in seven queries at most.
+
+        The queries run in one repeatable read transaction, so they see the same state. It
+        ends right after, and the tick writes its decisions in a new read committed
+        transaction, so a worker updating a session meanwhile does not fail the tick. The
+        session must not expire its objects on commit.
+
+        Args:
+            session: Database session to load with
+            now: Triggers due at this time are loaded
+            capability_index: Index kept from earlier ticks
+        """
+        # Objects loaded earlier in the tick would otherwise keep their old values
+        session.expire_all()
+        session.commit()
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        trigger_repository = TriggerRepository(session)
+        triggers = trigger_repository.get_due(now) + trigger_repository.get_workqueue_triggers()
+        sessions = SessionRepository(session).get_active_sessions()
+
+        process_ids = {trigger.process_id for trigger in triggers} | {s.process_id for s in sessions}
+        processes = ProcessRepository(session).filter(Process.id.in_(process_ids)) if process_ids else []
+
+        workqueue_repository = WorkqueueRepository(session)
+        workqueue_ids = {trigger.workqueue_id for trigger in triggers if trigger.workqueue_id}
+        workqueues = workqueue_repository.filter(Workqueue.id.in_(workqueue_ids)) if workqueue_ids else []
+
+        # One grouped count for all workqueues, read fresh rather than from the API's cache, so
+        # triggers do not keep scaling up on a queue that has just drained
+        counts = workqueue_repository.get_workitem_counts() if workqueues else {}
+        pending_items = {
+            workqueue.id: counts.get(workqueue.id, {}).get(WorkItemStatus.NEW, 0) for workqueue in workqueues
+        }
+
+        resources = ResourceRepository(session).get_all()
+        session.commit()
+
+        return cls(
+            session, triggers, processes, workqueues, pending_items, sessions, resources, capability_index
+        )
+
+    def _index(self, session: Session) -> None:
+        self._sessions_by_process.setdefault(session.process_id, []).append(session)
+        if session.resource_id is not None:
+            self._busy_resource_ids.add(session.resource_id)
+
+    def active_sessions(self, process_id: int) -> list[Session]:
+        """New and in progress sessions of a process, including those created this tick."""
+        return self._sessions_by_process.get(process_id, [])
+
+    def has_new_session(self, process_id: int) -> bool:
+        return any(s.status == SessionStatus.NEW for s in self.active_sessions(process_id))
+
+    def pending_sessions(self) -> list[Session]:
+        """New sessions without a resource, oldest first."""
+        pending = [s for s in self.sessions if s.status == SessionStatus.NEW and s.resource_id is None]
+        return sorted(pending, key=lambda s: s.created_at)
+
+    def available_resources(self) -> list[Resource]:
+        """Resources without a new or in progress session."""
+        return [resource for resource in self.resources if resource.id not in self._busy_resource_ids]
+
+    @property
+    def available_slots(self) -> int:
+        """Bitset of the capability index slots of the available resources."""
+        return self._available
+
+    def get_resource(self, resource_id: int) -> Resource:
+        return self._resources_by_id[resource_id]
+
+    def find_best_resource(self, requirements: str) -> Resource | None:
+        """The available resource meeting the requirements with the fewest capabilities."""
+        resource_id = self.capability_index.best(requirements, self._available)
+        return None if resource_id is None else self._resources_by_id[resource_id]
+
+    def create_session(self, process_id: int, parameters: str | None) -> Session:
+        """Add a new session, inserted when the tick commits."""
+        created = Session(
+            process_id=process_id,
+            status=SessionStatus.NEW,
+            deleted=False,
+            dispatched_at=None,
+            parameters=parameters,
+        )
+        self.session.add(created)
+        self.sessions.append(created)
+        self._index(created)
+        return created
+
+    def claim_due_triggers(self, triggers: list[Trigger]) -> list[Trigger]:
+        """Leave out the cron and date triggers another scheduler fires or has fired.
+
+        Schedulers whose views of the shard membership differ can both own a trigger. The
+        due triggers are locked in the tick's write transaction until it commits, and only
+        while their next_fire_at is still the one loaded. A trigger that another tick holds
+        or has moved on is skipped. Workqueue triggers are kept, they fire on the state.
+        """
+        due = [trigger for trigger in triggers if trigger.type in TIME_TRIGGER_TYPES]
+        if not due:
+            return triggers
+
+        claimed = set(
+            TriggerRepository(self.session).lock_unchanged(
+                [(trigger.id, trigger.next_fire_at) for trigger in due]
+            )
+        )
+        return [
+            trigger for trigger in triggers
+            if trigger.type not in TIME_TRIGGER_TYPES or trigger.id in claimed
+        ]
+
+    def update_trigger(self, trigger: Trigger, data: dict) -> None:
+        """Change a trigger, moving its next_fire_at along as the TriggerRepository does."""
+        for field, value in with_next_fire_at(trigger, data).items():
+            setattr(trigger, field, value)
+
+        trigger.updated_at = datetime.now()
+
+    def assign(self, session: Session, resource: Resource) -> None:
+        """Dispatch a session to a resource."""
+        now = datetime.now()
+
+        session.resource_id = resource.id
+        session.dispatched_at = now
+        session.updated_at = now
+
+        resource.available = False
+        resource.updated_at = now
+
+        self._busy_resource_ids.add(resource.id)
+        self._available &= ~self.capability_index.slot_bits([resource.id])
@@ -10,44 +10,18 @@ from datetime import datetime
 from typing import Any, Dict
 
 from app.database.models import Trigger
-from app.database.repository import (
-    TriggerRepository,
-    SessionRepository,
-    ResourceRepository,
-    WorkqueueRepository,
-    ProcessRepository
-)
-from app.services import SessionService, ResourceService, WorkqueueService
+from app.scheduler.snapshot import SchedulerSnapshot
 from app.scheduler.validators import validate_parameters, process_trigger_with_validation
 
 logger = logging.getLogger(__name__)
 
 
 class ProcessingServices:
-    """Container for services and repositories needed by trigger processors."""
+    """Container for what trigger processors work on."""
     
-    def __init__(
-        self,
-        session_service: SessionService,
-        resource_service: ResourceService,
-        workqueue_service: WorkqueueService,
-        trigger_repository: TriggerRepository,
-        session_repository: SessionRepository,
-        resource_repository: ResourceRepository,
-        workqueue_repository: WorkqueueRepository,
-        process_repository: ProcessRepository,
-    ):
-        # Services
-        self.session_service = session_service
-        self.resource_service = resource_service
-        self.workqueue_service = workqueue_service
-        
-        # Repositories
-        self.trigger_repository = trigger_repository
-        self.session_repository = session_repository
-        self.resource_repository = resource_repository
-        self.workqueue_repository = workqueue_repository
-        self.process_repository = process_repository
+    def __init__(self, snapshot: SchedulerSnapshot):
+        # Processors read the tick's state from the snapshot and record their changes on it
+        self.snapshot = snapshot
 
 
 class AbstractTriggerProcessor(ABC):
@@ -102,27 +76,6 @@ class AbstractTriggerProcessor(ABC):
         """
         pass
     
-    def _should_trigger_in_current_minute(self, trigger: Trigger, now: datetime) -> bool:
-        """Check if a trigger should fire based on last_triggered time.
-        
-        Args:
-            trigger: The trigger to check
-            now: Current datetime
-            
-        Returns:
-            True if trigger should fire (hasn't been triggered in current minute), False otherwise
-        """
-        if trigger.last_triggered is None:
-            # Never been triggered, should fire
-            return True
-        
-        # Compare at minute level (ignore seconds and microseconds)
-        current_minute = now.replace(second=0, microsecond=0)
-        last_triggered_minute = trigger.last_triggered.replace(second=0, microsecond=0)
-        
-        # Only trigger if it hasn't been triggered in the current minute
-        return current_minute != last_triggered_minute
-    
     def _create_session(self, trigger: Trigger, validated_params: str, force: bool = False) -> bool:
         """Helper method to create a session for a trigger.
         
@@ -135,24 +88,20 @@ class AbstractTriggerProcessor(ABC):
             True if session was created successfully
         """
         try:
-            session = self.services.session_service.create_session(
-                trigger.process_id,
-                force=force,
-                parameters=validated_params
-            )
-            
-            if session:
-                # Update last_triggered timestamp after successful session creation
-                self.services.trigger_repository.update(
-                    trigger, 
-                    {"last_triggered": datetime.now()}
-                )
-                logger.info(f"Created session {session.id} for trigger {trigger.id}")
-                return True
-            else:
+            snapshot = self.services.snapshot
+
+            # A process with a session waiting to start does not get another one unless forced
+            if not force and snapshot.has_new_session(trigger.process_id):
                 logger.debug(f"Session already exists for trigger {trigger.id} (force={force})")
                 return True
+
+            snapshot.create_session(trigger.process_id, validated_params)
+
+            # Update last_triggered timestamp after successful session creation
+            snapshot.update_trigger(trigger, {"last_triggered": datetime.now()})
+            logger.info(f"Created session for trigger {trigger.id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Failed to create session for trigger {trigger.id}: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -6,10 +6,10 @@ This module implements the trigger processor for cron-based scheduling.
 
 import logging
 from datetime import datetime, timedelta
-from cronsim import CronSim
 
+from app.config import settings
 from app.database.models import Trigger
-from app.scheduler.validators import validate_cron_expression
+from app.database.repository import next_fire_time
 from .base import AbstractTriggerProcessor
 
 logger = logging.getLogger(__name__)
@@ -21,6 +21,9 @@ class CronTriggerProcessor(AbstractTriggerProcessor):
     def _process_trigger(self, trigger: Trigger, validated_params: str, now: datetime) -> bool:
         """Process a cron trigger.
         
+        The trigger fires when its next_fire_at has passed. Runs that are more than
+        `scheduler_misfire_grace_time` seconds late are skipped.
+        
         Args:
             trigger: The cron trigger to process
             validated_params: Pre-validated parameters
@@ -30,36 +33,31 @@ class CronTriggerProcessor(AbstractTriggerProcessor):
             True if processing was successful
         """
         try:
-            # Validate the cron expression
-            validated_cron = validate_cron_expression(trigger.cron)
-            
-            # Check if it's time to trigger based on the cron expression
-            # Simple approach: start from one minute before and check if next match is current minute
-            current_minute = now.replace(second=0, microsecond=0)
-            
-            # Start from one minute before to catch the current minute
-            start_time = current_minute - timedelta(minutes=1)
-            
-            try:
-                cron_sim = CronSim(validated_cron, start_time)
-                next_time = next(cron_sim)
-                
-                # If the next scheduled time matches the current minute, check if we should trigger
-                if next_time.replace(second=0, microsecond=0) == current_minute:
-                    # Check if this trigger has already been fired in the current minute
-                    if not self._should_trigger_in_current_minute(trigger, now):
-                        logger.debug(f"Cron trigger {trigger.id} already fired in current minute, skipping")
-                        return True
-                    
-                    logger.info(f"Triggering cron trigger {trigger.id} at {now}")
-                    return self._create_session(trigger, validated_params)
-                else:
-                    # Not time to trigger yet, but processing was successful
-                    return True
-            except StopIteration:
-                # No more matches in the next 50 years, so definitely not triggering now
+            if trigger.next_fire_at is None or trigger.next_fire_at > now:
+                # Not time to trigger yet, but processing was successful
+                return True
+
+            if now - trigger.next_fire_at > timedelta(seconds=settings.scheduler_misfire_grace_time):
+                logger.warning(
+                    f"Cron trigger {trigger.id} missed its run at {trigger.next_fire_at}, skipping it"
+                )
+                self._schedule_next_run(trigger, now)
                 return True
-                
+
+            logger.info(f"Triggering cron trigger {trigger.id} at {now}")
+            success = self._create_session(trigger, validated_params)
+
+            # Nothing was updated when the session already existed
+            if success and trigger.next_fire_at is not None and trigger.next_fire_at <= now:
+                self._schedule_next_run(trigger, now)
+
+            return success
+
         except Exception as e:
             logger.error(f"Error processing cron trigger {trigger.id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def _schedule_next_run(self, trigger: Trigger, now: datetime) -> None:
+        self.services.snapshot.update_trigger(
+            trigger, {"next_fire_at": next_fire_time(trigger, now)}
+        )
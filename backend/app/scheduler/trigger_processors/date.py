@@ -37,7 +37,7 @@ class DateTriggerProcessor(AbstractTriggerProcessor):
                 
                 if success:
                     # Date triggers are one-time only, so disable and mark as deleted
-                    self.services.trigger_repository.update(trigger, {"enabled": False, "deleted": True})
+                    self.services.snapshot.update_trigger(trigger, {"enabled": False, "deleted": True})
                     logger.info(f"Date trigger {trigger.id} disabled after execution")
                 
                 return success
@@ -6,10 +6,9 @@ This module implements the trigger processor for workqueue-based scheduling.
 
 import logging
 from datetime import datetime
-from typing import List
 
 from app.database.models import Trigger
-from app.scheduler.utils import calculate_required_sessions, should_scale_up, find_best_resource
+from app.scheduler.utils import calculate_required_sessions, should_scale_up
 from .base import AbstractTriggerProcessor
 
 logger = logging.getLogger(__name__)
@@ -39,7 +38,7 @@ class WorkqueueTriggerProcessor(AbstractTriggerProcessor):
                 return True  # Skip disabled workqueues
             
             # Check for pending work items
-            pending_items = self.services.workqueue_service.count_pending_items(trigger.workqueue_id)
+            pending_items = self.services.snapshot.pending_items.get(trigger.workqueue_id, 0)
             
             # Calculate how many sessions we need
             required_sessions = calculate_required_sessions(
@@ -50,7 +49,7 @@ class WorkqueueTriggerProcessor(AbstractTriggerProcessor):
                 return True  # No work to do
             
             # Check current active sessions for this process
-            active_sessions = self._get_active_sessions_for_process(trigger.process_id)
+            active_sessions = self.services.snapshot.active_sessions(trigger.process_id)
             
             # Decide if we should scale up
             if should_scale_up(active_sessions, required_sessions, trigger.workqueue_resource_limit):
@@ -83,42 +82,17 @@ class WorkqueueTriggerProcessor(AbstractTriggerProcessor):
         Returns:
             Workqueue object or None if not found
         """
-        try:
-            if not trigger.workqueue_id:
-                logger.error(f"Workqueue trigger {trigger.id} has no workqueue_id")
-                return None
-                
-            workqueue = self.services.workqueue_repository.get(trigger.workqueue_id)
-            
-            if workqueue is None:
-                logger.error(f"Workqueue {trigger.workqueue_id} does not exist")
-                return None
-                
-            return workqueue
-            
-        except Exception as e:
-            logger.error(f"Error getting workqueue {trigger.workqueue_id}: {e}")
+        if not trigger.workqueue_id:
+            logger.error(f"Workqueue trigger {trigger.id} has no workqueue_id")
             return None
-    
-    def _get_active_sessions_for_process(self, process_id: int) -> List:
-        """Get active sessions for a specific process.
-        
-        Args:
-            process_id: The process ID to filter by
-            
-        Returns:
-            List of active sessions for the process
-        """
-        try:
-            active_sessions = self.services.session_repository.get_active_sessions()
-            return [
-                session for session in active_sessions
-                if session.process_id == process_id
-            ]
-            
-        except Exception as e:
-            logger.error(f"Error getting active sessions for process {process_id}: {e}")
-            return []
+
+        workqueue = self.services.snapshot.workqueues.get(trigger.workqueue_id)
+
+        if workqueue is None:
+            logger.error(f"Workqueue {trigger.workqueue_id} does not exist")
+            return None
+
+        return workqueue
     
     def _are_resources_available(self, trigger: Trigger) -> bool:
         """Check if resources are available for a trigger.
@@ -129,21 +103,15 @@ class WorkqueueTriggerProcessor(AbstractTriggerProcessor):
         Returns:
             True if resources are available
         """
-        try:
-            # Get the process to check its requirements
-            process = self.services.process_repository.get(trigger.process_id)
-            if process is None:
-                logger.error(f"Process {trigger.process_id} not found for trigger {trigger.id}")
-                return False
-            
-            # Get available resources
-            available_resources = self.services.resource_repository.get_available_resources()
-            
-            # Check if any resource can satisfy the requirements
-            best_resource = find_best_resource(process.requirements, available_resources)
-            
-            return best_resource is not None
-            
-        except Exception as e:
-            logger.error(f"Error checking resources for trigger {trigger.id}: {e}")
-            return False
\ No newline at end of file
+        snapshot = self.services.snapshot
+
+        # Get the process to check its requirements
+        process = snapshot.processes.get(trigger.process_id)
+        if process is None:
+            logger.error(f"Process {trigger.process_id} not found for trigger {trigger.id}")
+            return False
+
+        # Check if any resource can satisfy the requirements
+        best_resource = snapshot.find_best_resource(process.requirements)
+
+        return best_resource is not None
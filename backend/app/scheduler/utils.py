@@ -29,6 +29,8 @@ def parse_capabilities_or_requirements(string: str) -> Set[str]:
 def find_best_resource(requirements: str, resources: List[Resource]) -> Optional[Resource]:
     """Find the best matching resource for given requirements.
     
+    The scheduler keeps a CapabilityIndex across ticks, this builds one for a single lookup.
+    
     Args:
         requirements: Requirements string for the session
         resources: List of available resources
@@ -36,24 +38,21 @@ def find_best_resource(requirements: str, resources: List[Resource]) -> Optional
     Returns:
         Best matching resource or None if no match found
     """
+    # Import here to avoid circular imports
+    from app.scheduler.capabilities import CapabilityIndex
+
     if not requirements or not resources:
         return None
-    
-    session_requirements = parse_capabilities_or_requirements(requirements)
-    best_resource = None
-    least_capabilities = float("inf")
 
-    for resource in resources:
-        resource_capabilities = parse_capabilities_or_requirements(resource.capabilities)
-        
-        # Check if resource can satisfy all requirements
-        if session_requirements.issubset(resource_capabilities):
-            # Prefer resources with fewer capabilities to avoid over-allocation
-            if len(resource_capabilities) < least_capabilities:
-                best_resource = resource
-                least_capabilities = len(resource_capabilities)
+    index = CapabilityIndex()
+    index.sync(resources)
+
+    # Prefer resources with fewer capabilities to avoid over-allocation
+    resource_id = index.best(requirements, index.slot_bits(index.slots))
+    if resource_id is None:
+        return None
 
-    return best_resource
+    return next(resource for resource in resources if resource.id == resource_id)
 
 
 def calculate_required_sessions(pending_items: int, scale_threshold: int) -> int:
@@ -1 +1,5 @@
 from .oauth2 import oauth2_scheme as oauth2_scheme
+from .access_tokens import (
+    hash_token as hash_token,
+    invalidate_token as invalidate_token,
+)
@@ -0,0 +1,22 @@
+import hashlib
+
+from app.cache import TTLCache
+from app.config import settings
+
+# Caches both hits and misses, keyed by token hash. A token revoked on another
+# replica is rejected here once its entry expires.
+token_cache = TTLCache(
+    ttl=settings.access_token_cache_ttl, maxsize=settings.access_token_cache_size
+)
+
+# Remembers whether any tokens exist, which decides if the API runs in development mode.
+tokens_exist_cache = TTLCache(ttl=settings.access_token_cache_ttl, maxsize=1)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def invalidate_token(token_hash: str) -> None:
+    token_cache.pop(token_hash)
+    tokens_exist_cache.clear()
@@ -2,3 +2,4 @@ from .resource_service import ResourceService as ResourceService
 from .auditlog_service import AuditLogService as AuditLogService
 from .session_service import SessionService as SessionService
 from .workqueue_service import WorkqueueService as WorkqueueService
+from .workitem_ingest import WorkItemIngestService as WorkItemIngestService
@@ -1,8 +1,18 @@
+import logging
+from datetime import date, timedelta
 from typing import Optional
 
 from app.api.v1.schemas import PaginatedResponse
 from app.database.repository import AuditLogRepository
 from app.database.models import AuditLog
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
 
 
 class AuditLogService:
@@ -15,10 +25,11 @@ class AuditLogService:
         page: int = 1,
         size: int = 10,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedResponse[AuditLog]:
         skip = (page - 1) * size
-        logs, total_items = self.repository.get_paginated(
-            session_id, search, skip, size
+        page_of_logs, total_items = self.repository.get_paginated(
+            session_id, search, skip, size, cursor=cursor
         )
 
         total_pages = (total_items + size - 1) // size
@@ -28,10 +39,33 @@ class AuditLogService:
             size=size,
             total_items=total_items,
             total_pages=total_pages,
-            items=logs,
+            items=page_of_logs.items,
+            next_cursor=page_of_logs.next_cursor,
+            prev_cursor=page_of_logs.prev_cursor,
         )
 
         return response
 
     def get_by_workitem(self, workitem_id: int) -> list[AuditLog]:
         return self.repository.get_logs_by_workitem_id(workitem_id)
+
+    def maintain_partitions(self, today: date) -> None:
+        """Create the coming monthly partitions and drop the months past retention."""
+        this_month = today.replace(day=1)
+        existing = self.repository.get_partition_months()
+
+        for months in range(settings.auditlog_partition_months_ahead + 1):
+            month = add_months(this_month, months)
+            if month not in existing:
+                logger.info(f"Creating audit log partition for {month:%Y-%m}")
+                self.repository.create_partition(month)
+
+        if settings.auditlog_retention_days <= 0:
+            return
+
+        # A partition is dropped once all of its month is older than the retention period
+        cutoff = today - timedelta(days=settings.auditlog_retention_days)
+        for month in existing:
+            if add_months(month, 1) <= cutoff:
+                logger.info(f"Dropping audit log partition for {month:%Y-%m}")
+                self.repository.drop_partition(month)
@@ -1,9 +1,12 @@
+import logging
 from datetime import datetime, timedelta
 
+from app.config import settings
 from app.database.repository import SessionRepository, ResourceRepository
 from app.database.models import Resource
 
-from app.enums import SessionStatus
+
+logger = logging.getLogger(__name__)
 
 
 class ResourceService:
@@ -15,21 +18,20 @@ class ResourceService:
         self.repository = resource_repository
         self.session_repository = session_repository
 
-    def update_availability(self):
-        resources = self.repository.get_all()
-
-        for resource in resources:
-            if (
-                resource.last_seen < datetime.now() - timedelta(minutes=10)
-                and not resource.deleted
-            ):
-                # Only detach the resource if there are no in-progress sessions
-                if not any(
-                    x.status == SessionStatus.IN_PROGRESS
-                    and x.resource_id == resource.id
-                    for x in self.session_repository.get_active_sessions()
-                ):
-                    self.detach(resource)
+    def update_availability(self) -> list[int]:
+        """Detach resources whose last ping is older than resource_heartbeat_ttl.
+
+        Runs as scheduler housekeeping. Their sessions are flushed, so new sessions are
+        dispatched again in the same tick. Returns the ids of the detached resources.
+        """
+        seen_before = datetime.now() - timedelta(seconds=settings.resource_heartbeat_ttl)
+        resource_ids = self.repository.detach_stale(seen_before)
+        if not resource_ids:
+            return []
+
+        session_ids = self.session_repository.flush_resources(resource_ids)
+        logger.warning(f"Detached resources {resource_ids} that stopped pinging, flushed sessions {session_ids}")
+        return resource_ids
 
     def enroll(self, fqdn: str, name: str, capabilities: str):
         previous = self.repository.get_by_fqdn(fqdn)
@@ -60,38 +62,20 @@ class ResourceService:
         return self.repository.create(data)
 
     def keep_alive(self, resource: Resource):
-        data = resource.model_dump()
-
-    
-        data["deleted"] = False
-        data["last_seen"] = datetime.now()
-
-        return self.repository.update(resource, data)
+        return self.repository.update(resource, {"deleted": False, "last_seen": datetime.now()})
 
     def detach(self, resource: Resource):
-        data = resource.model_dump()
-
-        data["available"] = False
-        data["deleted"] = True
         self.flush_sessions(resource)
 
-        return self.repository.update(resource, data)
+        return self.repository.update(resource, {"available": False, "deleted": True})
 
-    def flush_sessions(self, resource: Resource):
+    def flush_sessions(self, resource: Resource) -> list[int]:
         """
         Detaches all sessions from the specified resource.
         If any session is in progress, it will be marked as failed. If any session is new, it will be detached from the resource.
+        Returns the ids of the detached sessions.
         """
-        sessions = self.session_repository.get_active_sessions()
-        for session in (s for s in sessions if s.resource_id == resource.id):
-            if session.status == SessionStatus.IN_PROGRESS:
-                self.session_repository.update(
-                    session, {"status": SessionStatus.FAILED, "resource_id": None}
-                )
-
-            # Detach the session from the resource
-            if session.status == SessionStatus.NEW:
-                self.session_repository.update(
-                    session, {"resource_id": None, "dispatched_at": None}
-                )
-
+        session_ids = self.session_repository.flush_resources([resource.id])
+        if session_ids:
+            logger.info(f"Detached sessions {session_ids} from resource {resource.id}")
+        return session_ids
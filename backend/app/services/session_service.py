@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 from datetime import datetime, timedelta
 
@@ -6,6 +7,8 @@ from app.database.repository import SessionRepository, ResourceRepository
 from app.database.models import Session
 from app.enums import SessionStatus
 
+logger = logging.getLogger(__name__)
+
 
 class SessionService:
     def __init__(self, session_repository: SessionRepository, resource_repository: ResourceRepository):
@@ -18,10 +21,11 @@ class SessionService:
         size: int = 10,
         search: Optional[str] = None,
         include_deleted: bool = False,
+        cursor: Optional[str] = None,
     ) -> PaginatedResponse[Session]:
         skip = (page - 1) * size
-        sessions, total_items = self.repository.get_paginated(
-            search, skip, size, include_deleted
+        page_of_sessions, total_items = self.repository.get_paginated(
+            search, skip, size, include_deleted, cursor
         )
         # total_items = self.repository.count_all(search)
         total_pages = (total_items + size - 1) // size
@@ -31,44 +35,29 @@ class SessionService:
             size=size,
             total_items=total_items,
             total_pages=total_pages,
-            items=sessions,
+            items=page_of_sessions.items,
+            next_cursor=page_of_sessions.next_cursor,
+            prev_cursor=page_of_sessions.prev_cursor,
         )
 
         return response
 
-    def reschedule_orphaned_sessions(self):
-        """This function iterates over all new sessions and checks if the resource is unavailable. If so, it removes the session from the resource."""
-
-        sessions = self.repository.get_new_sessions()
-
-        for session in sessions:
-            if session.resource_id is None:
-                continue
-
-            resource = self.resource_repository.get(session.resource_id)
-
-            if resource is None or resource.deleted:
-                self.repository.update(
-                    session, {"resource_id": None, "dispatched_at": None}
-                )
-                continue
-
-    def flush_dangling_sessions(self):
-        """This function iterates over all sessions that are in progress and marks them as failed if the resource is unavailable. 
-        The sessions needs to have been dispatched at least 4 hours ago."""
-        sessions = self.repository.get_active_sessions()
-
-        sessions = [session for session in sessions if session.status == SessionStatus.IN_PROGRESS]
-
-        for session in sessions:
-            if (
-                session.dispatched_at < datetime.now() - timedelta(hours=4)
-            ):
-                resource = self.resource_repository.get(session.resource_id)
-
-                if resource is None or resource.deleted:
-                    self.repository.update(session, {"status": "failed"})
-                    continue
+    def reschedule_orphaned_sessions(self) -> list[int]:
+        """Release new sessions dispatched to a deleted resource, so they are dispatched again.
+
+        Returns the ids of the released sessions."""
+        session_ids = self.repository.release_orphaned()
+        if session_ids:
+            logger.info(f"Rescheduled orphaned sessions {session_ids}")
+        return session_ids
+
+    def flush_dangling_sessions(self) -> list[int]:
+        """Fail sessions in progress on a deleted resource.
+        The sessions needs to have been dispatched at least 4 hours ago. Returns the ids of the failed sessions."""
+        session_ids = self.repository.fail_dangling(datetime.now() - timedelta(hours=4))
+        if session_ids:
+            logger.warning(f"Failed dangling sessions {session_ids}")
+        return session_ids
 
     def create_session(self, process_id: int, force: bool = False, parameters: str = None) -> Optional[Session]:
         """Create a new session for the given process.
@@ -0,0 +1,276 @@
+"""
+Streaming ingest of work items.
+
+Request bodies are parsed incrementally, so memory use is bounded by the batch size
+rather than the size of the upload. Records are yielded as (row, record) tuples where
+row is the 1-based record number and record is either a dict or an error message.
+"""
+
+import codecs
+import csv
+import json
+import re
+from datetime import datetime
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.api.v1.schemas import WorkItemBulkResult, WorkItemCreate
+from app.config import settings
+from app.database.repository import WorkItemRepository
+from app.enums import WorkItemStatus
+
+# A single record larger than this aborts the ingest instead of buffering indefinitely
+MAX_RECORD_SIZE = 1024 * 1024
+
+Record = tuple[int, dict | str]
+
+WHITESPACE = re.compile(r"\s*")
+
+
+class IngestError(Exception):
+    """Raised when the body is malformed in a way that makes further parsing impossible."""
+
+    def __init__(self, row: int, message: str):
+        super().__init__(message)
+        self.row = row
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+
+        for line in lines:
+            yield line.rstrip("\r")
+
+        if len(buffer) > MAX_RECORD_SIZE:
+            raise IngestError(0, "Line exceeds the maximum record size")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    row = 0
+
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, f"Invalid JSON: {e.msg}"
+
+
+async def parse_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Parse CSV with a header row. Records cannot span multiple lines.
+
+    The `reference` column becomes the reference and the `data` column, if present, is
+    parsed as a JSON object. Any other columns are added to data as strings.
+    """
+    header = None
+    row = 0
+
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+
+        values = next(csv.reader([line]))
+
+        if header is None:
+            header = values
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+
+        yield row, _csv_record(dict(zip(header, values)))
+
+
+def _csv_record(columns: dict[str, str]) -> dict | str:
+    reference = columns.pop("reference", "")
+    data = columns.pop("data", "") or "{}"
+
+    try:
+        data = json.loads(data)
+    except json.JSONDecodeError as e:
+        return f"Invalid JSON in data column: {e.msg}"
+
+    if not isinstance(data, dict):
+        return "The data column must contain a JSON object"
+
+    return {"reference": reference, "data": data | columns}
+
+
+async def parse_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    reader = _JsonArrayReader()
+
+    async for chunk in chunks:
+        for record in reader.feed(decoder.decode(chunk)):
+            yield record
+
+    for record in reader.feed(decoder.decode(b"", final=True), final=True):
+        yield record
+
+
+class _JsonArrayReader:
+    """Incrementally splits a JSON array into its elements.
+
+    Records are decoded in place from an offset into the buffer, which is trimmed once per
+    chunk, so a large chunk is not copied again for every record in it.
+    """
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.row = 0
+        self.started = False
+        self.finished = False
+        self.expect_separator = False
+
+    def feed(self, text: str, final: bool = False) -> list[Record]:
+        self.buffer += text
+        records = []
+
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos == len(self.buffer):
+                break
+
+            if not self.started:
+                self._consume("[", "The body must be a JSON array")
+                self.started = True
+            elif self.finished:
+                raise IngestError(self.row + 1, "Unexpected data after the JSON array")
+            elif self.buffer[self.pos] == "]":
+                self._consume("]")
+                self.finished = True
+            elif self.expect_separator:
+                self._consume(",", "Expected ',' between array elements")
+                self.expect_separator = False
+            else:
+                value, end = self._decode(final)
+                if end is None:
+                    break
+
+                self.pos = end
+                self.expect_separator = True
+                self.row += 1
+                records.append((self.row, value))
+
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+        if final and not self.finished:
+            raise IngestError(self.row + 1, "Unexpected end of the JSON array")
+
+        return records
+
+    def _consume(self, token: str, error: str = "") -> None:
+        if self.buffer[self.pos] != token:
+            raise IngestError(self.row + 1, error)
+        self.pos += 1
+
+    def _decode(self, final: bool) -> tuple[object, int | None]:
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, self.pos)
+        except json.JSONDecodeError as e:
+            if final or len(self.buffer) - self.pos > MAX_RECORD_SIZE:
+                raise IngestError(self.row + 1, f"Invalid JSON: {e.msg}")
+            return None, None
+
+        # A scalar at the end of the buffer may continue in the next chunk
+        if end == len(self.buffer) and not final and not isinstance(value, (dict, list)):
+            return None, None
+
+        return value, end
+
+
+PARSERS = {
+    "application/json": parse_json_array,
+    "application/x-ndjson": parse_ndjson,
+    "application/jsonl": parse_ndjson,
+    "text/csv": parse_csv,
+}
+
+
+def get_parser(content_type: str | None):
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+    return PARSERS.get(media_type)
+
+
+class WorkItemIngestService:
+    def __init__(self, work_item_repository: WorkItemRepository):
+        self.repository = work_item_repository
+        self.batch_size = settings.workitem_bulk_batch_size
+
+    async def ingest(
+        self, workqueue_id: int, records: AsyncIterator[Record]
+    ) -> WorkItemBulkResult:
+        """Validate records and insert them in batches, reporting rows that failed."""
+        result = WorkItemBulkResult()
+        batch = []
+
+        try:
+            async for row, record in records:
+                item = self._to_row(workqueue_id, record)
+
+                if isinstance(item, str):
+                    result.add_error(row, item)
+                    continue
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    await self._flush(batch, result)
+                    batch = []
+        except IngestError as e:
+            result.add_error(e.row, str(e))
+            result.complete = False
+
+        if batch:
+            await self._flush(batch, result)
+
+        return result
+
+    async def _flush(self, batch: list[dict], result: WorkItemBulkResult) -> None:
+        await run_in_threadpool(self.repository.bulk_create, batch)
+        result.created += len(batch)
+
+    def _to_row(self, workqueue_id: int, record: dict | str) -> dict | str:
+        if isinstance(record, str):
+            return record
+
+        if not isinstance(record, dict):
+            return "Each work item must be a JSON object"
+
+        try:
+            item = WorkItemCreate.model_validate(record)
+        except ValidationError as e:
+            return "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+
+        now = datetime.now()
+        return {
+            "data": item.data,
+            "reference": item.reference,
+            "locked": False,
+            "status": WorkItemStatus.NEW,
+            "message": "",
+            "workqueue_id": workqueue_id,
+            "created_at": now,
+            "updated_at": now,
+        }
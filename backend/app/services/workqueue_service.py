@@ -1,11 +1,17 @@
 from typing import Optional
 
-from app.api.v1.schemas import PaginatedResponse
+from app.api.v1.schemas import PaginatedResponse, WorkqueueInformation
+from app.cache import TTLCache
+from app.config import settings
 from app.database.repository import WorkqueueRepository
 
 from app.database.models import WorkItem
 from app.enums import WorkItemStatus
 
+# Work item counts for all queues, shared by the dashboard and the workqueue trigger
+workitem_counts_cache = TTLCache(ttl=settings.workqueue_counts_cache_ttl, maxsize=1)
+
+
 class WorkqueueService:
     def __init__(self, workqueue_repository: WorkqueueRepository):
         self.repository = workqueue_repository
@@ -16,10 +22,11 @@ class WorkqueueService:
         page: int = 1,
         size: int = 10,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedResponse[WorkItem]:
         skip = (page - 1) * size
-        sessions, total_items = self.repository.get_workitems_paginated(
-            workqueue_id, search, skip, size
+        page_of_items, total_items = self.repository.get_workitems_paginated(
+            workqueue_id, search, skip, size, cursor=cursor
         )
 
         total_pages = (total_items + size - 1) // size
@@ -29,12 +36,42 @@ class WorkqueueService:
             size=size,
             total_items=total_items,
             total_pages=total_pages,
-            items=sessions,
+            items=page_of_items.items,
+            next_cursor=page_of_items.next_cursor,
+            prev_cursor=page_of_items.prev_cursor,
         )
 
         return response
 
+    def get_workitem_counts(self, workqueue_id: int) -> dict[WorkItemStatus, int]:
+        counts = workitem_counts_cache.get("counts")
+
+        if counts is None:
+            counts = self.repository.get_workitem_counts()
+            workitem_counts_cache.set("counts", counts)
+
+        return counts.get(workqueue_id, {})
+
+    def get_information(self, include_deleted: bool = False) -> list[WorkqueueInformation]:
+        result = []
+
+        for queue in self.repository.get_all(include_deleted):
+            counts = self.get_workitem_counts(queue.id)
+            result.append(
+                WorkqueueInformation(
+                    id=queue.id,
+                    name=queue.name,
+                    description=queue.description,
+                    enabled=queue.enabled,
+                    new=counts.get(WorkItemStatus.NEW, 0),
+                    in_progress=counts.get(WorkItemStatus.IN_PROGRESS, 0),
+                    completed=counts.get(WorkItemStatus.COMPLETED, 0),
+                    failed=counts.get(WorkItemStatus.FAILED, 0),
+                    pending_user_action=counts.get(WorkItemStatus.PENDING_USER_ACTION, 0),
+                )
+            )
+
+        return result
 
     def count_pending_items(self, workqueue_id: int) -> int:
-        # TODO: Implement deferred on this method
-        return self.repository.get_workitem_count(workqueue_id, status=WorkItemStatus.NEW)
+        return self.get_workitem_counts(workqueue_id).get(WorkItemStatus.NEW, 0)
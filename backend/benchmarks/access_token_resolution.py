@@ -0,0 +1,75 @@
+"""
+Benchmark for access token resolution.
+
+Measures the per-request cost of resolving a bearer token as the number of tokens grows,
+comparing the previous full table scan against the hashed index lookup, with and without
+the token cache.
+
+Runs against TEST_DATABASE_URL, which must be migrated to head. The accesstoken table is
+emptied before and after the run.
+
+    uv run python -m benchmarks.access_token_resolution
+"""
+
+import time
+
+from sqlmodel import Session, create_engine, delete
+
+from app.api.v1.dependencies import lookup_access_token
+from app.cache import clear_caches
+from app.config import settings
+from app.database.models import AccessToken
+from app.database.repository import AccessTokenRepository
+
+TOKEN_COUNTS = [10, 100, 1000, 5000]
+LOOKUPS = 500
+
+
+def full_scan(token: str, repository: AccessTokenRepository) -> AccessToken | None:
+    for candidate in repository.get_all():
+        if candidate.access_token == token:
+            return candidate
+    return None
+
+
+def cold_lookup(token: str, repository: AccessTokenRepository) -> AccessToken | None:
+    clear_caches()
+    return lookup_access_token(token, repository)
+
+
+def measure(lookup, token: str, repository: AccessTokenRepository) -> float:
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        lookup(token, repository)
+    return (time.perf_counter() - start) / LOOKUPS * 1_000_000
+
+
+def main() -> None:
+    engine = create_engine(settings.test_database_url)
+
+    with Session(engine) as session:
+        repository = AccessTokenRepository(session)
+        session.exec(delete(AccessToken))
+        session.commit()
+
+        print(f"{'tokens':>8} {'full scan':>12} {'index':>12} {'cached':>12}  (µs per lookup)")
+
+        created = 0
+        for count in TOKEN_COUNTS:
+            while created < count:
+                token = repository.create(f"benchmark-{created}").access_token
+                created += 1
+
+            scan = measure(full_scan, token, repository)
+            index = measure(cold_lookup, token, repository)
+            clear_caches()
+            cached = measure(lookup_access_token, token, repository)
+
+            print(f"{count:>8} {scan:>12.1f} {index:>12.1f} {cached:>12.1f}")
+
+        session.exec(delete(AccessToken))
+        session.commit()
+
+
+if __name__ == "__main__":
+    main()
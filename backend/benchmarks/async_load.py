@@ -0,0 +1,153 @@
+"""
+Load test for the async request path.
+
+Serves the resource ping in a separate uvicorn process twice: the previous sync endpoint,
+which runs in Starlette's threadpool on the sync engine, and the async endpoint on the
+async engine. Then it drives both at increasing concurrency and reports throughput and
+latency.
+
+Runs against TEST_DATABASE_URL, which must be migrated to head. A benchmark resource and
+access token are created and deleted afterwards.
+
+    uv run python -m benchmarks.async_load
+"""
+
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.v1.dependencies import get_resource_service, resolve_access_token
+from app.api.v1.resource_router import get_resource_include_deleted, router
+from app.config import settings
+from app.database.models import AccessToken, Resource
+from app.database.repository import AccessTokenRepository, ResourceRepository
+from app.database.session import async_database_url, get_async_session, get_session
+from app.services import ResourceService
+
+PORT = 8765
+CONCURRENCY = [10, 50, 200, 500]
+REQUESTS = 5000
+
+
+def serve() -> None:
+    app = FastAPI()
+    app.include_router(router)
+
+    @app.put("/legacy/{resource_id}/ping")
+    def ping_resource_sync(
+        resource: Resource = Depends(get_resource_include_deleted),
+        service: ResourceService = Depends(get_resource_service),
+        token: AccessToken = Depends(resolve_access_token),
+    ) -> bool:
+        service.keep_alive(resource)
+        return True
+
+    engine = create_engine(
+        settings.test_database_url,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+    )
+    async_engine = create_async_engine(
+        async_database_url(settings.test_database_url),
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+    )
+
+    def sync_session():
+        with Session(engine) as session:
+            yield session
+
+    async def async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = sync_session
+    app.dependency_overrides[get_async_session] = async_session
+
+    uvicorn.run(app, port=PORT, log_level="warning")
+
+
+async def run_load(url: str, token: str, concurrency: int) -> tuple[float, list[float]]:
+    latencies = []
+    remaining = REQUESTS
+
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"},
+        limits=httpx.Limits(max_connections=concurrency),
+        timeout=60,
+    ) as client:
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await client.put(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return REQUESTS / elapsed, latencies
+
+
+def wait_for_server() -> None:
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/docs")
+            return
+        except httpx.ConnectError:
+            time.sleep(0.1)
+    raise RuntimeError("Benchmark server did not start")
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    return statistics.quantiles(latencies, n=100)[int(fraction * 100) - 1] * 1000
+
+
+def main() -> None:
+    engine = create_engine(settings.test_database_url)
+
+    with Session(engine) as session:
+        resource = ResourceRepository(session).create(
+            {"name": "benchmark", "fqdn": "benchmark.local", "capabilities": "", "available": True}
+        )
+        access_token = AccessTokenRepository(session).create("benchmark")
+
+        server = multiprocessing.Process(target=serve, daemon=True)
+        server.start()
+        try:
+            wait_for_server()
+
+            print(f"{'path':>6} {'concurrency':>12} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+            for concurrency in CONCURRENCY:
+                for path, url in [
+                    ("sync", f"http://127.0.0.1:{PORT}/legacy/{resource.id}/ping"),
+                    ("async", f"http://127.0.0.1:{PORT}/resources/{resource.id}/ping"),
+                ]:
+                    throughput, latencies = asyncio.run(
+                        run_load(url, access_token.access_token, concurrency)
+                    )
+                    print(
+                        f"{path:>6} {concurrency:>12} {throughput:>8.0f} "
+                        f"{percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.99):>8.1f}"
+                    )
+        finally:
+            server.terminate()
+            session.delete(access_token)
+            session.delete(resource)
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
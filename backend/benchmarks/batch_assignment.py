@@ -0,0 +1,127 @@
+"""
+Benchmark for batch assignment of pending sessions to resources.
+
+Simulates scheduler ticks on a synthetic fleet whose resources all run Python and each
+have one other capability, the few GPU resources enrolled first. Most sessions only need
+Python, the others need one of the other capabilities too. Sessions arrive every tick at close to the fleet's capacity and
+run for a few ticks. Compares the greedy dispatcher, giving each session in turn the best
+free resource, with batch assignment on the same arrivals and run times.
+
+Runs in memory, no database is needed.
+
+    uv run python -m benchmarks.batch_assignment
+"""
+
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from app.scheduler.assignment import assign_batch
+from app.scheduler.capabilities import CapabilityIndex
+
+TICKS = 500
+# Number of resources with each capability besides python
+KINDS = {"gpu": 20, "java": 60, "docker": 60, "office": 60}
+GENERIC_FRACTION = 0.6
+MIN_RUN_TICKS = 2
+MAX_RUN_TICKS = 6
+LOAD = 0.85
+
+
+def create_resources() -> list:
+    capabilities = [f"python {kind}" for kind, count in KINDS.items() for _ in range(count)]
+    return [SimpleNamespace(id=resource_id, capabilities=caps) for resource_id, caps in enumerate(capabilities)]
+
+
+def create_arrivals(rng: random.Random) -> list[list[tuple[str, int]]]:
+    """Requirements and run ticks of the sessions arriving in each tick."""
+    capacity = sum(KINDS.values()) / ((MIN_RUN_TICKS + MAX_RUN_TICKS) / 2)
+    arrivals = []
+    for _ in range(TICKS):
+        sessions = []
+        for _ in range(int(capacity * LOAD * 2 * rng.random())):
+            if rng.random() < GENERIC_FRACTION:
+                requirements = "python"
+            else:
+                # Demand for each capability in proportion to the resources having it
+                requirements = f"python,{rng.choices(list(KINDS), weights=list(KINDS.values()))[0]}"
+            sessions.append((requirements, rng.randint(MIN_RUN_TICKS, MAX_RUN_TICKS)))
+        arrivals.append(sessions)
+    return arrivals
+
+
+def assign_greedy(index: CapabilityIndex, requirements: list[str], available: int) -> list[int | None]:
+    assigned = []
+    for session_requirements in requirements:
+        resource_id = index.best(session_requirements, available)
+        if resource_id is not None:
+            available &= ~index.slot_bits([resource_id])
+        assigned.append(resource_id)
+    return assigned
+
+
+def simulate(assign, resources: list, arrivals: list) -> dict:
+    index = CapabilityIndex()
+    index.sync(resources)
+
+    # Pending sessions as (arrival tick, requirements, run ticks), oldest first
+    pending = []
+    # Resource id -> tick its session finishes
+    running = {}
+    waits = []
+    busy_ticks = 0
+    elapsed = 0.0
+
+    for tick, arriving in enumerate(arrivals):
+        running = {resource_id: end for resource_id, end in running.items() if end > tick}
+        pending.extend((tick, requirements, run_ticks) for requirements, run_ticks in arriving)
+        available = index.slot_bits(resource.id for resource in resources if resource.id not in running)
+
+        start = time.perf_counter()
+        assigned = assign(index, [requirements for _, requirements, _ in pending], available)
+        elapsed += time.perf_counter() - start
+
+        still_pending = []
+        for (arrived, requirements, run_ticks), resource_id in zip(pending, assigned):
+            if resource_id is None:
+                still_pending.append((arrived, requirements, run_ticks))
+            else:
+                running[resource_id] = tick + run_ticks
+                waits.append(tick - arrived)
+        pending = still_pending
+        busy_ticks += len(running)
+
+    return {
+        "utilization": busy_ticks / (len(resources) * len(arrivals)),
+        "mean wait": statistics.mean(waits),
+        "p95 wait": statistics.quantiles(waits, n=20)[-1],
+        "pending at end": len(pending),
+        "ms per tick": elapsed / len(arrivals) * 1000,
+    }
+
+
+def main() -> None:
+    resources = create_resources()
+    arrivals = create_arrivals(random.Random(42))
+
+    print(f"{len(resources)} resources, {sum(map(len, arrivals))} sessions over {TICKS} ticks")
+
+    results = {
+        "greedy": simulate(assign_greedy, resources, arrivals),
+        "batch": simulate(assign_batch, resources, arrivals),
+    }
+
+    print(f"{'':>16}" + "".join(f"{mode:>12}" for mode in results))
+    for metric, fmt in [
+        ("utilization", "{:>12.1%}"),
+        ("mean wait", "{:>12.2f}"),
+        ("p95 wait", "{:>12.1f}"),
+        ("pending at end", "{:>12}"),
+        ("ms per tick", "{:>12.2f}"),
+    ]:
+        print(f"{metric:>16}" + "".join(fmt.format(result[metric]) for result in results.values()))
+
+
+if __name__ == "__main__":
+    main()
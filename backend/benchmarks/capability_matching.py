@@ -0,0 +1,115 @@
+"""
+Benchmark for matching pending sessions to resources.
+
+Dispatches pending sessions to resources the way a scheduler tick does, each session
+taking the best available resource. Compares parsing every resource's capabilities for
+every session, as find_best_resource did before the capability index, with the index.
+Parsing is too slow to run for every session, so it is timed on a sample and scaled up.
+
+Runs in memory, no database is needed.
+
+    uv run python -m benchmarks.capability_matching
+"""
+
+import random
+import time
+from types import SimpleNamespace
+
+from app.scheduler.capabilities import CapabilityIndex
+from app.scheduler.utils import parse_capabilities_or_requirements
+
+RESOURCES = 5000
+SESSIONS = 10000
+PARSED_SAMPLE = 20
+CAPABILITIES = [f"capability{number}" for number in range(40)]
+CHANGED_FRACTION = 0.01
+
+
+def create_resources(rng: random.Random) -> list:
+    return [
+        SimpleNamespace(id=resource_id, capabilities=" ".join(rng.sample(CAPABILITIES, rng.randint(3, 12))))
+        for resource_id in range(RESOURCES)
+    ]
+
+
+def create_requirements(rng: random.Random) -> list[str]:
+    # Processes share a small set of requirements, as in practice
+    process_requirements = [",".join(rng.sample(CAPABILITIES[:15], rng.randint(1, 3))) for _ in range(200)]
+    return [rng.choice(process_requirements) for _ in range(SESSIONS)]
+
+
+def parse_each_time(requirements: str, resources: list) -> object | None:
+    """find_best_resource before the capability index."""
+    session_requirements = parse_capabilities_or_requirements(requirements)
+    best_resource = None
+    least_capabilities = float("inf")
+
+    for resource in resources:
+        resource_capabilities = parse_capabilities_or_requirements(resource.capabilities)
+        if session_requirements.issubset(resource_capabilities):
+            if len(resource_capabilities) < least_capabilities:
+                best_resource = resource
+                least_capabilities = len(resource_capabilities)
+
+    return best_resource
+
+
+def dispatch_parsing(resources: list, requirements: list[str]) -> int:
+    available = list(resources)
+    dispatched = 0
+
+    for session_requirements in requirements:
+        resource = parse_each_time(session_requirements, available)
+        if resource is not None:
+            available.remove(resource)
+            dispatched += 1
+
+    return dispatched
+
+
+def dispatch_index(index: CapabilityIndex, resources: list, requirements: list[str]) -> int:
+    available = index.slot_bits(resource.id for resource in resources)
+    dispatched = 0
+
+    for session_requirements in requirements:
+        resource_id = index.best(session_requirements, available)
+        if resource_id is not None:
+            available &= ~index.slot_bits([resource_id])
+            dispatched += 1
+
+    return dispatched
+
+
+def main() -> None:
+    rng = random.Random(42)
+    resources = create_resources(rng)
+    requirements = create_requirements(rng)
+
+    print(f"{RESOURCES} resources, {SESSIONS} pending sessions")
+
+    start = time.perf_counter()
+    dispatch_parsing(resources, requirements[:PARSED_SAMPLE])
+    parsing = (time.perf_counter() - start) / PARSED_SAMPLE * SESSIONS
+    print(f"{'parse per session':>24} {parsing * 1000:>10.0f} ms (from {PARSED_SAMPLE} sessions)")
+
+    index = CapabilityIndex()
+    start = time.perf_counter()
+    index.sync(resources)
+    print(f"{'index build':>24} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+    start = time.perf_counter()
+    dispatched = dispatch_index(index, resources, requirements)
+    print(f"{'index dispatch':>24} {(time.perf_counter() - start) * 1000:>10.1f} ms ({dispatched} dispatched)")
+
+    # The next tick, with a few resources enrolled or changed
+    for resource in rng.sample(resources, int(RESOURCES * CHANGED_FRACTION)):
+        resource.capabilities = " ".join(rng.sample(CAPABILITIES, rng.randint(3, 12)))
+
+    start = time.perf_counter()
+    index.sync(resources)
+    print(f"{'incremental sync':>24} {(time.perf_counter() - start) * 1000:>10.1f} ms "
+          f"({CHANGED_FRACTION:.0%} changed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark for work item search.
+
+Fills a workqueue with synthetic work items and compares the previous ILIKE search over
+the reference, status and data cast to text against the indexed search. Each search
+fetches the first page and the total count, like the work item list in the UI does.
+
+Runs against TEST_DATABASE_URL, which must be migrated to head. The benchmark queue and
+its items are deleted afterwards.
+
+    uv run python -m benchmarks.workitem_search [item count]
+"""
+
+import sys
+import time
+
+from sqlalchemy import String, cast, or_, text
+from sqlalchemy.sql import func
+from sqlmodel import Session, create_engine, select
+
+from app.config import settings
+from app.database.models import WorkItem, Workqueue
+from app.database.repository import WorkqueueRepository
+
+DEFAULT_ITEMS = 200_000
+PAGE_SIZE = 50
+RUNS = 5
+
+SEARCHES = {
+    "rare reference": "ref-0123456",
+    "rare data value": "Customer 98765 ",
+    "common data value": "Odense",
+    "status": "failed",
+    "no match": "does-not-exist",
+}
+
+
+def populate(session: Session, workqueue_id: int, count: int) -> None:
+    session.execute(
+        text("""
+            INSERT INTO workitem (data, reference, locked, status, message, workqueue_id,
+                                  created_at, updated_at)
+            SELECT jsonb_build_object(
+                       'customer', jsonb_build_object('name', 'Customer ' || i || ' ', 'number', i),
+                       'city', (ARRAY['Odense', 'Aarhus', 'Aalborg', 'Esbjerg'])[i % 4 + 1],
+                       'lines', jsonb_build_array(i % 97, 'line ' || i % 13)
+                   ),
+                   'ref-' || lpad(i::text, 7, '0'),
+                   false,
+                   (ARRAY['NEW', 'COMPLETED', 'COMPLETED', 'FAILED'])[i % 4 + 1]::workitemstatus,
+                   '',
+                   :workqueue_id,
+                   now() - i * interval '1 second',
+                   now() - i * interval '1 second'
+            FROM generate_series(1, :count) AS i
+        """),
+        {"workqueue_id": workqueue_id, "count": count},
+    )
+    session.commit()
+    session.execute(text("ANALYZE workitem"))
+
+
+def legacy_search(session: Session, workqueue_id: int, search: str) -> int:
+    query = (
+        select(WorkItem)
+        .where(WorkItem.workqueue_id == workqueue_id)
+        .where(
+            or_(
+                WorkItem.reference.ilike(f"%{search}%"),
+                cast(WorkItem.status, String).ilike(f"%{search}%"),
+                cast(WorkItem.data, String).ilike(f"%{search}%"),
+            )
+        )
+    )
+    count_query = select(func.count()).select_from(WorkItem).where(query.whereclause)
+
+    total = session.exec(count_query).first()
+    session.exec(query.order_by(WorkItem.updated_at.desc()).limit(PAGE_SIZE)).all()
+    return total
+
+
+def indexed_search(session: Session, workqueue_id: int, search: str) -> int:
+    repository = WorkqueueRepository(session)
+    _, total = repository.get_workitems_paginated(workqueue_id, search, limit=PAGE_SIZE)
+    return total
+
+
+def measure(search_function, session: Session, workqueue_id: int, search: str) -> tuple[float, int]:
+    total = search_function(session, workqueue_id, search)
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        search_function(session, workqueue_id, search)
+    return (time.perf_counter() - start) / RUNS * 1000, total
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITEMS
+    engine = create_engine(settings.test_database_url)
+
+    with Session(engine) as session:
+        workqueue = Workqueue(name="benchmark-search", description="")
+        session.add(workqueue)
+        session.commit()
+
+        try:
+            print(f"Inserting {count} work items...")
+            populate(session, workqueue.id, count)
+
+            print(f"{'search':>18} {'matches':>9} {'ILIKE':>10} {'indexed':>10}  (ms per search)")
+
+            for name, search in SEARCHES.items():
+                legacy, legacy_total = measure(legacy_search, session, workqueue.id, search)
+                indexed, total = measure(indexed_search, session, workqueue.id, search)
+
+                print(f"{name:>18} {total:>9} {legacy:>10.1f} {indexed:>10.1f}")
+
+                # The previous search also matched key names in data
+                if legacy_total != total:
+                    print(f"{'':>18} ILIKE matched {legacy_total}")
+        finally:
+            session.rollback()
+            session.execute(
+                text("DELETE FROM workitem WHERE workqueue_id = :id"), {"id": workqueue.id}
+            )
+            session.delete(workqueue)
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,16 @@ from alembic import command
 from alembic.config import Config
 
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 from app.main import app
+from app.cache import clear_caches
 from app.config import settings
-from app.database.session import get_session
+from app.database.session import async_database_url, get_async_session, get_session
 
 @pytest.fixture(scope="session")
 def docker_postgresql_container():
@@ -108,7 +112,18 @@ def client_fixture(session: Session):
     def get_session_override():
         yield session
 
+    # Without pooling, as every TestClient runs the app on its own event loop
+    async_engine = create_async_engine(
+        async_database_url(settings.test_database_url), poolclass=NullPool
+    )
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    clear_caches()
 
     client = TestClient(app)
     yield client
@@ -0,0 +1,89 @@
+"""
+Tests for batch assignment of pending sessions to resources.
+"""
+
+import itertools
+import random
+from unittest.mock import MagicMock
+
+from app.scheduler.assignment import assign_batch
+from app.scheduler.capabilities import CapabilityIndex
+from app.scheduler.utils import parse_capabilities_or_requirements
+
+
+def create_index(capabilities):
+    index = CapabilityIndex()
+    index.sync(MagicMock(id=resource_id, capabilities=caps) for resource_id, caps in enumerate(capabilities, 1))
+    return index
+
+
+def all_slots(index):
+    return index.slot_bits(index.slots)
+
+
+def can_assign(capabilities, requirements, positions):
+    """Whether all sessions at `positions` can run at once, by trying every assignment."""
+    fits = [
+        [
+            resource_id for resource_id, caps in enumerate(capabilities, 1)
+            if parse_capabilities_or_requirements(requirements[position]) <= parse_capabilities_or_requirements(caps)
+        ]
+        for position in positions
+    ]
+    return any(len(set(choice)) == len(choice) for choice in itertools.product(*fits))
+
+
+class TestAssignBatch:
+    """Tests for assign_batch."""
+
+    def test_moves_older_session_to_make_room(self):
+        """Test that a session that can run anywhere leaves the only docker resource to a later one."""
+        index = create_index(["python docker", "python java"])
+
+        assigned = assign_batch(index, ["python", "python,docker"], all_slots(index))
+
+        assert assigned == [2, 1]
+
+    def test_prefers_fewest_capabilities(self):
+        index = create_index(["python docker java", "python"])
+
+        assert assign_batch(index, ["python"], all_slots(index)) == [2]
+
+    def test_only_available_resources(self):
+        """Test that busy resources are not assigned and unmatched sessions stay pending."""
+        index = create_index(["python", "python", "java"])
+        available = index.slot_bits([2, 3])
+
+        assigned = assign_batch(index, ["python", "python", "ruby", "java"], available)
+
+        assert assigned == [2, None, None, 3]
+
+    def test_older_sessions_win_when_not_all_fit(self):
+        index = create_index(["python docker"])
+
+        assert assign_batch(index, ["python,docker", "python"], all_slots(index)) == [1, None]
+
+    def test_maximum_and_oldest_on_random_fleets(self):
+        """Test against brute force that the most sessions run, and the oldest among equals."""
+        rng = random.Random(18)
+        tokens = ["a", "b", "c", "d"]
+
+        for _ in range(200):
+            capabilities = [" ".join(rng.sample(tokens, rng.randint(1, 3))) for _ in range(rng.randint(1, 5))]
+            requirements = [",".join(rng.sample(tokens, rng.randint(1, 2))) for _ in range(rng.randint(1, 6))]
+            index = create_index(capabilities)
+
+            assigned = assign_batch(index, requirements, all_slots(index))
+
+            # Greedy on the transversal matroid, oldest first, gives the expected sessions
+            expected = []
+            for position in range(len(requirements)):
+                if can_assign(capabilities, requirements, expected + [position]):
+                    expected.append(position)
+
+            matched = [position for position, resource_id in enumerate(assigned) if resource_id is not None]
+            assert matched == expected
+            assert len({assigned[position] for position in matched}) == len(matched)
+            for position in matched:
+                required = parse_capabilities_or_requirements(requirements[position])
+                assert required <= parse_capabilities_or_requirements(capabilities[assigned[position] - 1])
@@ -0,0 +1,78 @@
+"""
+Tests for the capability index.
+"""
+
+import random
+from unittest.mock import MagicMock
+
+from app.scheduler.capabilities import CapabilityIndex
+from app.scheduler.utils import parse_capabilities_or_requirements
+
+
+def create_resource(resource_id, capabilities):
+    return MagicMock(id=resource_id, capabilities=capabilities)
+
+
+class TestCapabilityIndex:
+    """Tests for CapabilityIndex class."""
+
+    def test_matches_like_subset_test(self):
+        """Test that matching agrees with a plain subset test on random resources."""
+        rng = random.Random(17)
+        tokens = [f"cap{number}" for number in range(12)]
+        resources = [
+            create_resource(resource_id, " ".join(rng.sample(tokens, rng.randint(1, 6))))
+            for resource_id in range(200)
+        ]
+        index = CapabilityIndex()
+        index.sync(resources)
+
+        for _ in range(50):
+            requirements = ",".join(rng.sample(tokens, rng.randint(1, 3)))
+            required = parse_capabilities_or_requirements(requirements)
+            expected = {
+                resource.id for resource in resources
+                if required <= parse_capabilities_or_requirements(resource.capabilities)
+            }
+
+            assert {index.resource_ids[slot] for slot in CapabilityIndex._bits(index.matching(requirements))} == expected
+
+    def test_best_prefers_fewest_capabilities(self):
+        index = CapabilityIndex()
+        index.sync([
+            create_resource(1, "python docker linux"),
+            create_resource(2, "python docker"),
+            create_resource(3, "python"),
+        ])
+
+        everything = index.slot_bits([1, 2, 3])
+        assert index.best("python", everything) == 3
+        assert index.best("docker", everything) == 2
+        assert index.best("python", index.slot_bits([1, 2])) == 2
+        assert index.best("java", everything) is None
+        assert index.best("", everything) is None
+
+    def test_sync_is_incremental(self):
+        """Test that syncing reindexes changed resources and drops removed ones."""
+        index = CapabilityIndex()
+        index.sync([create_resource(1, "python"), create_resource(2, "java")])
+        assert index.best("docker", index.slot_bits([1, 2])) is None
+
+        # Resource 1 gains a capability, resource 2 leaves and resource 3 takes its slot
+        index.sync([create_resource(1, "python docker"), create_resource(3, "go")])
+
+        assert index.best("docker", index.slot_bits([1, 3])) == 1
+        assert index.best("java", index.slot_bits([1, 3])) is None
+        assert index.best("go", index.slot_bits([1, 3])) == 3
+        assert set(index.slots) == {1, 3}
+        assert len(index.resource_ids) == 2
+
+    def test_unchanged_resources_are_not_parsed_again(self):
+        index = CapabilityIndex()
+        resources = [create_resource(1, "python")]
+        index.sync(resources)
+        index.add = MagicMock()
+
+        index.sync(resources)
+
+        index.add.assert_not_called()
@@ -2,11 +2,21 @@
 Tests for scheduler core module.
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, call
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from app.scheduler.core import MINIMUM_SLEEP, AutomationScheduler, scheduler_background_task
+from app.scheduler.runner import SchedulerThread
+
 
-from app.scheduler.core import AutomationScheduler, scheduler_background_task
+def trigger_snapshot(triggers: list, processes: dict) -> MagicMock:
+    """Snapshot whose due triggers are all claimed."""
+    snapshot = MagicMock(triggers=triggers, processes=processes)
+    snapshot.claim_due_triggers.side_effect = lambda triggers: triggers
+    return snapshot
 
 
 class TestAutomationScheduler:
@@ -15,120 +25,247 @@ class TestAutomationScheduler:
     def setup_method(self):
         """Set up test fixtures."""
         self.scheduler = AutomationScheduler()
+        self.scheduler.lease = MagicMock()
+        self.scheduler.lease.acquire.return_value = True
+        self.scheduler.lease.is_leader = True
     
     @patch('app.scheduler.core.settings')
     @pytest.mark.asyncio
-    async def test_run_background_task_disabled(self, mock_settings):
-        """Test background task when scheduler is disabled."""
-        mock_settings.scheduler_enabled = False
-        
-        with patch('app.scheduler.core.logger') as mock_logger:
-            await self.scheduler.run_background_task()
-            mock_logger.info.assert_called_once_with("Scheduler is disabled via configuration")
-    
+    async def test_run_background_task_stops(self, mock_settings):
+        """Test that a stopped scheduler finishes its tick and exits."""
+        mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
+
+        with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
+            mock_schedule.side_effect = lambda **kwargs: self.scheduler.stop()
+
+            with patch('app.scheduler.core.logger') as mock_logger:
+                await asyncio.wait_for(self.scheduler.run_background_task(), timeout=1)
+                mock_logger.info.assert_called_once_with("Scheduler stopped")
+
+        mock_schedule.assert_called_once()
+        self.scheduler.lease.release.assert_called_once()
+
+    @patch('app.scheduler.core.settings')
+    @pytest.mark.asyncio
+    async def test_standby_does_not_schedule(self, mock_settings):
+        """Test that a scheduler without the lease only retries the lease."""
+        mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
+        self.scheduler.lease.acquire.return_value = False
+        self.scheduler.lease.is_leader = False
+        self.scheduler.next_fire_at = datetime.now() + timedelta(seconds=1)
+
+        with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
+            with patch.object(self.scheduler, '_wait', new_callable=AsyncMock) as mock_wait:
+                mock_wait.side_effect = [None, KeyboardInterrupt()]
+
+                with pytest.raises(KeyboardInterrupt):
+                    await self.scheduler.run_background_task()
+
+        mock_schedule.assert_not_called()
+        assert self.scheduler.lease.acquire.call_count == 2
+        # A standby does not wake up for triggers, only to check the lease
+        mock_wait.assert_called_with(10)
+
     @patch('app.scheduler.core.settings')
-    @patch('app.scheduler.core.asyncio.sleep', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_run_background_task_single_iteration(self, mock_sleep, mock_settings):
+    async def test_shard_member_evaluates_triggers(self, mock_settings):
+        """Test that with sharding a scheduler without the lease evaluates triggers only."""
+        mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
+        self.scheduler.lease.acquire.return_value = False
+        self.scheduler.shards = MagicMock()
+
+        with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
+            with patch.object(self.scheduler, '_wait', new_callable=AsyncMock) as mock_wait:
+                mock_wait.side_effect = [KeyboardInterrupt()]
+
+                with pytest.raises(KeyboardInterrupt):
+                    await self.scheduler.run_background_task()
+
+        self.scheduler.shards.refresh.assert_called_once()
+        mock_schedule.assert_called_once_with(dispatch=False)
+
+    @patch('app.scheduler.core.settings')
+    @pytest.mark.asyncio
+    async def test_run_background_task_single_iteration(self, mock_settings):
         """Test background task for a single iteration."""
-        mock_settings.scheduler_enabled = True
         mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
         
         # Mock the schedule method to avoid actual scheduling
         with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
-            # Stop after first iteration by making sleep raise an exception
-            mock_sleep.side_effect = [KeyboardInterrupt()]
-            
-            with pytest.raises(KeyboardInterrupt):
-                await self.scheduler.run_background_task()
-            
-            # Verify schedule was called once
-            mock_schedule.assert_called_once()
-            # Verify sleep was called with correct interval
-            mock_sleep.assert_called_once_with(10)
-    
+            with patch.object(self.scheduler, '_wait', new_callable=AsyncMock) as mock_wait:
+                # Stop after first iteration by making the wait raise an exception
+                mock_wait.side_effect = [KeyboardInterrupt()]
+
+                with pytest.raises(KeyboardInterrupt):
+                    await self.scheduler.run_background_task()
+
+            # Verify schedule was called once, as the leader
+            mock_schedule.assert_called_once_with(dispatch=True)
+            # Verify the wait used the correct interval
+            mock_wait.assert_called_once_with(10)
+
     @patch('app.scheduler.core.settings')
-    @patch('app.scheduler.core.asyncio.sleep', new_callable=AsyncMock)
     @pytest.mark.asyncio
-    async def test_run_background_task_error_handling(self, mock_sleep, mock_settings):
+    async def test_run_background_task_error_handling(self, mock_settings):
         """Test background task error handling."""
-        mock_settings.scheduler_enabled = True
         mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
         mock_settings.scheduler_error_backoff = 30
         
         # Mock schedule to raise an error first, then succeed
         with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
             mock_schedule.side_effect = [Exception("Test error"), None, KeyboardInterrupt()]
-            mock_sleep.side_effect = [None, None, KeyboardInterrupt()]
-            
-            with patch('app.scheduler.core.logger') as mock_logger:
-                with pytest.raises(KeyboardInterrupt):
-                    await self.scheduler.run_background_task()
-                
-                # Verify error was logged
-                mock_logger.error.assert_called_once_with("Scheduler error: Test error")
-            
+
+            with patch.object(self.scheduler, '_wait', new_callable=AsyncMock) as mock_wait:
+                mock_wait.side_effect = [None, None, KeyboardInterrupt()]
+
+                with patch('app.scheduler.core.logger') as mock_logger:
+                    with pytest.raises(KeyboardInterrupt):
+                        await self.scheduler.run_background_task()
+
+                    # Verify error was logged
+                    mock_logger.error.assert_called_once_with("Scheduler error: Test error")
+
+                # Verify both error backoff and normal interval were used
+                expected_calls = [call(30), call(10)]
+                mock_wait.assert_has_calls(expected_calls)
+
             # Verify schedule was called twice (error, then success)
             assert mock_schedule.call_count == 2
-            
-            # Verify sleep was called with both error backoff and normal interval
-            expected_calls = [call(30), call(10)]
-            mock_sleep.assert_has_calls(expected_calls)
-    
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_early_when_stopped(self):
+        """Test that stopping the scheduler interrupts its sleep."""
+        asyncio.get_running_loop().call_later(0.01, self.scheduler.stop)
+
+        await asyncio.wait_for(self.scheduler._wait(60), timeout=1)
+
+    def test_scheduler_thread_shutdown(self):
+        """Test that the scheduler thread stops and joins."""
+        with patch.object(self.scheduler, 'schedule', new_callable=AsyncMock) as mock_schedule:
+            with patch('app.scheduler.runner.scheduler_engine'):
+                runner = SchedulerThread(self.scheduler)
+                runner.start()
+
+                assert runner.stop(timeout=5) is True
+
+        assert not runner.thread.is_alive()
+        assert mock_schedule.call_count <= 1
     
     @pytest.mark.asyncio
     async def test_process_triggers_empty_list(self):
         """Test processing triggers with empty trigger list."""
-        mock_trigger_repo = MagicMock()
-        mock_process_repo = MagicMock()
-        mock_trigger_repo.get_all.return_value = []
+        snapshot = trigger_snapshot([], {})
+        self.scheduler.processor_registry = MagicMock()
         
         # Should complete without errors
-        await self.scheduler._process_triggers(mock_trigger_repo, mock_process_repo, datetime.now())
+        await self.scheduler._process_triggers(snapshot, datetime.now())
         
-        mock_trigger_repo.get_all.assert_called_once_with(include_deleted=False)
+        self.scheduler.processor_registry.get_processor.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_process_triggers_skips_disabled_triggers(self):
         """Test that disabled triggers are skipped."""
-        mock_trigger_repo = MagicMock()
-        mock_process_repo = MagicMock()
-        
         # Create disabled trigger
         disabled_trigger = MagicMock()
         disabled_trigger.enabled = False
         disabled_trigger.id = 1
+        disabled_trigger.process_id = 1
+
+        snapshot = trigger_snapshot([disabled_trigger], {1: MagicMock(deleted=False)})
+        self.scheduler.processor_registry = MagicMock()
         
-        mock_trigger_repo.get_all.return_value = [disabled_trigger]
-        
-        await self.scheduler._process_triggers(mock_trigger_repo, mock_process_repo, datetime.now())
+        await self.scheduler._process_triggers(snapshot, datetime.now())
         
         # Should not process disabled triggers
-        mock_process_repo.get.assert_not_called()
+        self.scheduler.processor_registry.get_processor.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_process_triggers_skips_deleted_processes(self):
-        """Test that triggers for deleted processes are skipped."""
-        mock_trigger_repo = MagicMock()
-        mock_process_repo = MagicMock()
-        
-        # Create enabled trigger
-        enabled_trigger = MagicMock()
-        enabled_trigger.enabled = True
-        enabled_trigger.process_id = 1
-        enabled_trigger.id = 2
-        
-        # Process is deleted
-        deleted_process = MagicMock()
-        deleted_process.deleted = True
-        
-        mock_trigger_repo.get_all.return_value = [enabled_trigger]
-        mock_process_repo.get.return_value = deleted_process
+        """Test that triggers for deleted or missing processes are skipped."""
+        # Create enabled triggers
+        triggers = [MagicMock(id=trigger_id, enabled=True, process_id=trigger_id) for trigger_id in (1, 2)]
+
+        # Process 1 is deleted, process 2 does not exist
+        snapshot = trigger_snapshot(triggers, {1: MagicMock(deleted=True)})
+        self.scheduler.processor_registry = MagicMock()
         
-        await self.scheduler._process_triggers(mock_trigger_repo, mock_process_repo, datetime.now())
+        await self.scheduler._process_triggers(snapshot, datetime.now())
         
-        # Should check process status but not proceed with processing
-        mock_process_repo.get.assert_called_once_with(1)
+        self.scheduler.processor_registry.get_processor.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_process_triggers_only_own_shard(self):
+        """Test that with sharding only the triggers of this scheduler's shard are processed."""
+        triggers = [MagicMock(id=trigger_id, enabled=True, process_id=trigger_id) for trigger_id in (1, 2, 3)]
+        processes = {trigger_id: MagicMock(deleted=False) for trigger_id in (1, 2, 3)}
+        snapshot = trigger_snapshot(triggers, processes)
+
+        self.scheduler.shards = MagicMock()
+        self.scheduler.shards.owns.side_effect = lambda trigger_id: trigger_id != 2
+        self.scheduler.processor_registry = MagicMock()
+
+        await self.scheduler._process_triggers(snapshot, datetime.now())
+
+        processor = self.scheduler.processor_registry.get_processor.return_value
+        assert [c.args[0] for c in processor.process.call_args_list] == [triggers[0], triggers[2]]
+        snapshot.claim_due_triggers.assert_called_once_with([triggers[0], triggers[2]])
+
+    @pytest.mark.asyncio
+    async def test_process_triggers_skips_unclaimed(self):
+        """Test that due triggers another scheduler holds or has fired are skipped."""
+        triggers = [MagicMock(id=trigger_id, enabled=True, process_id=trigger_id) for trigger_id in (1, 2)]
+        snapshot = trigger_snapshot(triggers, {1: MagicMock(deleted=False), 2: MagicMock(deleted=False)})
+        snapshot.claim_due_triggers.side_effect = lambda triggers: triggers[1:]
+        self.scheduler.processor_registry = MagicMock()
+
+        await self.scheduler._process_triggers(snapshot, datetime.now())
+
+        processor = self.scheduler.processor_registry.get_processor.return_value
+        assert [c.args[0] for c in processor.process.call_args_list] == [triggers[1]]
+
+    @patch('app.scheduler.core.settings')
+    def test_sleeps_until_next_trigger(self, mock_settings):
+        """Test that the scheduler wakes up for a trigger due before the next interval."""
+        mock_settings.scheduler_interval = 10
+        mock_settings.scheduler_lease_ttl = 30
+
+        assert self.scheduler._seconds_until_next_run() == 10
+
+        self.scheduler.next_fire_at = datetime.now() + timedelta(seconds=3)
+        assert 2 < self.scheduler._seconds_until_next_run() <= 3
+
+        self.scheduler.next_fire_at = datetime.now() + timedelta(minutes=5)
+        assert self.scheduler._seconds_until_next_run() == 10
+
+        self.scheduler.next_fire_at = datetime.now() - timedelta(seconds=5)
+        assert self.scheduler._seconds_until_next_run() == MINIMUM_SLEEP
+
+    @patch('app.scheduler.leader.settings')
+    @patch('app.scheduler.core.settings')
+    def test_sleep_renews_lease_in_time(self, mock_settings, mock_leader_settings):
+        """Test that the leader wakes up often enough to renew a short lease."""
+        mock_settings.scheduler_interval = 10
+        mock_leader_settings.scheduler_lease_ttl = 6
+
+        assert self.scheduler._seconds_until_next_run() == 2
+
+    @patch('app.scheduler.core.settings')
+    def test_resources_expire_after_startup_grace(self, mock_settings):
+        """Test that resources get one heartbeat TTL after startup to ping before they expire."""
+        mock_settings.resource_heartbeat_ttl = 30
+        resource_service = MagicMock()
+
+        self.scheduler._expire_resources(resource_service)
+        resource_service.update_availability.assert_not_called()
+
+        self.scheduler.started_at -= 30
+        self.scheduler._expire_resources(resource_service)
+        resource_service.update_availability.assert_called_once()
 
 
 @pytest.mark.asyncio
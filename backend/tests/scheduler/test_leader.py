@@ -0,0 +1,79 @@
+"""
+Tests for scheduler leader election.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.metrics import SCHEDULER_LEADER
+from app.scheduler.leader import LEASE_NAME, LeaderLease
+
+
+class TestLeaderLease:
+    """Tests for LeaderLease class."""
+
+    def setup_method(self):
+        self.lease = LeaderLease(holder="host:1")
+        self.patchers = [
+            patch('app.scheduler.leader.SchedulerLeaseRepository'),
+            patch('app.scheduler.leader.get_scheduler_session'),
+        ]
+        self.mock_repository = self.patchers[0].start().return_value
+        self.patchers[1].start()
+
+    def teardown_method(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    @patch('app.scheduler.leader.settings')
+    def test_acquire(self, mock_settings):
+        """Test that holding the lease makes the scheduler leader."""
+        mock_settings.scheduler_lease_ttl = 30
+        self.mock_repository.acquire.return_value = MagicMock()
+
+        assert self.lease.acquire() is True
+        assert self.lease.is_leader is True
+        assert SCHEDULER_LEADER._value.get() == 1
+        self.mock_repository.acquire.assert_called_once_with(LEASE_NAME, "host:1", 30)
+
+    def test_acquire_held_by_other(self):
+        """Test that a lease held by another scheduler leaves this one on standby."""
+        self.lease.is_leader = True
+        self.mock_repository.acquire.return_value = None
+
+        assert self.lease.acquire() is False
+        assert SCHEDULER_LEADER._value.get() == 0
+
+    def test_acquire_failure_stops_leading(self):
+        """Test that a leader which cannot renew its lease stops leading."""
+        self.lease.is_leader = True
+        self.mock_repository.acquire.side_effect = Exception("connection refused")
+
+        with pytest.raises(Exception):
+            self.lease.acquire()
+
+        assert self.lease.is_leader is False
+
+    @patch('app.scheduler.leader.settings')
+    def test_confirm_lost_lease_stops_leading(self, mock_settings):
+        """Test that a leader whose lease was taken over while it ticked stops leading."""
+        mock_settings.scheduler_lease_ttl = 30
+        self.lease.is_leader = True
+        self.mock_repository.renew.return_value = None
+        session = MagicMock()
+
+        assert self.lease.confirm(session) is False
+        assert self.lease.is_leader is False
+        self.mock_repository.renew.assert_called_once_with(LEASE_NAME, "host:1", 30)
+        session.commit.assert_not_called()
+
+    def test_release(self):
+        """Test that only the leader releases the lease."""
+        self.lease.release()
+        self.mock_repository.release.assert_not_called()
+
+        self.lease.is_leader = True
+        self.lease.release()
+
+        self.mock_repository.release.assert_called_once_with(LEASE_NAME, "host:1")
+        assert self.lease.is_leader is False
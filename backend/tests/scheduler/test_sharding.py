@@ -0,0 +1,64 @@
+"""
+Tests for sharded trigger evaluation.
+"""
+
+from collections import Counter
+from unittest.mock import patch
+
+from app.scheduler.sharding import MEMBER_PREFIX, HashRing, ShardMembership
+
+
+class TestHashRing:
+    """Tests for HashRing class."""
+
+    def test_spreads_triggers(self):
+        """Test that triggers are spread roughly evenly over the members."""
+        ring = HashRing(["a:1", "b:1", "c:1"])
+
+        owners = Counter(ring.owner(trigger_id) for trigger_id in range(30000))
+
+        assert set(owners) == {"a:1", "b:1", "c:1"}
+        assert all(7000 < count < 13000 for count in owners.values())
+
+    def test_same_ring_in_every_process(self):
+        """Test that the ring does not depend on member order or process hash seeds."""
+        ring = HashRing(["a:1", "b:1"])
+        other = HashRing(["b:1", "a:1"])
+
+        assert [ring.owner(i) for i in range(100)] == [other.owner(i) for i in range(100)]
+        assert ring.owner(42) == HashRing(["a:1", "b:1"]).owner(42)
+
+    def test_member_leaving_only_moves_its_triggers(self):
+        """Test that rebalancing keeps the triggers of the members that stay."""
+        before = HashRing(["a:1", "b:1", "c:1"])
+        after = HashRing(["a:1", "b:1"])
+
+        for trigger_id in range(5000):
+            if before.owner(trigger_id) != "c:1":
+                assert after.owner(trigger_id) == before.owner(trigger_id)
+
+    def test_empty(self):
+        assert HashRing([]).owner(1) is None
+
+
+class TestShardMembership:
+    """Tests for ShardMembership class."""
+
+    @patch('app.scheduler.sharding.get_scheduler_session')
+    @patch('app.scheduler.sharding.SchedulerLeaseRepository')
+    def test_refresh(self, mock_repository_class, mock_get_session):
+        """Test that refreshing renews the member lease and rebalances."""
+        mock_repository = mock_repository_class.return_value
+        mock_repository.get_holders.return_value = ["a:1", "b:1"]
+        membership = ShardMembership("a:1")
+
+        assert all(membership.owns(trigger_id) for trigger_id in range(100))
+
+        membership.refresh()
+
+        mock_repository.acquire.assert_called_once()
+        assert mock_repository.acquire.call_args[0][:2] == (MEMBER_PREFIX + "a:1", "a:1")
+        mock_repository.get_holders.assert_called_once_with(MEMBER_PREFIX)
+
+        owned = [trigger_id for trigger_id in range(100) if membership.owns(trigger_id)]
+        assert 0 < len(owned) < 100
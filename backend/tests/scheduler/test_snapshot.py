@@ -0,0 +1,168 @@
+"""
+Tests for the scheduler snapshot and the dispatcher working on it.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app.database.models import Process, Resource, Session, Trigger, Workqueue
+from app.enums import SessionStatus, TriggerType
+from app.scheduler.dispatcher import ResourceDispatcher
+from app.scheduler.snapshot import SchedulerSnapshot
+from app.scheduler.trigger_processors import ProcessingServices, WorkqueueTriggerProcessor
+
+
+def create_snapshot(sessions=(), resources=(), processes=(), triggers=(), workqueues=(), pending_items=None):
+    return SchedulerSnapshot(
+        MagicMock(), list(triggers), list(processes), list(workqueues), pending_items or {},
+        list(sessions), list(resources),
+    )
+
+
+def create_resource(resource_id, capabilities="python"):
+    return Resource(id=resource_id, name=f"r{resource_id}", fqdn=f"r{resource_id}", capabilities=capabilities, available=True)
+
+
+def create_session(session_id, process_id=1, resource_id=None, status=SessionStatus.NEW, age=0):
+    return Session(
+        id=session_id, process_id=process_id, resource_id=resource_id, status=status,
+        dispatched_at=None, created_at=datetime(2023, 1, 1) - timedelta(minutes=age),
+    )
+
+
+class TestSchedulerSnapshot:
+    """Tests for SchedulerSnapshot class."""
+
+    def test_available_resources(self):
+        """Test that resources with an active session are not available."""
+        snapshot = create_snapshot(
+            sessions=[create_session(1, resource_id=1, status=SessionStatus.IN_PROGRESS)],
+            resources=[create_resource(1), create_resource(2)],
+        )
+
+        assert [resource.id for resource in snapshot.available_resources()] == [2]
+
+    def test_create_session(self):
+        """Test that a created session is added to the database session and the indexes."""
+        snapshot = create_snapshot()
+
+        created = snapshot.create_session(1, "--flag")
+
+        snapshot.session.add.assert_called_once_with(created)
+        assert created.status == SessionStatus.NEW
+        assert created.parameters == "--flag"
+        assert snapshot.active_sessions(1) == [created]
+        assert snapshot.has_new_session(1)
+        assert snapshot.pending_sessions() == [created]
+        assert not snapshot.has_new_session(2)
+
+    def test_assign(self):
+        """Test that an assigned resource is no longer available."""
+        session = create_session(1)
+        resource = create_resource(1)
+        snapshot = create_snapshot(sessions=[session], resources=[resource])
+
+        snapshot.assign(session, resource)
+
+        assert session.resource_id == 1
+        assert session.dispatched_at is not None
+        assert resource.available is False
+        assert snapshot.available_resources() == []
+        assert snapshot.pending_sessions() == []
+
+    def test_update_trigger_moves_next_fire_at(self):
+        """Test that disabling a trigger unschedules it, as the repository would."""
+        trigger = Trigger(
+            id=1, type=TriggerType.DATE, cron="", date=datetime(2023, 1, 1), enabled=True,
+            deleted=False, process_id=1, next_fire_at=datetime(2023, 1, 1),
+        )
+        snapshot = create_snapshot(triggers=[trigger])
+
+        snapshot.update_trigger(trigger, {"enabled": False, "deleted": True})
+
+        assert trigger.enabled is False
+        assert trigger.next_fire_at is None
+
+
+class TestResourceDispatcher:
+    """Tests for ResourceDispatcher class."""
+
+    def test_dispatch_oldest_first(self):
+        """Test that the oldest sessions get the best resources and none is assigned twice."""
+        sessions = [
+            create_session(1, process_id=1, age=1),
+            create_session(2, process_id=2, age=3),
+            create_session(3, process_id=1, age=2),
+        ]
+        snapshot = create_snapshot(
+            sessions=sessions,
+            resources=[create_resource(1, "python docker"), create_resource(2, "python")],
+            processes=[Process(id=1, name="a", requirements="python"), Process(id=2, name="b", requirements="python")],
+        )
+
+        ResourceDispatcher(snapshot).dispatch_all_pending()
+
+        assert sessions[1].resource_id == 2
+        assert sessions[2].resource_id == 1
+        assert sessions[0].resource_id is None
+
+    @patch("app.scheduler.dispatcher.settings")
+    def test_dispatch_batch(self, mock_settings):
+        """Test that batch assignment leaves the docker resource to the session needing it."""
+        mock_settings.scheduler_batch_assignment = True
+        sessions = [create_session(1, process_id=1, age=2), create_session(2, process_id=2, age=1)]
+        snapshot = create_snapshot(
+            sessions=sessions,
+            resources=[create_resource(1, "python docker"), create_resource(2, "python java")],
+            processes=[Process(id=1, name="a", requirements="python"), Process(id=2, name="b", requirements="python,docker")],
+        )
+
+        ResourceDispatcher(snapshot).dispatch_all_pending()
+
+        assert sessions[0].resource_id == 2
+        assert sessions[1].resource_id == 1
+        assert snapshot.available_resources() == []
+
+
+class TestWorkqueueTriggerProcessor:
+    """Tests for WorkqueueTriggerProcessor class."""
+
+    def create_trigger(self):
+        return Trigger(
+            id=1, type=TriggerType.WORKQUEUE, cron="", workqueue_id=1, workqueue_resource_limit=2,
+            workqueue_scale_up_threshold=10, enabled=True, deleted=False, process_id=1,
+        )
+
+    def test_scales_up_once_per_tick(self):
+        """Test that a session is created when items are pending and a resource is free."""
+        trigger = self.create_trigger()
+        snapshot = create_snapshot(
+            resources=[create_resource(1)],
+            processes=[Process(id=1, name="a", requirements="python")],
+            triggers=[trigger],
+            workqueues=[Workqueue(id=1, name="q", enabled=True)],
+            pending_items={1: 50},
+        )
+        processor = WorkqueueTriggerProcessor(ProcessingServices(snapshot))
+
+        assert processor.process(trigger, datetime.now())
+
+        assert len(snapshot.active_sessions(1)) == 1
+        assert trigger.last_triggered is not None
+
+    def test_no_free_resource(self):
+        """Test that no session is created without a resource that can run it."""
+        trigger = self.create_trigger()
+        snapshot = create_snapshot(
+            sessions=[create_session(1, process_id=2, resource_id=1)],
+            resources=[create_resource(1)],
+            processes=[Process(id=1, name="a", requirements="python")],
+            triggers=[trigger],
+            workqueues=[Workqueue(id=1, name="q", enabled=True)],
+            pending_items={1: 50},
+        )
+        processor = WorkqueueTriggerProcessor(ProcessingServices(snapshot))
+
+        assert processor.process(trigger, datetime.now())
+
+        assert snapshot.active_sessions(1) == []
@@ -97,3 +97,46 @@ def test_delete_accesstoken(session: Session, client: TestClient):
     assert response.status_code == 204
 
 
+
+def test_deleted_accesstoken_is_rejected(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/accesstokens", json={"identifier": "Keeper"})
+    keeper = response.json()["access_token"]
+
+    response = client.post(
+        "/accesstokens",
+        headers={"Authorization": f"Bearer {keeper}"},
+        json={"identifier": "Revoked"},
+    )
+    revoked = response.json()
+
+    # Warm the token cache before revoking the token
+    response = client.get(
+        "/accesstokens/", headers={"Authorization": f"Bearer {revoked['access_token']}"}
+    )
+    assert response.status_code == 200
+
+    response = client.delete(
+        f"/accesstokens/{revoked['id']}",
+        headers={"Authorization": f"Bearer {keeper}"},
+    )
+    assert response.status_code == 204
+
+    response = client.get(
+        "/accesstokens/", headers={"Authorization": f"Bearer {revoked['access_token']}"}
+    )
+    assert response.status_code == 401
+
+def test_login_with_accesstoken(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/accesstokens", json={"identifier": "Login"})
+    access_token = response.json()["access_token"]
+
+    response = client.post("/token/", data={"username": "robot", "password": access_token})
+    assert response.status_code == 200
+    assert response.json()["access_token"] == access_token
+
+    response = client.post("/token/", data={"username": "robot", "password": "wrong"})
+    assert response.status_code == 400
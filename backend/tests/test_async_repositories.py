@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.dependencies import resolve_access_token_async
+from app.cache import clear_caches
+from app.database.models import AccessToken, WorkItem
+from app.database.repository import (
+    AsyncAuditLogRepository,
+    AsyncResourceRepository,
+    AsyncSessionRepository,
+    AsyncWorkItemRepository,
+)
+from app.database.unit_of_work import AsyncUnitOfWork
+from app.enums import WorkItemStatus
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def async_session() -> MagicMock:
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.scalars = AsyncMock(return_value=MagicMock())
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+def compiled(mock: AsyncMock) -> str:
+    statement = mock.call_args.args[0]
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def test_keep_alive_is_a_single_update():
+    session = async_session()
+    session.execute.return_value.scalar_one_or_none.return_value = 7
+
+    assert await AsyncResourceRepository(session).keep_alive(7) is True
+
+    sql = compiled(session.execute)
+    assert sql.startswith("UPDATE resource SET")
+    assert "RETURNING resource.id" in sql
+    session.commit.assert_awaited_once()
+
+
+async def test_keep_alive_unknown_resource():
+    session = async_session()
+    session.execute.return_value.scalar_one_or_none.return_value = None
+
+    assert await AsyncResourceRepository(session).keep_alive(7) is False
+
+
+async def test_keep_alive_many_is_a_single_update():
+    session = async_session()
+    session.execute.return_value.scalars.return_value.all.return_value = [7]
+    now = datetime.now()
+
+    assert await AsyncResourceRepository(session).keep_alive_many({7: now, 8: now}) == [7]
+
+    sql = compiled(session.execute)
+    assert sql.startswith("UPDATE resource SET last_seen=greatest(resource.last_seen, ping.last_seen)")
+    assert "FROM (VALUES" in sql
+    session.commit.assert_awaited_once()
+
+
+async def test_get_session_by_resource_id():
+    session = async_session()
+    session.scalars.return_value.first.return_value = None
+
+    assert await AsyncSessionRepository(session).get_by_resource_id(3) is None
+
+    sql = compiled(session.scalars)
+    assert "WHERE session.resource_id = %(resource_id_1)s" in sql
+    assert "session.status != %(status_1)s" in sql
+
+
+async def test_claim_session_in_one_statement():
+    session = async_session()
+    session.scalars.return_value.first.return_value = None
+
+    assert await AsyncSessionRepository(session).claim(3) is None
+
+    sql = compiled(session.scalars)
+    assert sql.startswith("UPDATE session SET status=%(status)s")
+    # The locking subquery is run once, so it cannot claim more than one session
+    assert "WHERE session.id = ANY (array((SELECT session.id" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    session.commit.assert_awaited_once()
+
+
+async def test_get_next_items_claims_in_one_statement():
+    session = async_session()
+    now = datetime.now()
+    session.scalars.return_value = [
+        WorkItem(id=2, created_at=now, status=WorkItemStatus.IN_PROGRESS),
+        WorkItem(id=1, created_at=now, status=WorkItemStatus.IN_PROGRESS),
+    ]
+
+    items = await AsyncWorkItemRepository(session).get_next_items(1, 2)
+
+    assert [item.id for item in items] == [1, 2]
+    sql = compiled(session.scalars)
+    assert "WHERE workitem.id = ANY (array((SELECT workitem.id" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    session.commit.assert_awaited_once()
+
+
+async def test_bulk_create_audit_logs_is_a_single_insert():
+    session = async_session()
+    rows = [{"message": f"log {i}", "event_timestamp": datetime.now()} for i in range(3)]
+
+    await AsyncAuditLogRepository(session).bulk_create(rows)
+
+    assert compiled(session.execute).startswith("INSERT INTO auditlog")
+    params = session.execute.call_args.args[1]
+    assert len(params) == 3
+    assert all("created_at" in row for row in params)
+    session.commit.assert_awaited_once()
+
+
+async def test_resolve_access_token_async_development_mode():
+    session = async_session()
+    session.scalars.return_value.first.return_value = None
+
+    token = await resolve_access_token_async(None, AsyncUnitOfWork(session))
+
+    assert token.identifier == "development-token"
+
+
+async def test_resolve_access_token_async_uses_cache():
+    session = async_session()
+    stored = AccessToken(
+        id=1,
+        identifier="worker",
+        access_token="secret",
+        token_hash="",
+        expires_at=datetime.now() + timedelta(days=1),
+    )
+    session.scalars.side_effect = [
+        MagicMock(first=MagicMock(return_value=1)),
+        MagicMock(first=MagicMock(return_value=stored)),
+    ]
+    uow = AsyncUnitOfWork(session)
+
+    assert (await resolve_access_token_async("secret", uow)).identifier == "worker"
+    assert (await resolve_access_token_async("secret", uow)).identifier == "worker"
+    assert session.scalars.await_count == 2
+
+    with pytest.raises(HTTPException) as error:
+        await resolve_access_token_async(None, uow)
+    assert error.value.status_code == 401
@@ -1,6 +1,11 @@
 from datetime import datetime
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.database.models import AuditLog
+from app.database.repository import AuditLogRepository
+from app.services import AuditLogService
 
 from . import generate_basic_data  # noqa: F401
 
@@ -124,6 +129,43 @@ def test_create_audit_log_validation(session: Session, client: TestClient):
     assert response.status_code == 422
 
 
+def test_create_audit_log_batch(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/audit-logs/batch", json=[
+        {
+            "message": f"Batched message {i}",
+            "session_id": 1,
+            "event_timestamp": datetime.now().isoformat(),
+        }
+        for i in range(5)
+    ])
+
+    assert response.status_code == 204
+
+    logs = session.exec(select(AuditLog).where(AuditLog.message.startswith("Batched"))).all()
+    assert len(logs) == 5
+    assert all(log.created_at is not None for log in logs)
+
+
+def test_create_audit_log_batch_validation(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/audit-logs/batch", json=[
+        {"message": "Valid", "event_timestamp": datetime.now().isoformat()},
+        {"session_id": 1},
+    ])
+    assert response.status_code == 422
+
+    response = client.post("/audit-logs/batch", json=[
+        {"message": "Too many", "event_timestamp": datetime.now().isoformat()}
+    ] * (settings.auditlog_batch_max_size + 1))
+    assert response.status_code == 422
+
+    response = client.post("/audit-logs/batch", json=[])
+    assert response.status_code == 204
+
+
 def test_get_by_workitem(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -157,3 +199,16 @@ def test_get_by_workitem_not_found(session: Session, client: TestClient):
     assert response.status_code == 404
     assert data["detail"] == "Workitem not found"
 
+
+def test_partition_maintenance(session: Session):
+    repository = AuditLogRepository(session)
+    today = datetime.now().date()
+    this_month = today.replace(day=1)
+
+    AuditLogService(repository).maintain_partitions(today)
+
+    months = repository.get_partition_months()
+    assert this_month in months
+    assert len([month for month in months if month >= this_month]) >= (
+        settings.auditlog_partition_months_ahead + 1
+    )
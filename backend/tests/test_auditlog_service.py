@@ -0,0 +1,67 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.database.repository import AuditLogRepository
+from app.services import AuditLogService
+
+
+def repository(months: list[date]) -> MagicMock:
+    repository = MagicMock()
+    repository.get_partition_months.return_value = months
+    return repository
+
+
+def test_creates_missing_future_partitions():
+    repo = repository([date(2026, 10, 1), date(2026, 11, 1)])
+
+    with patch("app.services.auditlog_service.settings") as settings:
+        settings.auditlog_partition_months_ahead = 3
+        settings.auditlog_retention_days = 0
+        AuditLogService(repo).maintain_partitions(date(2026, 10, 18))
+
+    created = [call.args[0] for call in repo.create_partition.call_args_list]
+    assert created == [date(2026, 12, 1), date(2027, 1, 1)]
+    repo.drop_partition.assert_not_called()
+
+
+def test_drops_partitions_past_retention():
+    months = [date(2026, 6, 1), date(2026, 7, 1), date(2026, 8, 1), date(2026, 9, 1)]
+    repo = repository(months)
+
+    with patch("app.services.auditlog_service.settings") as settings:
+        settings.auditlog_partition_months_ahead = 0
+        settings.auditlog_retention_days = 60
+        AuditLogService(repo).maintain_partitions(date(2026, 10, 18))
+
+    # The cutoff is 2026-08-19, so August still holds logs inside the retention period
+    dropped = [call.args[0] for call in repo.drop_partition.call_args_list]
+    assert dropped == [date(2026, 6, 1), date(2026, 7, 1)]
+    repo.create_partition.assert_called_once_with(date(2026, 10, 1))
+
+
+def test_session_logs_are_bounded_by_session_creation():
+    session = MagicMock()
+
+    AuditLogRepository(session).get_logs_by_session_id(3)
+
+    query = session.exec.call_args.args[0]
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "auditlog.created_at >= (SELECT session.created_at -" in sql
+
+
+def test_create_partition_moves_rows_out_of_default_partition():
+    session = MagicMock()
+
+    AuditLogRepository(session).create_partition(date(2026, 12, 1))
+
+    create, lock, move, attach = [str(call.args[0]) for call in session.exec.call_args_list]
+    assert create.startswith("CREATE TABLE auditlog_2026_12 (LIKE auditlog")
+    assert lock == "LOCK TABLE auditlog_default IN ACCESS EXCLUSIVE MODE"
+    assert "DELETE FROM auditlog_default WHERE created_at >= '2026-12-01' AND created_at < '2027-01-01'" in move
+    assert "INSERT INTO auditlog_2026_12" in move
+    assert attach == (
+        "ALTER TABLE auditlog ATTACH PARTITION auditlog_2026_12 FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+    session.commit.assert_called_once()
@@ -0,0 +1,49 @@
+from unittest.mock import patch
+
+from app.cache import TTLCache, clear_caches
+
+
+def test_cache_stores_values_and_misses():
+    cache = TTLCache(ttl=60, maxsize=10)
+
+    cache.set("hit", "value")
+    cache.set("miss", None)
+
+    assert cache.get("hit") == "value"
+    assert cache.contains("miss")
+    assert not cache.contains("unknown")
+
+
+def test_cache_expires_entries():
+    cache = TTLCache(ttl=5, maxsize=10)
+
+    with patch("app.cache.time.monotonic", return_value=100):
+        cache.set("key", "value")
+
+    with patch("app.cache.time.monotonic", return_value=104):
+        assert cache.get("key") == "value"
+
+    with patch("app.cache.time.monotonic", return_value=105):
+        assert cache.get("key") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_clear_caches():
+    cache = TTLCache(ttl=60)
+    cache.set("key", "value")
+
+    clear_caches()
+
+    assert len(cache) == 0
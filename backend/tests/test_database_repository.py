@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, create_engine
+
+from app.database.models import Workqueue
+from app.database.repository import WorkqueueRepository
+
+
+@pytest.fixture
+def engine():
+    # Workqueue has no Postgres-only column types, so its table can live in SQLite
+    engine = create_engine("sqlite://")
+    Workqueue.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(engine) -> list[str]:
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+@pytest.fixture
+def workqueue(engine) -> Workqueue:
+    with Session(engine, expire_on_commit=False) as session:
+        return WorkqueueRepository(session).create(
+            {"name": "a", "description": "queue", "enabled": True, "deleted": False}
+        )
+
+
+def test_update_returns_new_values(engine, workqueue: Workqueue, statements: list[str]):
+    with Session(engine, expire_on_commit=False) as session:
+        loaded = session.get(Workqueue, workqueue.id)
+        statements.clear()
+
+        updated = WorkqueueRepository(session).update(
+            loaded, {"name": "b", "description": "queue", "enabled": False}
+        )
+
+    assert updated is loaded
+    assert updated.name == "b"
+    assert updated.enabled is False
+    assert updated.updated_at > workqueue.updated_at
+
+    # Only the changed columns are written, in one statement
+    update, = [sql for sql in statements if sql.startswith("UPDATE")]
+    assert update.startswith("UPDATE workqueue SET name=?, enabled=?, updated_at=? WHERE workqueue.id = ?")
+    assert "RETURNING" in update
+
+    with Session(engine) as session:
+        assert session.get(Workqueue, workqueue.id).name == "b"
+
+
+def test_delete_returns_deleted_instance(engine, workqueue: Workqueue):
+    with Session(engine, expire_on_commit=False) as session:
+        deleted = WorkqueueRepository(session).delete(session.get(Workqueue, workqueue.id))
+
+    assert deleted.deleted is True
+
+
+def test_update_without_changes_writes_nothing(engine, workqueue: Workqueue, statements: list[str]):
+    with Session(engine, expire_on_commit=False) as session:
+        loaded = session.get(Workqueue, workqueue.id)
+        statements.clear()
+
+        WorkqueueRepository(session).update(loaded, {"name": "a", "enabled": True})
+
+    assert statements == []
+
+
+def test_create_does_not_reload(engine, statements: list[str]):
+    with Session(engine, expire_on_commit=False) as session:
+        created = WorkqueueRepository(session).create(
+            {"name": "c", "description": None, "enabled": True, "deleted": False}
+        )
+
+    assert created.id is not None
+    assert not [sql for sql in statements if sql.startswith("SELECT")]
@@ -0,0 +1,106 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.cache import clear_caches
+from app.database.heartbeats import HeartbeatBuffer
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+def resource_repository(existing=(1, 2)) -> MagicMock:
+    repository = MagicMock()
+    repository.keep_alive = AsyncMock(side_effect=lambda resource_id: resource_id in existing)
+    repository.keep_alive_many = AsyncMock(
+        side_effect=lambda last_seen: [resource_id for resource_id in last_seen if resource_id in existing]
+    )
+    return repository
+
+
+async def test_first_ping_is_written_right_away():
+    buffer = HeartbeatBuffer()
+    repository = resource_repository()
+
+    assert await buffer.ping(repository, 1) is True
+    assert await buffer.ping(repository, 3) is False
+
+    assert repository.keep_alive.await_count == 2
+    assert buffer.pending == 0
+
+
+async def test_pings_are_coalesced_until_flushed():
+    buffer = HeartbeatBuffer()
+    repository = resource_repository()
+    await buffer.ping(repository, 1)
+    await buffer.ping(repository, 2)
+
+    for _ in range(5):
+        await buffer.ping(repository, 1)
+        await buffer.ping(repository, 2)
+
+    assert repository.keep_alive.await_count == 2
+    assert buffer.pending == 2
+
+    assert await buffer.flush(repository) == 2
+    repository.keep_alive_many.assert_awaited_once()
+    assert buffer.pending == 0
+
+    # Nothing to write
+    assert await buffer.flush(repository) == 0
+    repository.keep_alive_many.assert_awaited_once()
+
+
+async def test_failed_flush_keeps_newer_pings():
+    buffer = HeartbeatBuffer()
+    repository = resource_repository()
+    await buffer.ping(repository, 1)
+    await buffer.ping(repository, 1)
+
+    async def fail(last_seen):
+        # A ping arriving while the flush is running is newer than the one being written
+        await buffer.ping(repository, 1)
+        newer[1] = buffer._last_seen[1]
+        raise ConnectionError()
+
+    newer = {}
+    repository.keep_alive_many.side_effect = fail
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush(repository)
+
+    assert buffer._last_seen == newer
+
+
+async def test_removed_resource_is_checked_again():
+    buffer = HeartbeatBuffer()
+    repository = resource_repository()
+    await buffer.ping(repository, 2)
+    await buffer.ping(repository, 2)
+
+    repository.keep_alive_many.side_effect = lambda last_seen: []
+    repository.keep_alive.side_effect = lambda resource_id: False
+    assert await buffer.flush(repository) == 0
+
+    assert await buffer.ping(repository, 2) is False
+    assert buffer.pending == 0
+
+
+async def test_flush_writes_the_last_ping():
+    buffer = HeartbeatBuffer()
+    repository = resource_repository()
+    await buffer.ping(repository, 1)
+    await buffer.ping(repository, 1)
+    before = datetime.now()
+    await buffer.ping(repository, 1)
+
+    await buffer.flush(repository)
+
+    last_seen = repository.keep_alive_many.call_args.args[0]
+    assert list(last_seen) == [1]
+    assert last_seen[1] >= before
@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.api.v1.dependencies import get_workqueue_service, resolve_access_token
+from app.database.session import get_session
+from app.main import app
+from app.metrics import (
+    RequestMetricsMiddleware,
+    TimedQueuePool,
+    monitor_event_loop_lag,
+    record_workqueue_items,
+)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def workqueue(name: str, new: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        name=name, new=new, in_progress=0, completed=0, failed=0, pending_user_action=0
+    )
+
+
+def test_request_duration_is_labelled_by_route_template():
+    test_app = FastAPI()
+    test_app.add_middleware(RequestMetricsMiddleware)
+
+    @test_app.get("/things/{thing_id}")
+    def get_thing(thing_id: int) -> int:
+        return thing_id
+
+    labels = {"method": "GET", "route": "/things/{thing_id}", "status": "200"}
+    before = sample("ats_http_request_duration_seconds_count", **labels)
+
+    client = TestClient(test_app)
+    client.get("/things/1")
+    client.get("/things/2")
+    client.get("/unknown")
+
+    assert sample("ats_http_request_duration_seconds_count", **labels) == before + 2
+    assert sample(
+        "ats_http_request_duration_seconds_count", method="GET", route="unmatched", status="404"
+    ) >= 1
+
+
+def test_pool_checkout_wait_is_recorded():
+    engine = create_engine("sqlite://", poolclass=TimedQueuePool, pool_logging_name="test")
+    before = sample("ats_db_pool_checkout_wait_seconds_count", engine="test")
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert sample("ats_db_pool_checkout_wait_seconds_count", engine="test") == before + 1
+
+
+def test_workqueue_gauges_drop_removed_queues():
+    record_workqueue_items([workqueue("invoices", 3), workqueue("removed", 1)])
+    record_workqueue_items([workqueue("invoices", 5)])
+
+    assert sample("ats_workqueue_items", workqueue="invoices", status="new") == 5
+    assert REGISTRY.get_sample_value(
+        "ats_workqueue_items", {"workqueue": "removed", "status": "new"}
+    ) is None
+
+
+async def test_event_loop_lag_is_observed():
+    before = sample("ats_event_loop_lag_seconds_count")
+
+    task = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+
+    assert sample("ats_event_loop_lag_seconds_count") > before
+
+
+def test_metrics_endpoint():
+    service = MagicMock()
+    service.get_information.return_value = [workqueue("payments", 2)]
+    app.dependency_overrides[get_workqueue_service] = lambda: service
+    app.dependency_overrides[resolve_access_token] = lambda: MagicMock()
+
+    try:
+        response = TestClient(app).get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'ats_workqueue_items{status="new",workqueue="payments"} 2.0' in response.text
+    assert 'ats_db_pool_connections{engine="sync",state="checked_out"}' in response.text
+
+
+def test_metrics_endpoint_requires_token():
+    service = MagicMock()
+    app.dependency_overrides[get_workqueue_service] = lambda: service
+    app.dependency_overrides[get_session] = lambda: MagicMock()
+
+    try:
+        with patch("app.api.v1.dependencies.tokens_exist", return_value=True):
+            response = TestClient(app).get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 401
+    service.get_information.assert_not_called()
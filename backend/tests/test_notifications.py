@@ -0,0 +1,112 @@
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.v1.workqueue_router import claim_with_wait
+from app.database.notifications import SESSION_CHANNEL, WORKITEM_CHANNEL, Notifier
+
+
+def listening_notifier(channel: str = WORKITEM_CHANNEL) -> Notifier:
+    notifier = Notifier(channel)
+    notifier._ensure_listening = lambda: None
+    notifier._connection = object()
+    return notifier
+
+
+async def test_notify_wakes_waiters_on_the_same_queue():
+    notifier = listening_notifier()
+
+    with notifier.subscribe(1) as first, notifier.subscribe(2) as second:
+        notifier.notify(1)
+
+        assert await notifier.wait(first, 1) is True
+        assert await notifier.wait(second, 0.01) is False
+
+    assert notifier._waiters == {}
+
+
+async def test_wait_is_capped_without_listener():
+    notifier = Notifier(WORKITEM_CHANNEL)
+    notifier._ensure_listening = lambda: None
+
+    with patch("app.database.notifications.settings") as mock_settings:
+        mock_settings.workqueue_wait_fallback_interval = 0.01
+        with notifier.subscribe(1) as event:
+            start = time.monotonic()
+            assert await notifier.wait(event, 10) is False
+            assert time.monotonic() - start < 1
+
+
+async def test_claim_with_wait_retries_after_notification():
+    notifier = listening_notifier()
+    claim = AsyncMock(side_effect=[None, "item"])
+
+    with patch("app.api.v1.workqueue_router.workqueue_notifier", notifier):
+        asyncio.get_running_loop().call_later(0.05, notifier.notify, 1)
+        start = time.monotonic()
+
+        assert await claim_with_wait(claim, 1, 5) == "item"
+        assert time.monotonic() - start < 1
+
+
+async def test_claim_with_wait_times_out():
+    notifier = listening_notifier()
+
+    with patch("app.api.v1.workqueue_router.workqueue_notifier", notifier):
+        assert await claim_with_wait(AsyncMock(return_value=[]), 1, 0) == []
+
+
+async def test_poll_returns_session_once_dispatched():
+    notifier = listening_notifier(SESSION_CHANNEL)
+    fetch = AsyncMock(side_effect=[None, {"id": 1}])
+
+    # A dispatch to another resource does not wake the request
+    asyncio.get_running_loop().call_later(0.02, notifier.notify, 2)
+    asyncio.get_running_loop().call_later(0.05, notifier.notify, 1)
+    start = time.monotonic()
+
+    assert await notifier.poll(1, fetch, 5) == {"id": 1}
+    assert time.monotonic() - start < 1
+    assert fetch.await_count == 2
+
+
+async def test_subscribe_does_not_wait_for_the_listener():
+    notifier = Notifier(WORKITEM_CHANNEL)
+    connecting = threading.Event()
+    listening = socket.socketpair()
+    connection = MagicMock(fileno=listening[0].fileno, notifies=[])
+
+    def connect():
+        connecting.wait(1)
+        return connection
+
+    with patch.object(notifier, "_connect", connect):
+        start = time.monotonic()
+        with notifier.subscribe(1):
+            assert time.monotonic() - start < 0.5
+            assert notifier._connection is None
+
+        connecting.set()
+        await notifier._connecting
+
+    assert notifier._connection is connection
+    notifier.close()
+    connection.close.assert_called_once()
+    for end in listening:
+        end.close()
+
+
+async def test_failed_listener_is_retried_later():
+    notifier = Notifier(WORKITEM_CHANNEL)
+
+    with patch.object(notifier, "_connect", side_effect=OSError("connection refused")) as connect:
+        with notifier.subscribe(1):
+            await notifier._connecting
+
+        with notifier.subscribe(1):
+            assert notifier._connecting is None
+
+    assert connect.call_count == 1
+    assert notifier._retry_at > time.monotonic()
@@ -0,0 +1,118 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.database.models import WorkItem
+from app.database.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+KEYS = (WorkItem.updated_at, WorkItem.id)
+
+
+def make_items(count: int) -> list[WorkItem]:
+    return [
+        WorkItem(id=i, updated_at=datetime(2025, 1, 1, 12, 0, i), data={}, reference="")
+        for i in range(1, count + 1)
+    ]
+
+
+def fake_session(rows: list) -> MagicMock:
+    session = MagicMock()
+    session.exec.return_value.all.return_value = rows
+    return session
+
+
+def compiled(session: MagicMock) -> str:
+    query = session.exec.call_args.args[0]
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip():
+    values = [datetime(2025, 1, 1, 12, 30, 15, 250), 42]
+
+    cursor = encode_cursor(values, backwards=True)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, KEYS) == (values, True)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor([42]),
+        encode_cursor(["yesterday", 42]),
+        encode_cursor([datetime(2025, 1, 1), "42"]),
+        "eyJmb28iOiAxfQ",
+    ],
+)
+def test_invalid_cursor(cursor: str):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, KEYS)
+
+
+def test_first_page():
+    session = fake_session(make_items(3))
+
+    page = paginate(session, select(WorkItem), KEYS, limit=2)
+
+    assert [item.id for item in page.items] == [1, 2]
+    assert page.prev_cursor is None
+    assert decode_cursor(page.next_cursor, KEYS) == ([datetime(2025, 1, 1, 12, 0, 2), 2], False)
+
+    sql = compiled(session)
+    assert "OFFSET" not in sql
+    assert "ORDER BY workitem.updated_at ASC, workitem.id ASC" in sql
+
+
+def test_last_page_has_no_next_cursor():
+    session = fake_session(make_items(2))
+
+    page = paginate(session, select(WorkItem), KEYS, limit=2, skip=2)
+
+    assert page.next_cursor is None
+    assert page.prev_cursor is not None
+    assert "OFFSET" in compiled(session)
+
+
+def test_next_page_seeks_past_cursor():
+    session = fake_session(make_items(1))
+    cursor = encode_cursor([datetime(2025, 1, 1), 7])
+
+    page = paginate(session, select(WorkItem), KEYS, limit=2, cursor=cursor, descending=True)
+
+    sql = compiled(session)
+    assert "(workitem.updated_at, workitem.id) < (" in sql
+    assert "ORDER BY workitem.updated_at DESC, workitem.id DESC" in sql
+    assert page.next_cursor is None
+    assert page.prev_cursor is not None
+
+
+def test_previous_page_is_fetched_in_reverse():
+    # Rows come back in reverse order when walking backwards
+    session = fake_session(list(reversed(make_items(3))))
+    cursor = encode_cursor([datetime(2025, 1, 1), 7], backwards=True)
+
+    page = paginate(session, select(WorkItem), KEYS, limit=2, cursor=cursor, descending=True)
+
+    sql = compiled(session)
+    assert "(workitem.updated_at, workitem.id) > (" in sql
+    assert "ORDER BY workitem.updated_at ASC, workitem.id ASC" in sql
+    assert [item.id for item in page.items] == [2, 3]
+    assert page.next_cursor is not None
+    assert decode_cursor(page.prev_cursor, KEYS)[1] is True
+
+
+def test_empty_page():
+    page = paginate(fake_session([]), select(WorkItem), KEYS, limit=2)
+
+    assert page.items == []
+    assert page.next_cursor is None
+    assert page.prev_cursor is None
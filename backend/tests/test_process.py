@@ -23,6 +23,21 @@ def test_get_processes(session: Session, client: TestClient):
     assert len(data) == 2
 
 
+def test_get_processes_by_cursor(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.get("/processes/?include_deleted=true&limit=1")
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == [1]
+    assert "X-Prev-Cursor" not in response.headers
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/processes/?include_deleted=true&limit=1&cursor={cursor}")
+    assert [p["id"] for p in response.json()] == [2]
+    assert "X-Next-Cursor" not in response.headers
+    assert "X-Prev-Cursor" in response.headers
+
+
 def test_get_process(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -1,6 +1,13 @@
+from datetime import datetime, timedelta
+
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app.database import models
+from app.database.repository import ResourceRepository, SessionRepository
+from app.enums import SessionStatus
+from app.services import ResourceService
+
 from . import generate_basic_data  # noqa: F401
 
 
@@ -11,7 +18,8 @@ def test_get_resources(session: Session, client: TestClient):
     data = response.json()
 
     assert response.status_code == 200
-    assert len(data) == 2
+    # Listing does not detach resource-should-expire, the scheduler does
+    assert len(data) == 3
 
     assert data[0]["name"] == "resource"
     assert data[0]["fqdn"] == "resource.example.com"
@@ -63,17 +71,60 @@ def test_resource_should_expire(session: Session, client: TestClient):
     assert data["available"] is True
     assert data["deleted"] is False
 
-    # This will trigger a full available resource update
+    # Listing resources is read only
     response = client.get("/resources")
     assert response.status_code == 200
+    assert client.get("/resources/3").status_code == 200
+
+    # Scheduler housekeeping detaches it and releases the new session dispatched to it
+    service = ResourceService(ResourceRepository(session), SessionRepository(session))
+    assert service.update_availability() == [3]
 
     response = client.get("/resources/3")
     assert response.status_code == 404
 
-    #data = response.json()
-    #assert data["name"] == "resource-should-expire"
-    #assert data["available"] is False
-    #assert data["deleted"] is True
+    released = session.get(models.Session, 4)
+    session.refresh(released)
+    assert released.resource_id is None
+    assert released.dispatched_at is None
+
+
+def test_resource_in_use_expires(session: Session):
+    generate_basic_data(session)
+    session.get(models.Session, 4).status = SessionStatus.IN_PROGRESS
+    session.commit()
+
+    service = ResourceService(ResourceRepository(session), SessionRepository(session))
+
+    # The worker pings while it runs a session, so a silent resource is gone
+    assert service.update_availability() == [3]
+
+    failed = session.get(models.Session, 4)
+    session.refresh(failed)
+    assert failed.status == SessionStatus.FAILED
+    assert failed.resource_id is None
+
+
+def test_get_available_resources(session: Session):
+    generate_basic_data(session)
+    session.add(
+        models.Resource(
+            name="resource-idle",
+            fqdn="resource-idle.example.com",
+            capabilities="linux python",
+            available=True,
+            last_seen=datetime.now() - timedelta(minutes=1),
+            deleted=False,
+        )
+    )
+    session.commit()
+
+    repository = ResourceRepository(session)
+
+    # Resource 3 has a new session dispatched to it and resource 2 is deleted
+    assert sorted(resource.id for resource in repository.get_available_resources()) == [1, 4, 5]
+    assert repository.is_resource_available(repository.get(1))
+    assert not repository.is_resource_available(repository.get(3))
 
 
 
@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.database.repository import SchedulerLeaseRepository
+
+
+def test_scheduler_lease(session: Session):
+    repository = SchedulerLeaseRepository(session)
+
+    lease = repository.acquire("scheduler", "host-a:1", 30)
+    assert lease.holder == "host-a:1"
+    acquired_at = lease.acquired_at
+
+    # Another scheduler cannot take a lease that has not expired
+    assert repository.acquire("scheduler", "host-b:1", 30) is None
+
+    # Renewing keeps the time the lease was first acquired
+    lease = repository.acquire("scheduler", "host-a:1", 30)
+    assert lease.acquired_at == acquired_at
+    assert lease.expires_at > acquired_at
+
+    # An expired lease is taken over
+    repository.acquire("scheduler", "host-a:1", -1)
+    lease = repository.acquire("scheduler", "host-b:1", 30)
+    assert lease.holder == "host-b:1"
+
+    # Only the holder can release the lease
+    repository.release("scheduler", "host-a:1")
+    assert repository.get("scheduler").holder == "host-b:1"
+
+    repository.release("scheduler", "host-b:1")
+    assert repository.get("scheduler") is None
+
+
+def test_scheduler_lease_renew(session: Session):
+    repository = SchedulerLeaseRepository(session)
+    repository.acquire("scheduler", "host-a:1", 30)
+
+    # Only the holder renews, and the row stays locked until it commits
+    assert repository.renew("scheduler", "host-b:1", 30) is None
+    assert repository.renew("scheduler", "host-a:1", 30).holder == "host-a:1"
+
+    with Session(session.get_bind()) as standby:
+        standby.connection().exec_driver_sql("SET lock_timeout = '100ms'")
+        with pytest.raises(OperationalError):
+            SchedulerLeaseRepository(standby).acquire("scheduler", "host-b:1", 30)
+
+    session.commit()
+
+    # An expired lease cannot be renewed, its holder must acquire it again
+    repository.acquire("scheduler", "host-a:1", -1)
+    assert repository.renew("scheduler", "host-a:1", 30) is None
+
+
+def test_scheduler_members(session: Session):
+    repository = SchedulerLeaseRepository(session)
+
+    repository.acquire("member:host-b:1", "host-b:1", 30)
+    repository.acquire("member:host-a:1", "host-a:1", 30)
+    repository.acquire("member:host-c:1", "host-c:1", -1)
+    repository.acquire("scheduler", "host-b:1", 30)
+
+    # Expired members and other leases are left out
+    assert repository.get_holders("member:") == ["host-a:1", "host-b:1"]
+
+
+def test_scheduler_leader_endpoint(session: Session, client: TestClient):
+    response = client.get("/health/scheduler")
+
+    assert response.status_code == 200
+    assert response.json() == {"leader": None, "members": []}
+
+    SchedulerLeaseRepository(session).acquire("scheduler", "host-a:1", 30)
+
+    response = client.get("/health/scheduler")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["leader"] == "host-a:1"
+    assert data["expired"] is False
+    assert data["lease_age_seconds"] >= 0
+
+    # The leader stopped renewing
+    SchedulerLeaseRepository(session).acquire("scheduler", "host-a:1", -1)
+
+    data = client.get("/health/scheduler").json()
+    assert data["leader"] is None
+    assert data["holder"] == "host-a:1"
+    assert data["expired"] is True
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+from time import monotonic
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+import app.database.models as models
+import app.enums as enums
+from app.cache import clear_caches
+from app.database.repository import SchedulerLeaseRepository, WorkqueueRepository
+from app.scheduler import AutomationScheduler
+from app.scheduler.leader import LEASE_NAME
+from app.scheduler.snapshot import SchedulerSnapshot
+from app.services import WorkqueueService
+
+
+def create_fleet(session: Session, size: int):
+    """Processes with a due cron trigger and a workqueue trigger each, and a resource each."""
+    due = datetime.now() - timedelta(seconds=10)
+
+    for number in range(size):
+        workqueue = models.Workqueue(name=f"queue {size} {number}", description="", enabled=True)
+        process = models.Process(name=f"process {size} {number}", requirements="python", workqueue=workqueue)
+        session.add(process)
+        session.flush()
+
+        session.add(models.WorkItem(data={}, locked=False, status=enums.WorkItemStatus.NEW, workqueue_id=workqueue.id))
+        session.add(models.Trigger(type=enums.TriggerType.CRON, cron="* * * * *", enabled=True, process_id=process.id, next_fire_at=due))
+        session.add(models.Trigger(
+            type=enums.TriggerType.WORKQUEUE, cron="", enabled=True, process_id=process.id,
+            workqueue_id=workqueue.id, workqueue_resource_limit=1, workqueue_scale_up_threshold=1,
+        ))
+        session.add(models.Resource(
+            name=f"resource {size} {number}", fqdn=f"resource-{size}-{number}", capabilities="python",
+            available=True, last_seen=datetime.now(),
+        ))
+
+    session.commit()
+
+
+def count_tick_statements(session: Session) -> int:
+    statements = []
+    engine = session.get_bind()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    scheduler = AutomationScheduler()
+    scheduler.partitions_checked_at = monotonic()
+    SchedulerLeaseRepository(session).acquire(LEASE_NAME, scheduler.lease.holder, 30)
+    clear_caches()
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with Session(engine, expire_on_commit=False) as tick_session:
+            asyncio.run(scheduler._tick(tick_session))
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    return len(statements)
+
+
+def test_scheduler_tick_query_count(session: Session):
+    create_fleet(session, 2)
+    small = count_tick_statements(session)
+
+    sessions = session.exec(select(models.Session)).all()
+    assert len(sessions) == 2
+    assert all(s.resource_id is not None for s in sessions)
+
+    # Clear the first fleet, so the second tick has the same kind of work on more rows
+    for s in sessions:
+        s.status = enums.SessionStatus.COMPLETED
+    for trigger in session.exec(select(models.Trigger)).all():
+        trigger.deleted = True
+    for resource in session.exec(select(models.Resource)).all():
+        resource.deleted = True
+    session.commit()
+
+    create_fleet(session, 40)
+    large = count_tick_statements(session)
+
+    assert len(session.exec(select(models.Session).where(models.Session.status == enums.SessionStatus.NEW)).all()) == 40
+    assert large == small
+
+
+def test_tick_without_lease_is_discarded(session: Session):
+    create_fleet(session, 1)
+    scheduler = AutomationScheduler()
+    scheduler.partitions_checked_at = monotonic()
+
+    # A standby took the lease over while the tick ran
+    SchedulerLeaseRepository(session).acquire(LEASE_NAME, "standby:1", 30)
+    clear_caches()
+
+    with Session(session.get_bind(), expire_on_commit=False) as tick_session:
+        asyncio.run(scheduler._tick(tick_session))
+
+    assert session.exec(select(models.Session)).all() == []
+    assert scheduler.lease.is_leader is False
+
+
+def test_snapshot_counts_are_not_cached(session: Session):
+    create_fleet(session, 1)
+    workqueue = session.exec(select(models.Workqueue)).one()
+    clear_caches()
+
+    # The API caches the count, then the queue drains
+    assert WorkqueueService(WorkqueueRepository(session)).count_pending_items(workqueue.id) == 1
+    for item in session.exec(select(models.WorkItem)).all():
+        item.status = enums.WorkItemStatus.COMPLETED
+    session.commit()
+
+    with Session(session.get_bind(), expire_on_commit=False) as tick_session:
+        snapshot = SchedulerSnapshot.load(tick_session, datetime.now())
+
+    assert snapshot.pending_items == {workqueue.id: 0}
+
+
+def test_due_trigger_is_claimed_by_one_tick(session: Session):
+    create_fleet(session, 1)
+    engine = session.get_bind()
+    now = datetime.now()
+
+    with Session(engine, expire_on_commit=False) as first, Session(engine, expire_on_commit=False) as second:
+        # Two schedulers that both consider themselves owner of the trigger
+        leading = SchedulerSnapshot.load(first, now)
+        lagging = SchedulerSnapshot.load(second, now)
+
+        assert len(leading.claim_due_triggers(leading.triggers)) == 2
+
+        # The cron trigger is held by the first tick, the workqueue trigger is kept
+        claimed = lagging.claim_due_triggers(lagging.triggers)
+        assert [trigger.type for trigger in claimed] == [enums.TriggerType.WORKQUEUE]
+        second.rollback()
+
+        # After the first tick commits, the trigger has moved on
+        cron = next(t for t in leading.triggers if t.type == enums.TriggerType.CRON)
+        leading.update_trigger(cron, {"next_fire_at": now + timedelta(minutes=1)})
+        first.commit()
+
+        claimed = lagging.claim_due_triggers(lagging.triggers)
+        assert [trigger.type for trigger in claimed] == [enums.TriggerType.WORKQUEUE]
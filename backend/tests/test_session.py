@@ -1,7 +1,12 @@
+from datetime import datetime, timedelta
+
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 import app.enums as enums
+from app.database import models
+from app.database.repository import ResourceRepository, SessionRepository
+from app.services import ResourceService
 
 from . import generate_basic_data  # noqa: F401
 
@@ -94,9 +99,8 @@ def test_session_reset_on_resource_detach(session: Session, client: TestClient):
     assert data["status"] == enums.SessionStatus.NEW
     assert data["dispatched_at"] is not None
 
-    # Now trigger a detach on the resource
-    response = client.get("/resources")
-    assert response.status_code == 200
+    # Scheduler housekeeping detaches the resource, which was last seen 11 minutes ago
+    ResourceService(ResourceRepository(session), SessionRepository(session)).update_availability()
 
     response = client.get("/sessions/4")
     data = response.json()
@@ -137,6 +141,39 @@ def test_get_session_by_resource_id(session: Session, client: TestClient):
     assert data["status"] == enums.SessionStatus.NEW
 
 
+def test_get_session_by_resource_id_wait(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.get("/sessions/by_resource_id/3?wait=1")
+    assert response.status_code == 200
+
+    response = client.get("/sessions/by_resource_id/1?wait=1")
+    assert response.status_code == 204
+
+    response = client.get("/sessions/by_resource_id/1?wait=3600")
+    assert response.status_code == 422
+
+
+def test_claim_session_by_resource_id(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/sessions/by_resource_id/3/claim")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["session"]["id"] == 4
+    assert data["session"]["status"] == enums.SessionStatus.IN_PROGRESS
+    assert data["process"]["id"] == 1
+    assert data["credential"]["id"] == 1
+
+    # The session is started once
+    response = client.post("/sessions/by_resource_id/3/claim")
+    assert response.status_code == 204
+
+    response = client.post("/sessions/by_resource_id/1/claim?wait=1")
+    assert response.status_code == 204
+
+
 def test_get_paginated_sessions(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -152,6 +189,43 @@ def test_get_paginated_sessions(session: Session, client: TestClient):
     data = response.json()
     assert data["total_items"] == 4
 
+def test_get_sessions_by_cursor(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    first = client.get("/sessions/?include_deleted=true&size=3").json()
+    assert first["prev_cursor"] is None
+
+    second = client.get(f"/sessions/?include_deleted=true&size=3&cursor={first['next_cursor']}").json()
+    assert second["next_cursor"] is None
+    assert [s["id"] for s in first["items"] + second["items"]] == [4, 3, 2, 1]
+
+    previous = client.get(f"/sessions/?include_deleted=true&size=3&cursor={second['prev_cursor']}").json()
+    assert previous["items"] == first["items"]
+
+    response = client.get("/sessions/?cursor=invalid")
+    assert response.status_code == 400
+
+
+def test_claim_session_by_resource_id(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post("/sessions/by_resource_id/3/claim")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["session"]["id"] == 4
+    assert data["session"]["status"] == enums.SessionStatus.IN_PROGRESS
+    assert data["process"]["id"] == 1
+    assert data["credential"]["id"] == 1
+
+    # The session is started once
+    response = client.post("/sessions/by_resource_id/3/claim")
+    assert response.status_code == 204
+
+    response = client.post("/sessions/by_resource_id/1/claim?wait=1")
+    assert response.status_code == 204
+
+
 def test_get_paginated_sessions_with_search(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -162,3 +236,32 @@ def test_get_paginated_sessions_with_search(session: Session, client: TestClient
     assert data["total_items"] == 3
     
 
+
+
+def test_housekeeping_statements(session: Session):
+    generate_basic_data(session)
+    now = datetime.now()
+    # Resource 2 is deleted, resource 1 is not
+    orphaned = models.Session(process_id=1, status=enums.SessionStatus.NEW, resource_id=2, dispatched_at=now)
+    dangling = models.Session(
+        process_id=1, status=enums.SessionStatus.IN_PROGRESS, resource_id=2, dispatched_at=now - timedelta(hours=5)
+    )
+    recent = models.Session(process_id=1, status=enums.SessionStatus.IN_PROGRESS, resource_id=2, dispatched_at=now)
+    running = models.Session(process_id=1, status=enums.SessionStatus.IN_PROGRESS, resource_id=1, dispatched_at=now)
+    session.add_all([orphaned, dangling, recent, running])
+    session.commit()
+
+    repository = SessionRepository(session)
+
+    assert repository.release_orphaned() == [orphaned.id]
+    assert repository.fail_dangling(now - timedelta(hours=4)) == [dangling.id]
+    assert repository.flush_resources([1]) == [running.id]
+
+    for instance in (orphaned, dangling, recent, running):
+        session.refresh(instance)
+
+    assert orphaned.resource_id is None and orphaned.dispatched_at is None
+    assert dangling.status == enums.SessionStatus.FAILED
+    assert recent.status == enums.SessionStatus.IN_PROGRESS
+    assert running.status == enums.SessionStatus.FAILED and running.resource_id is None
+    assert running.dispatched_at is not None
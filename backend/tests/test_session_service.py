@@ -1,69 +1,39 @@
-import pytest
 from datetime import datetime, timedelta
 
-from app.database.models import Session, Resource
-from app.enums import SessionStatus
+import pytest
+
 from app.services import SessionService
 
 
-@pytest.fixture(params=["active", "orphaned"])
-def session_repository(request):
+@pytest.fixture
+def session_repository():
     class MockSessionRepository:
-        def __init__(self, variant):
-            self.data = None
-            self.variant = variant
+        def __init__(self):
+            self.dispatched_before = None
 
-        def get_active_sessions(self):
-            if self.variant == "active":
-                return [
-                    Session(
-                        id=1,
-                        status=SessionStatus.IN_PROGRESS,
-                        dispatched_at=datetime.now() - timedelta(hours=5),
-                        resource_id=1,
-                    )
-                ]
-            return []
+        def release_orphaned(self):
+            return [1]
 
-        def get_new_sessions(self):
-            if self.variant == "orphaned":
-                return [
-                    Session(
-                        id=1,
-                        resource_id=1,
-                        status=SessionStatus.NEW,
-                    )
-                ]
-            return []
+        def fail_dangling(self, dispatched_before):
+            self.dispatched_before = dispatched_before
+            return [2]
 
-        def update(self, session, data):
-            self.data = data
+    return MockSessionRepository()
 
-    return MockSessionRepository(request.param)
-
-@pytest.fixture
-def resource_repository():
-    class MockResourceRepository:
-        def get(self, id):
-            return Resource(id=1, available=False, deleted = True)
-    return MockResourceRepository()
 
 # Test for flushing active sessions
-@pytest.mark.parametrize("session_repository", ["active"], indirect=True)
-def test_flush_dangling_sessions(session_repository, resource_repository):
-    service = SessionService(session_repository, resource_repository)
-    service.flush_dangling_sessions()
-    assert session_repository.data == {
-        "status": SessionStatus.FAILED,
-    }
+def test_flush_dangling_sessions(session_repository):
+    service = SessionService(session_repository, None)
+
+    assert service.flush_dangling_sessions() == [2]
+
+    # Only sessions dispatched more than 4 hours ago are failed
+    cutoff = datetime.now() - timedelta(hours=4)
+    assert abs(session_repository.dispatched_before - cutoff) < timedelta(seconds=5)
+
 
 # Test for rescheduling orphaned sessions
-@pytest.mark.parametrize("session_repository", ["orphaned"], indirect=True)
-def test_reschedule_orphaned_sessions(session_repository, resource_repository):
-    service = SessionService(session_repository, resource_repository)
-    service.reschedule_orphaned_sessions()
-    assert session_repository.data == {
-        "resource_id": None,
-        "dispatched_at": None,
-    }
+def test_reschedule_orphaned_sessions(session_repository):
+    service = SessionService(session_repository, None)
 
+    assert service.reschedule_orphaned_sessions() == [1]
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
@@ -115,6 +117,7 @@ def test_update_trigger(session: Session, client: TestClient):
     assert data["id"] == 1
     assert data["type"] == enums.TriggerType.CRON
     assert data["cron"] == "10 10 * * *"
+    assert datetime.fromisoformat(data["next_fire_at"]).strftime("%H:%M") == "10:10"
 
     # Change a cron trigger to a workqueue trigger
     response = client.put(
@@ -131,4 +134,32 @@ def test_update_trigger(session: Session, client: TestClient):
     assert data["id"] == 1
     assert data["type"] == enums.TriggerType.WORKQUEUE
     assert data["workqueue_id"] == 1
-    assert data["cron"] == ""
\ No newline at end of file
+    assert data["cron"] == ""
+    assert data["next_fire_at"] is None
+
+
+def test_trigger_next_fire_at(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post(
+        "/processes/1/trigger",
+        json={"type": enums.TriggerType.CRON, "cron": "*/5 * * * *", "enabled": True},
+    )
+    trigger_id = response.json()["id"]
+    next_fire_at = datetime.fromisoformat(response.json()["next_fire_at"])
+
+    assert next_fire_at > datetime.now()
+    assert next_fire_at.minute % 5 == 0
+
+    response = client.put(
+        f"/triggers/{trigger_id}",
+        json={"type": enums.TriggerType.CRON, "cron": "*/5 * * * *", "enabled": False},
+    )
+    assert response.json()["next_fire_at"] is None
+
+    date = datetime(2030, 1, 1, 12, 0)
+    response = client.put(
+        f"/triggers/{trigger_id}",
+        json={"type": enums.TriggerType.DATE, "date": date.isoformat(), "enabled": True},
+    )
+    assert datetime.fromisoformat(response.json()["next_fire_at"]) == date
@@ -0,0 +1,90 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.database.models import Process
+from app.database.repository import in_unit_of_work
+from app.database.unit_of_work import AsyncUnitOfWork, UnitOfWork
+
+
+def sync_session() -> MagicMock:
+    session = MagicMock()
+    session.info = {}
+    return session
+
+
+def test_commits_once_on_exit():
+    session = sync_session()
+
+    with UnitOfWork(session) as uow:
+        process = uow.processes.create({"name": "a", "requirements": "python"})
+        uow.processes.update(process, {"name": "b"})
+
+        assert in_unit_of_work(session)
+        assert session.flush.call_count == 2
+        session.commit.assert_not_called()
+
+    session.commit.assert_called_once()
+    session.refresh.assert_not_called()
+    assert not in_unit_of_work(session)
+
+
+def test_only_outermost_commits():
+    session = sync_session()
+    uow = UnitOfWork(session)
+
+    with uow:
+        with uow:
+            uow.processes.create({"name": "a", "requirements": "python"})
+
+        session.commit.assert_not_called()
+
+    session.commit.assert_called_once()
+
+
+def test_rolls_back_on_exception():
+    session = sync_session()
+
+    with pytest.raises(ValueError):
+        with UnitOfWork(session) as uow:
+            uow.processes.create({"name": "a", "requirements": "python"})
+            raise ValueError
+
+    session.rollback.assert_called_once()
+    session.commit.assert_not_called()
+    assert not in_unit_of_work(session)
+
+
+def test_not_transactional_commits_each_write():
+    session = sync_session()
+
+    with UnitOfWork(session, transactional=False) as uow:
+        process = uow.processes.create({"name": "a", "requirements": "python"})
+        uow.processes.update(process, {"name": "b"})
+
+    assert session.commit.call_count == 2
+    session.refresh.assert_not_called()
+    session.flush.assert_not_called()
+
+
+def test_outside_unit_of_work_commits_each_write():
+    session = sync_session()
+
+    process = UnitOfWork(session).processes.create({"name": "a", "requirements": "python"})
+
+    assert isinstance(process, Process)
+    session.commit.assert_called_once()
+
+
+async def test_async_commits_once_on_exit():
+    session = MagicMock()
+    session.info = {}
+    session.flush = AsyncMock()
+    session.commit = AsyncMock()
+
+    async with AsyncUnitOfWork(session) as uow:
+        await uow.auditlogs.create({"message": "a"})
+        await uow.auditlogs.create({"message": "b"})
+
+    assert session.flush.await_count == 2
+    session.commit.assert_awaited_once()
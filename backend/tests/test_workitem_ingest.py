@@ -0,0 +1,91 @@
+import pytest
+
+from app.services.workitem_ingest import (
+    IngestError,
+    WorkItemIngestService,
+    parse_csv,
+    parse_json_array,
+    parse_ndjson,
+)
+
+
+async def stream(*chunks: str):
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+async def test_parse_json_array_across_chunks():
+    records = await collect(
+        parse_json_array(stream('[{"reference": "a", "da', 'ta": {"x": 1}}, {"refe', 'rence": "b"} ]'))
+    )
+
+    assert records == [
+        (1, {"reference": "a", "data": {"x": 1}}),
+        (2, {"reference": "b"}),
+    ]
+
+
+async def test_parse_json_array_split_multibyte_character():
+    body = '[{"reference": "æøå"}]'.encode("utf-8")
+
+    async def chunks():
+        yield body[:16]
+        yield body[16:]
+
+    assert await collect(parse_json_array(chunks())) == [(1, {"reference": "æøå"})]
+
+
+async def test_parse_json_array_rejects_other_bodies():
+    with pytest.raises(IngestError):
+        await collect(parse_json_array(stream('{"reference": "a"}')))
+
+    with pytest.raises(IngestError):
+        await collect(parse_json_array(stream('[{"reference": "a"}')))
+
+
+async def test_parse_ndjson_reports_invalid_lines():
+    records = await collect(parse_ndjson(stream('{"reference": "a"}\n', "not json\n\n", '{"reference": "c"}')))
+
+    assert records[0] == (1, {"reference": "a"})
+    assert records[1][0] == 2
+    assert records[1][1].startswith("Invalid JSON")
+    assert records[2] == (3, {"reference": "c"})
+
+
+async def test_parse_csv():
+    records = await collect(
+        parse_csv(stream('reference,data,extra\r\n', 'a,"{""x"": 1}",foo\r\n', "b,,bar\r\n", "c,[1],baz\n", "d\n"))
+    )
+
+    assert records[0] == (1, {"reference": "a", "data": {"x": 1, "extra": "foo"}})
+    assert records[1] == (2, {"reference": "b", "data": {"extra": "bar"}})
+    assert records[2] == (3, "The data column must contain a JSON object")
+    assert records[3] == (4, "Expected 3 columns, got 1")
+
+
+async def test_ingest_batches_and_reports_failures():
+    class MockWorkItemRepository:
+        def __init__(self):
+            self.batches = []
+
+        def bulk_create(self, rows):
+            self.batches.append(rows)
+
+    repository = MockWorkItemRepository()
+    service = WorkItemIngestService(repository)
+    service.batch_size = 2
+
+    body = '[{"reference": "a"}, {"reference": "b"}, 42, {"data": "x"}, {"reference": "e"}]'
+    result = await service.ingest(7, parse_json_array(stream(body)))
+
+    assert result.created == 3
+    assert result.failed == 2
+    assert result.complete is True
+    assert [error.row for error in result.errors] == [3, 4]
+    assert [len(batch) for batch in repository.batches] == [2, 1]
+    assert repository.batches[0][0]["workqueue_id"] == 7
+    assert repository.batches[0][0]["status"] == "new"
@@ -26,6 +26,27 @@ def test_get_workqueues(session: Session, client: TestClient):
     assert len(data) == 2
 
 
+def test_get_workqueues_information(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.get("/workqueues/information")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert len(data) == 1
+    assert data[0]["name"] == "Workqueue"
+    assert data[0]["new"] == 1
+    assert data[0]["in_progress"] == 1
+    assert data[0]["completed"] == 1
+    assert data[0]["failed"] == 1
+    assert data[0]["pending_user_action"] == 1
+
+    response = client.get("/workqueues/information?include_deleted=true")
+    data = {queue["name"]: queue for queue in response.json()}
+    assert len(data) == 2
+    assert data["Deleted workqueue"]["new"] == 0
+
+
 def test_get_workqueue(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -119,6 +140,63 @@ def test_add_workitem(session: Session, client: TestClient):
     assert data.locked is False
 
 
+def test_add_workitems_bulk(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post(
+        "/workqueues/1/add_bulk",
+        json=[
+            {"data": {"id": 1}, "reference": "Bulk 1"},
+            {"data": {"id": 2}, "reference": "Bulk 2"},
+            {"data": "not an object", "reference": "Bulk 3"},
+        ],
+    )
+
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert data["complete"] is True
+    assert data["errors"][0]["row"] == 3
+
+    items = client.get("/workqueues/1/by_reference/Bulk 2").json()
+    assert len(items) == 1
+    assert items[0]["data"] == {"id": 2}
+    assert items[0]["status"] == WorkItemStatus.NEW
+    assert items[0]["locked"] is False
+
+
+def test_add_workitems_bulk_ndjson_and_csv(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.post(
+        "/workqueues/1/add_bulk",
+        content='{"reference": "Line 1"}\n{"reference": "Line 2", "data": {"a": 1}}\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+    response = client.post(
+        "/workqueues/1/add_bulk",
+        content='reference,data\nRow 1,"{""a"": 1}"\nRow 2,\n',
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+
+    response = client.get("/workqueues/1/items")
+    assert response.json()["total_items"] == 9
+
+    response = client.post(
+        "/workqueues/1/add_bulk",
+        content="<items/>",
+        headers={"Content-Type": "application/xml"},
+    )
+    assert response.status_code == 415
+
+
 def test_next_item(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -143,6 +221,44 @@ def test_next_item(session: Session, client: TestClient):
 
     assert response.status_code == 204
 
+def test_next_item_wait_on_empty_queue(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    response = client.get("/workqueues/1/next_item")
+    assert response.status_code == 200
+
+    response = client.get("/workqueues/1/next_item?wait=1")
+    assert response.status_code == 204
+
+    response = client.get("/workqueues/1/next_item?wait=3600")
+    assert response.status_code == 422
+
+
+def test_next_items(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    for reference in ["Batch 1", "Batch 2", "Batch 3"]:
+        client.post("/workqueues/1/add", json={"data": {}, "reference": reference})
+
+    response = client.get("/workqueues/1/next_items?count=3")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [item["reference"] for item in data] == ["Embedded workitem", "Batch 1", "Batch 2"]
+    assert all(item["status"] == WorkItemStatus.IN_PROGRESS for item in data)
+    assert all(item["locked"] is True for item in data)
+
+    response = client.get("/workqueues/1/next_items?count=3")
+    assert response.status_code == 200
+    assert [item["reference"] for item in response.json()] == ["Batch 3"]
+
+    response = client.get("/workqueues/1/next_items?count=3")
+    assert response.status_code == 204
+
+    response = client.get("/workqueues/1/next_items?count=0")
+    assert response.status_code == 422
+
+
 def test_next_item_disabled_queue(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -280,6 +396,34 @@ def test_workitems_paging_with_search(session: Session, client: TestClient):
     assert data["total_items"] == 5
 
 
+def test_workitems_search_data_and_status(session: Session, client: TestClient):
+    generate_basic_data(session)
+
+    session.add(
+        WorkItem(
+            status=WorkItemStatus.NEW,
+            data={"customer": {"name": "Jensen", "ids": [1234, 5678]}},
+            reference="",
+            locked=False,
+            workqueue_id=1,
+        )
+    )
+    session.commit()
+
+    response = client.get("/workqueues/1/items?search=jENSEN")
+    assert [item["data"]["customer"]["name"] for item in response.json()["items"]] == ["Jensen"]
+
+    response = client.get("/workqueues/1/items?search=5678")
+    assert response.json()["total_items"] == 1
+
+    # Keys are not searched, only values
+    response = client.get("/workqueues/1/items?search=customer")
+    assert response.json()["total_items"] == 0
+
+    response = client.get("/workqueues/1/items?search=in progress")
+    assert [item["status"] for item in response.json()["items"]] == [WorkItemStatus.IN_PROGRESS]
+
+
 def test_get_workitems_by_reference_in_workqueue(session: Session, client: TestClient):
     generate_basic_data(session)
 
@@ -0,0 +1,40 @@
+import pytest
+
+from app.cache import clear_caches
+from app.enums import WorkItemStatus
+from app.services import WorkqueueService
+
+
+@pytest.fixture
+def workqueue_repository():
+    class MockWorkqueueRepository:
+        def __init__(self):
+            self.count_queries = 0
+
+        def get_workitem_counts(self):
+            self.count_queries += 1
+            return {
+                1: {WorkItemStatus.NEW: 12, WorkItemStatus.FAILED: 2},
+                2: {WorkItemStatus.COMPLETED: 4},
+            }
+
+    clear_caches()
+    yield MockWorkqueueRepository()
+    clear_caches()
+
+
+def test_count_pending_items(workqueue_repository):
+    service = WorkqueueService(workqueue_repository)
+
+    assert service.count_pending_items(1) == 12
+    assert service.count_pending_items(2) == 0
+    assert service.count_pending_items(3) == 0
+
+
+def test_workitem_counts_are_computed_once_per_ttl(workqueue_repository):
+    service = WorkqueueService(workqueue_repository)
+
+    service.count_pending_items(1)
+    service.get_workitem_counts(2)
+
+    assert workqueue_repository.count_queries == 1
@@ -1,5 +1,7 @@
 import requests
 import logging
+import queue
+import threading
 import traceback
 from contextlib import contextmanager
 from datetime import datetime
@@ -13,61 +15,183 @@ sessions_base_url = f"{automationserver_url}/sessions"
 
 
 class SessionLoggingHandler(logging.Handler):
-    def __init__(self, session_id: int):
+    """
+    Sends log records to the audit log in batches.
+
+    Records are queued in memory and posted to /audit-logs/batch from a background
+    thread when `batch_size` records are waiting or `flush_interval` seconds have passed.
+    The queue holds at most `max_queue_size` records. When the server cannot keep up,
+    the oldest records are dropped and a warning with the number of dropped records is
+    sent with the next batch. Records logged while a batch is posted, such as a failed
+    post, are not sent themselves.
+    """
+
+    def __init__(
+        self,
+        session_id: int,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_queue_size: int = 10000,
+    ):
         super().__init__()
         self.session_id = session_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()
+        # Wakes the flush thread when a full batch is waiting or the handler closes
+        self.wakeup = threading.Condition()
+        # Set on the thread posting a batch, whose own log records are not sent
+        self.sending = threading.local()
+        self.stopping = threading.Event()
+        self.flush_thread = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flush_thread.start()
 
     def emit(self, record):
-        if self.session_id is None:
+        if self.session_id is None or getattr(self.sending, "active", False):
             return
 
         try:
-            # Create structured audit log data
-            log_data = {
+            self._enqueue(self._to_log_data(record))
+        except Exception:
+            self.handleError(record)
+            return
+
+        if self.records.qsize() >= self.batch_size:
+            with self.wakeup:
+                self.wakeup.notify()
+
+    def flush(self):
+        while self._send_batch():
+            pass
+
+    def close(self):
+        self.stopping.set()
+        with self.wakeup:
+            self.wakeup.notify()
+        self.flush_thread.join(timeout=self.flush_interval + 10)
+        self.flush()
+        super().close()
+
+    def _to_log_data(self, record) -> dict:
+        # Create structured audit log data
+        log_data = {
+            "session_id": self.session_id,
+            "message": self.format(record),
+            "level": record.levelname,
+            "logger_name": record.name,
+            "event_timestamp": datetime.fromtimestamp(record.created).isoformat()
+        }
+
+        # Add source location info
+        if hasattr(record, 'module') and record.module:
+            log_data["module"] = record.module
+        if hasattr(record, 'funcName') and record.funcName:
+            log_data["function_name"] = record.funcName
+        if hasattr(record, 'lineno') and record.lineno:
+            log_data["line_number"] = record.lineno
+
+        # Add exception info if present
+        if record.exc_info:
+            exc_type, exc_value, exc_traceback = record.exc_info
+            log_data["exception_type"] = exc_type.__name__ if exc_type else None
+            log_data["exception_message"] = str(exc_value) if exc_value else None
+            log_data["traceback"] = ''.join(traceback.format_exception(*record.exc_info))
+
+        return log_data
+
+    def _enqueue(self, log_data: dict) -> None:
+        while True:
+            try:
+                self.records.put_nowait(log_data)
+                return
+            except queue.Full:
+                self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        try:
+            self.records.get_nowait()
+            with self.dropped_lock:
+                self.dropped += 1
+        except queue.Empty:
+            pass
+
+    def _flush_periodically(self) -> None:
+        while not self.stopping.is_set():
+            with self.wakeup:
+                self.wakeup.wait_for(
+                    lambda: self.stopping.is_set() or self.records.qsize() >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+
+            if not self.stopping.is_set():
+                self._send_batch()
+
+    def _take_batch(self) -> list[dict]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.records.get_nowait())
+            except queue.Empty:
+                break
+
+        with self.dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+
+        if dropped:
+            batch.append({
                 "session_id": self.session_id,
-                "message": self.format(record),
-                "level": record.levelname,
-                "logger_name": record.name,
-                "event_timestamp": datetime.fromtimestamp(record.created).isoformat()
-            }
-            
-            # Add source location info
-            if hasattr(record, 'module') and record.module:
-                log_data["module"] = record.module
-            if hasattr(record, 'funcName') and record.funcName:
-                log_data["function_name"] = record.funcName
-            if hasattr(record, 'lineno') and record.lineno:
-                log_data["line_number"] = record.lineno
-                
-            # Add exception info if present
-            if record.exc_info:
-                exc_type, exc_value, exc_traceback = record.exc_info
-                log_data["exception_type"] = exc_type.__name__ if exc_type else None
-                log_data["exception_message"] = str(exc_value) if exc_value else None
-                log_data["traceback"] = ''.join(traceback.format_exception(*record.exc_info))
-            
-            # Make direct API call to new audit logs endpoint
-            response = requests.post(f"{automationserver_url}/audit-logs", json=log_data, headers=headers)
-            
-            if response.status_code != 204:
-                response.raise_for_status()
-                
+                "message": f"{dropped} log records were dropped because the audit log could not keep up",
+                "level": "WARNING",
+                "logger_name": __name__,
+                "event_timestamp": datetime.now().isoformat(),
+            })
+
+        return batch
+
+    def _send_batch(self) -> bool:
+        """Post one batch of queued records. Returns False when there was nothing to send."""
+        batch = self._take_batch()
+        if not batch:
+            return False
+
+        self.sending.active = True
+        try:
+            response = requests.post(
+                f"{automationserver_url}/audit-logs/batch",
+                json=batch,
+                headers=headers,
+                timeout=30,
+            )
+            response.raise_for_status()
         except Exception as e:
-            print(f"Failed to send log to audit system: {e}")
+            # Re-queueing would let a slow server grow the backlog without limit
+            logger.error(f"Failed to send {len(batch)} logs to audit system: {e}")
+        finally:
+            self.sending.active = False
+
+        return True
 
 
 @contextmanager
-def acquire_session(resource_id: int):
+def acquire_session(resource_id: int, wait: int = 0):
+    """
+    Claim the next session of the resource and report how it ends.
+
+    Yields the claimed session with its process and credential, see claim_session, or
+    None when there is no session.
+    """
     handler = None
 
-    session = get_pending_session(resource_id=resource_id)
+    bundle = claim_session(resource_id=resource_id, wait=wait)
+    session = bundle["session"] if bundle is not None else None
     try:
         if session is not None:
-            update_session_status(session_id=session["id"], status="in progress")
             handler = SessionLoggingHandler(session_id=session["id"])
             logging.getLogger().addHandler(handler)
 
-        yield session
+        yield bundle
 
         if session is not None:
             logger.info("Completing session.")
@@ -79,11 +203,35 @@ def acquire_session(resource_id: int):
     finally:
         if handler is not None:
             logging.getLogger().removeHandler(handler)
+            handler.close()
             handler = None
 
 
-def get_pending_session(resource_id: int) -> dict:
-    response = requests.get(f"{sessions_base_url}/by_resource_id/{resource_id}", headers=headers)
+def claim_session(resource_id: int, wait: int = 0) -> dict:
+    """
+    Start the next session dispatched to the resource, None when there is none.
+
+    Returns the session, already in progress, with its process and the process's target
+    credential, or None for the credential when it has none. With `wait` the server holds
+    the request until a session is dispatched or `wait` seconds have passed. If that
+    request drops, the session is claimed once without waiting instead.
+    """
+    if wait:
+        try:
+            return _claim_session(resource_id, wait)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            logger.warning(f"Waiting for a session failed, polling instead: {e}")
+
+    return _claim_session(resource_id, 0)
+
+
+def _claim_session(resource_id: int, wait: int) -> dict:
+    response = requests.post(
+        f"{sessions_base_url}/by_resource_id/{resource_id}/claim",
+        params={"wait": wait} if wait else None,
+        headers=headers,
+        timeout=wait + 30,
+    )
 
     if response.status_code == 204:
         return None
@@ -20,6 +20,15 @@ logger = logging.getLogger(__name__)
 
 capabilities = f"python {platform.system()} {os.getenv('ATS_CAPABILITIES') or ""}".lower().strip()
 
+# Seconds between pings, the server detaches resources that miss RESOURCE_HEARTBEAT_TTL
+ping_interval = float(os.getenv('ATS_PING_INTERVAL') or 10)
+
+# Seconds the server may hold a request for the next session, 0 polls every POLL_INTERVAL
+session_wait = int(os.getenv('ATS_SESSION_WAIT') or 30)
+
+# Seconds between requests for a session when the server does not wait
+POLL_INTERVAL = 10
+
 stop_ping_thread = threading.Event()
 
 def ping_resource(resource_id: int) -> None:
@@ -29,7 +38,7 @@ def ping_resource(resource_id: int) -> None:
     while not stop_ping_thread.is_set():
         try:
             resources.ping_resource(resource_id)
-            time.sleep(120)
+            time.sleep(ping_interval)
         except ConnectionError:
             logger.error(f"Failed to ping resource {resource_id}, reconnecting in 5 seconds")
             time.sleep(5)
@@ -52,18 +61,17 @@ if __name__ == "__main__":
                         ping_thread.start()
                     
                     while True:
+                        requested_at = time.monotonic()
                         with sessions.acquire_session(
-                            resource_id=resource["id"]
-                        ) as session:
-                            if session is None:
-                                time.sleep(10)
+                            resource_id=resource["id"], wait=session_wait
+                        ) as bundle:
+                            if bundle is None:
+                                # Without ATS_SESSION_WAIT the server answers right away
+                                time.sleep(max(0, POLL_INTERVAL - (time.monotonic() - requested_at)))
                                 continue
 
-                            process = sessions.get_process(session)
-
-                            if process is None:
-                                logger.error(f"Process not found for session {session}")
-                                continue
+                            session = bundle["session"]
+                            process = bundle["process"]
 
                             params_info = f" with parameters: {session['parameters']}" if session.get('parameters') else " with no parameters"
                             logger.info(
@@ -74,9 +82,10 @@ if __name__ == "__main__":
                             username = None
                             token = None
                             if process["target_credentials_id"] is not None and process["target_credentials_id"] != 0:
-                                credentials = sessions.get_credential(
-                                    process["target_credentials_id"]
-                                )
+                                credentials = bundle["credential"]
+                                if credentials is None:
+                                    raise RuntimeError(f"Credential {process['target_credentials_id']} is gone")
+
                                 logger.info(f"Using credentials: {credentials["name"]}")
                                 username = credentials["username"]
                                 token = credentials["password"]